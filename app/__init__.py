@@ -33,7 +33,7 @@ def create_app(config_class=None):
     if _base not in sys.path:
         sys.path.insert(0, _base)
     from config import Config
-    app.config.from_object(Config)
+    app.config.from_object(config_class or Config)
 
     # Ensure upload folder exists
     os.makedirs(app.config.get("UPLOAD_FOLDER", "uploads"), exist_ok=True)
@@ -67,6 +67,34 @@ def create_app(config_class=None):
     app.register_blueprint(ai_bp, url_prefix="/api")
     csrf.exempt(ai_bp)  # API uses JSON, auth via session
 
+    # AI rate limiting (applied to the ai blueprint)
+    from app.services.rate_limit import rate_limiter
+    rate_limiter.init_app(app)
+
+    # Buffered AI usage accounting
+    from app.services.usage import usage_recorder
+    usage_recorder.init_app(app)
+
+    # Versioned system prompts (token sizes are logged at startup)
+    from app.services.prompt_registry import prompt_registry
+    prompt_registry.init_app(app)
+
+    # Expired drafts and old jobs are swept in the background
+    from app.services.sweeper import sweeper
+    sweeper.init_app(app)
+
+    # Batched public resume view counts
+    from app.services.public_resume import view_counter
+    view_counter.init_app(app)
+
+    # Background job executor
+    from app.services.jobs import job_queue
+    job_queue.init_app(app)
+
+    # Precompile resume templates (missing files are reported here, not per request)
+    from app.services.resume_builder import template_registry
+    template_registry.init_app(app)
+
     # Local developer safety net: create tables automatically for SQLite.
     # Production should rely on migrations.
     if str(app.config.get("SQLALCHEMY_DATABASE_URI", "")).startswith("sqlite:///"):
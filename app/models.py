@@ -5,6 +5,7 @@ PostgreSQL-ready with JSON fields for flexible resume content.
 from datetime import datetime
 from flask_login import UserMixin
 from sqlalchemy import JSON
+from sqlalchemy.dialects.postgresql import JSONB
 from app import db
 
 
@@ -41,14 +42,27 @@ class Resume(db.Model):
     is_public = db.Column(db.Boolean, default=False)
     public_slug = db.Column(db.String(32), unique=True, index=True)
     views = db.Column(db.Integer, default=0)
+    public_snapshot = db.Column(db.String(32))  # content hash of the rendered public page
+    thumbnail = db.Column(db.String(32))  # content hash of the dashboard thumbnail (static/thumbnails)
+    idempotency_key = db.Column(db.String(64))  # derived from the builder draft; see resume_store.save_resume
+    # Whole resume as one versioned JSON document (resume_document); NULL for section-only resumes
+    document = db.Column(JSON().with_variant(JSONB, "postgresql"))
 
     # Relationships
     sections = db.relationship("ResumeSection", backref="resume", lazy="dynamic", cascade="all, delete-orphan")
+    # Non-dynamic, read-only variant of `sections` that supports eager loading (selectinload)
+    section_list = db.relationship("ResumeSection", lazy="select", viewonly=True, order_by="ResumeSection.id")
 
     def __repr__(self):
         return f"<Resume {self.title} (user={self.user_id})>"
 
 
+# Dashboard keyset pagination: a user's resumes newest first, ties broken by id
+db.Index("ix_resumes_user_id_updated_at", Resume.user_id, Resume.updated_at.desc(), Resume.id.desc())
+# One resume per draft identity: repeated saves find (and update) it instead of duplicating
+db.Index("ux_resumes_user_id_idempotency_key", Resume.user_id, Resume.idempotency_key, unique=True)
+
+
 class ResumeSection(db.Model):
     """Resume section content (JSON)."""
     __tablename__ = "resume_sections"
@@ -62,6 +76,25 @@ class ResumeSection(db.Model):
         return f"<ResumeSection {self.section_type} (resume={self.resume_id})>"
 
 
+class ResumeRevision(db.Model):
+    """One entry in a resume's history: a full checkpoint or a delta from the previous revision."""
+    __tablename__ = "resume_revisions"
+    __table_args__ = (
+        db.UniqueConstraint("resume_id", "number", name="uq_resume_revisions_resume_number"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    resume_id = db.Column(db.Integer, db.ForeignKey("resumes.id", ondelete="CASCADE"), nullable=False)
+    number = db.Column(db.Integer, nullable=False)  # 1, 2, 3... per resume
+    kind = db.Column(db.String(10), nullable=False)  # checkpoint | delta
+    data = db.Column(JSON, nullable=False)  # full state or delta ops (app/services/revisions.py)
+    size = db.Column(db.Integer, nullable=False, default=0)  # serialized bytes
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<ResumeRevision {self.number} {self.kind} (resume={self.resume_id})>"
+
+
 class AIUsage(db.Model):
     """Track AI token usage per user (for billing/limits)."""
     __tablename__ = "ai_usages"
@@ -69,7 +102,143 @@ class AIUsage(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False, index=True)
     tokens_used = db.Column(db.Integer, default=0)
+    prompt = db.Column(db.String(64))  # registered prompt name (app/services/prompt_registry.py), if any
+    prompt_version = db.Column(db.String(32))  # "<variant>-<text hash>"
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     def __repr__(self):
         return f"<AIUsage user={self.user_id} tokens={self.tokens_used}>"
+
+
+class AIUsageTotal(db.Model):
+    """Running per-user token total (maintained incrementally from AIUsage writes)."""
+    __tablename__ = "ai_usage_totals"
+
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), primary_key=True)
+    tokens_used = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<AIUsageTotal user={self.user_id} tokens={self.tokens_used}>"
+
+
+class AIUsageBucket(db.Model):
+    """Per-user token usage per day / month (for dashboard stats and quota checks)."""
+    __tablename__ = "ai_usage_buckets"
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "period", "period_start", name="uq_ai_usage_buckets_user_period"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    period = db.Column(db.String(10), nullable=False)  # day, month
+    period_start = db.Column(db.Date, nullable=False)
+    tokens_used = db.Column(db.BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<AIUsageBucket user={self.user_id} {self.period}={self.period_start} tokens={self.tokens_used}>"
+
+
+class ResumeEnhancement(db.Model):
+    """Persisted AI enhancement output, keyed by a hash of the source inputs."""
+    __tablename__ = "resume_enhancements"
+
+    id = db.Column(db.Integer, primary_key=True)
+    content_hash = db.Column(db.String(64), unique=True, nullable=False, index=True)
+    content = db.Column(JSON, nullable=False, default=dict)  # professional_summary, experience_bullets, career_value
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<ResumeEnhancement {self.content_hash[:12]}>"
+
+
+class LLMCacheEntry(db.Model):
+    """Shared LLM response cache (content-addressed, TTL + LRU bounded)."""
+    __tablename__ = "llm_cache"
+
+    key = db.Column(db.String(64), primary_key=True)  # sha256 of model, messages, temperature, max_tokens
+    text = db.Column(db.Text, nullable=False, default="")
+    tokens = db.Column(db.Integer, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    accessed_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f"<LLMCacheEntry {self.key[:12]}>"
+
+
+class Job(db.Model):
+    """Background job (AI calls, imports) submitted by a request and polled by the client."""
+    __tablename__ = "jobs"
+
+    id = db.Column(db.String(32), primary_key=True)  # opaque token
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True, index=True)
+    kind = db.Column(db.String(50), nullable=False)  # suggest, enhance, ...
+    status = db.Column(db.String(20), nullable=False, default="queued", index=True)  # queued, running, done, failed
+    payload = db.Column(JSON, nullable=False, default=dict)
+    result = db.Column(JSON)
+    error = db.Column(db.Text)
+    progress = db.Column(JSON)  # handler-reported, e.g. {"pages_done": 3, "pages_total": 8}
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "progress": self.progress,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+    def __repr__(self):
+        return f"<Job {self.kind} {self.status} ({self.id[:8]})>"
+
+
+class RateLimitBucket(db.Model):
+    """Token-bucket state shared by all workers (database rate-limit backend)."""
+    __tablename__ = "rate_limit_buckets"
+
+    key = db.Column(db.String(128), primary_key=True)  # e.g. ai:user:42, ai:ip:1.2.3.4
+    tokens = db.Column(db.Float, nullable=False)
+    updated_at = db.Column(db.Float, nullable=False)  # unix time
+
+    def __repr__(self):
+        return f"<RateLimitBucket {self.key} tokens={self.tokens:.2f}>"
+
+
+class ResumeDraft(db.Model):
+    """In-progress builder data, kept server-side and referenced by an opaque id in the session."""
+    __tablename__ = "resume_drafts"
+
+    id = db.Column(db.String(32), primary_key=True)  # opaque token stored in session["draft_id"]
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False, index=True)
+    data = db.Column(JSON, nullable=False, default=dict)
+    form = db.Column(JSON)  # raw builder fields, autosaved as patches while the form is being filled
+    version = db.Column(db.Integer, nullable=False, default=0, server_default="0")  # bumped on every write (autosave compare-and-swap)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<ResumeDraft {self.id[:8]} (user={self.user_id})>"
+
+
+class PdfImport(db.Model):
+    """Extracted text of an uploaded PDF, keyed by file hash so re-uploads are instant."""
+    __tablename__ = "pdf_imports"
+
+    file_hash = db.Column(db.String(64), primary_key=True)  # sha256 of the file bytes
+    page_count = db.Column(db.Integer, default=0)
+    pages_extracted = db.Column(db.Integer, default=0)
+    text = db.Column(db.Text, nullable=False, default="")
+    parsed = db.Column(JSON)  # structured resume_data from the parser, cached with the text
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<PdfImport {self.file_hash[:12]} pages={self.pages_extracted}/{self.page_count}>"
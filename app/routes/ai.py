@@ -1,12 +1,54 @@
 """
-AI API routes: suggestions, enhance. Rate limited.
+AI API routes: suggestions, enhance, background jobs. Rate limited.
 """
-from flask import Blueprint, request, jsonify
+import json
+from datetime import datetime, timedelta
+
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
 from flask_login import login_required, current_user
 
-from app.services.ai_service import get_suggestions, enhance_section
+from app.services.ai_service import get_suggestions, enhance_section, stream_enhance_section, stream_suggestions
+from app.services.jobs import QueueFull, job_queue
+from app.services.llm_cache import cache_stats
+from app.services.prompt_registry import prompt_registry
+from app.services.rate_limit import rate_limiter
+from app.services.usage import prompt_usage_report
 
 ai_bp = Blueprint("ai", __name__)
+rate_limiter.limit_blueprint(ai_bp)  # AI_RATE_LIMIT per user, AI_RATE_LIMIT_IP per address
+
+
+def _error_status(error: str) -> int:
+    """503 for configuration problems, 500 otherwise."""
+    return 503 if "HF_API_TOKEN not set" in error or "huggingface-hub SDK is not installed" in error else 500
+
+
+def _wants_async(data: dict) -> bool:
+    """Job-submission mode: {"async": true} in the body or ?async=1."""
+    flag = data.get("async", request.args.get("async"))
+    return str(flag).strip().lower() in {"1", "true", "on", "yes"}
+
+
+def _enqueue(kind: str, payload: dict):
+    """Submit a background job and return a 202 with its status URL."""
+    try:
+        job_id = job_queue.submit(kind, payload, user_id=current_user.id)
+    except QueueFull as e:
+        resp = jsonify({"error": str(e)})
+        resp.headers["Retry-After"] = "5"
+        return resp, 503
+    return jsonify({"job_id": job_id, "status": "queued", "status_url": f"/api/jobs/{job_id}"}), 202
+
+
+@job_queue.register("suggest")
+def _run_suggest(payload, user_id):
+    return get_suggestions(payload["step"], payload["form_data"], user_id=user_id)
+
+
+@job_queue.register("enhance")
+def _run_enhance(payload, user_id):
+    result, error = enhance_section(payload["section_type"], payload["content"], user_id=user_id)
+    return ({"enhanced": result} if result is not None else None), error
 
 
 @ai_bp.route("/suggest", methods=["POST"])
@@ -16,10 +58,11 @@ def suggest():
     data = request.get_json() or {}
     step = int(data.get("step", 1))
     form_data = data.get("formData", data)
+    if _wants_async(data):
+        return _enqueue("suggest", {"step": step, "form_data": form_data})
     result, error = get_suggestions(step, form_data, user_id=current_user.id)
     if error:
-        status = 503 if "HF_API_TOKEN not set" in error or "huggingface-hub SDK is not installed" in error else 500
-        return jsonify({"error": error}), status
+        return jsonify({"error": error}), _error_status(error)
     return jsonify(result)
 
 
@@ -30,8 +73,73 @@ def enhance():
     data = request.get_json() or {}
     section_type = data.get("section_type", "experience")
     content = data.get("content", "")
+    if _wants_async(data):
+        return _enqueue("enhance", {"section_type": section_type, "content": content})
     result, error = enhance_section(section_type, content, user_id=current_user.id)
     if error:
         status = 503 if "HF_API_TOKEN not set" in error else 500
         return jsonify({"error": error}), status
     return jsonify({"enhanced": result})
+
+
+def _sse_response(events):
+    """Wrap an (event, data) generator as a Server-Sent Events response."""
+    def generate():
+        for event, data in events:
+            yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@ai_bp.route("/suggest/stream", methods=["POST"])
+@login_required
+def suggest_stream():
+    """Stream AI suggestions as SSE; JSON fields are emitted as soon as each is complete."""
+    data = request.get_json() or {}
+    step = int(data.get("step", 1))
+    form_data = data.get("formData", data)
+    return _sse_response(stream_suggestions(step, form_data, user_id=current_user.id))
+
+
+@ai_bp.route("/enhance/stream", methods=["POST"])
+@login_required
+def enhance_stream():
+    """Stream an enhanced resume section as SSE token deltas."""
+    data = request.get_json() or {}
+    section_type = data.get("section_type", "experience")
+    content = data.get("content", "")
+    return _sse_response(stream_enhance_section(section_type, content, user_id=current_user.id))
+
+
+@ai_bp.route("/jobs/<job_id>", methods=["GET"])
+@login_required
+def job_status(job_id):
+    """Poll a background job. ?wait=N long-polls up to N seconds for completion."""
+    try:
+        wait = float(request.args.get("wait", 0))
+    except ValueError:
+        wait = 0
+    wait = min(max(wait, 0), float(current_app.config.get("JOB_LONGPOLL_MAX", 25)))
+    job = job_queue.wait(job_id, user_id=current_user.id, timeout=wait) if wait else job_queue.get(job_id, user_id=current_user.id)
+    if job is None:
+        return jsonify({"error": "Job not found."}), 404
+    return jsonify(job.to_dict())
+
+
+@ai_bp.route("/stats", methods=["GET"])
+@login_required
+def stats():
+    """AI infrastructure counters (LLM cache hits/misses, job queue depth and timings, prompt versions).
+
+    Token usage per prompt version covers the current user only; other users' usage is not exposed.
+    """
+    return jsonify({
+        "llm_cache": cache_stats(),
+        "jobs": job_queue.stats(),
+        "prompts": prompt_registry.stats(),
+        "prompt_usage_30d": prompt_usage_report(since=datetime.utcnow() - timedelta(days=30), user_id=current_user.id),
+    })
@@ -1,28 +1,75 @@
 """
 Dashboard routes: view resumes, create new, usage stats.
 """
-from flask import Blueprint, render_template
+from flask import Blueprint, abort, jsonify, render_template, request, send_file
 from flask_login import login_required, current_user
-from app import db
-from app.models import Resume, AIUsage
-from sqlalchemy import func
+from app.services.public_resume import SNAPSHOT_CSP
+from app.services.resume_store import resume_cards, resume_count
+from app.services.thumbnails import backfill_thumbnails, thumbnail_path, thumbnail_url
+from app.services.usage import get_period_tokens, get_total_tokens
 
 dashboard_bp = Blueprint("dashboard", __name__)
 
+PAGE_SIZE = 20
+
+
+@dashboard_bp.context_processor
+def _thumbnail_helpers():
+    return {"thumbnail_url": thumbnail_url}
+
 
 @dashboard_bp.route("/")
 @login_required
 def index():
-    """Dashboard home: resume cards and usage stats."""
-    resumes = Resume.query.filter_by(user_id=current_user.id).order_by(Resume.updated_at.desc()).limit(20).all()
-    total_tokens = (
-        db.session.query(func.sum(AIUsage.tokens_used))
-        .filter(AIUsage.user_id == current_user.id)
-        .scalar()
-        or 0
-    )
+    """Dashboard home: first page of resume cards and usage stats."""
+    resumes, next_cursor = resume_cards(current_user.id, limit=PAGE_SIZE)
+    backfill_thumbnails(resumes, current_user.id)
     return render_template(
         "dashboard/index.html",
         resumes=resumes,
-        total_tokens=int(total_tokens),
+        next_cursor=next_cursor,
+        resume_total=resume_count(current_user.id),
+        total_tokens=get_total_tokens(current_user.id),
+        month_tokens=get_period_tokens(current_user.id, "month"),
     )
+
+
+@dashboard_bp.route("/resumes")
+@login_required
+def resume_page():
+    """Infinite scroll: the next page of cards after `cursor`, as JSON plus rendered HTML."""
+    limit = min(max(request.args.get("limit", PAGE_SIZE, type=int), 1), 50)
+    try:
+        resumes, next_cursor = resume_cards(current_user.id, cursor=request.args.get("cursor"), limit=limit)
+    except ValueError:
+        return jsonify({"error": "Invalid cursor."}), 400
+    backfill_thumbnails(resumes, current_user.id)
+    return jsonify({
+        "resumes": [
+            {
+                "id": r.id,
+                "title": r.title,
+                "template_name": r.template_name,
+                "updated_at": r.updated_at.isoformat() if r.updated_at else None,
+                "is_public": bool(r.is_public),
+                "views": r.views or 0,
+                "thumbnail_url": thumbnail_url(r.thumbnail),
+            }
+            for r in resumes
+        ],
+        "html": render_template("dashboard/_resume_cards.html", resumes=resumes),
+        "next_cursor": next_cursor,
+    })
+
+
+@dashboard_bp.route("/thumbnails/<thumbnail>.html")
+def thumbnail(thumbnail):
+    """Thumbnail files when THUMBNAIL_DIR is outside static/; content-hashed, so cacheable forever."""
+    path = thumbnail_path(thumbnail)
+    if path is None:
+        abort(404)
+    resp = send_file(path, mimetype="text/html", etag=thumbnail, max_age=31536000, conditional=True)
+    resp.cache_control.immutable = True
+    resp.headers["Content-Security-Policy"] = SNAPSHOT_CSP
+    resp.headers["X-Content-Type-Options"] = "nosniff"
+    return resp
@@ -1,7 +1,10 @@
 """
 Landing page and public routes.
 """
-from flask import Blueprint, render_template
+from flask import Blueprint, abort, current_app, redirect, render_template, send_file, url_for
+
+from app.models import Resume
+from app.services.public_resume import SNAPSHOT_CSP, is_fallback_snapshot, request_snapshot_retry, snapshot_path, view_counter
 
 landing_bp = Blueprint("landing", __name__)
 
@@ -10,3 +13,35 @@ landing_bp = Blueprint("landing", __name__)
 def index():
     """Landing page with hero, features, testimonials."""
     return render_template("landing/index.html")
+
+
+@landing_bp.route("/r/<slug>")
+def public_resume(slug):
+    """Shared resume link: count the view and point at the current immutable snapshot."""
+    resume = Resume.query.filter_by(public_slug=slug, is_public=True).first()
+    if resume is None or not resume.public_snapshot:
+        abort(404)
+    view_counter.hit(resume.id)
+    if is_fallback_snapshot(resume.public_snapshot):
+        request_snapshot_retry(resume)
+    resp = redirect(url_for("landing.public_snapshot", slug=slug, snapshot=resume.public_snapshot))
+    # Short-lived pointer: edges may cache it briefly, updates show up within max_age
+    resp.cache_control.public = True
+    resp.cache_control.max_age = int(current_app.config.get("PUBLIC_RESUME_POINTER_MAX_AGE", 60))
+    return resp
+
+
+@landing_bp.route("/r/<slug>/<snapshot>")
+def public_snapshot(slug, snapshot):
+    """Pre-rendered snapshot, served straight from disk; content-hashed, so cacheable forever."""
+    # Only the snapshot currently shared under this slug; other resumes' snapshots stay unreachable here
+    owner = Resume.query.filter_by(public_slug=slug, is_public=True, public_snapshot=snapshot).first()
+    path = snapshot_path(snapshot) if owner is not None else None
+    if path is None:
+        abort(404)
+    resp = send_file(path, mimetype="text/html", etag=snapshot, max_age=31536000, conditional=True)
+    resp.cache_control.public = True
+    resp.cache_control.immutable = True
+    resp.headers["Content-Security-Policy"] = SNAPSHOT_CSP
+    resp.headers["X-Content-Type-Options"] = "nosniff"
+    return resp
@@ -3,39 +3,31 @@ Resume routes: builder, template picker, save, view, download.
 """
 import os
 import base64
+import hashlib
+import io
 import secrets
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session, current_app, jsonify
+import time
+from flask import Blueprint, render_template, request, redirect, url_for, flash, current_app, jsonify, make_response, send_file, session
 from flask_login import login_required, current_user
+from flask_wtf.csrf import generate_csrf
+from werkzeug.http import is_resource_modified
 from werkzeug.utils import secure_filename
-from pypdf import PdfReader
 
 from app import db
-from app.models import Resume, ResumeSection
-from app.services.resume_builder import build_resume_html, TEMPLATES
+from app.models import Resume
+from app.services.drafts import SESSION_KEY as DRAFT_SESSION_KEY, end_build, form_progress, load_draft, patch_form, save_draft, start_build
+from app.services.jobs import QueueFull, job_queue
+from app.services.pdf_import import start_import
+from app.services.public_resume import publish, refresh_snapshot, unpublish
+from app.services.resume_pdf import cached_pdf, pdf_available, pdf_key, request_pdf, take_fallback_pdf
+from app.services.resume_builder import build_resume_html, enhance_resume, render_key, render_resume, render_all_templates, TEMPLATES
+from app.services.resume_store import EditConflict, restore_revision, resume_to_data, save_resume, update_resume
+from app.services.revisions import diff_states, latest_number, list_revisions, state_at
+from app.services.thumbnails import request_thumbnail
 
 resume_bp = Blueprint("resume", __name__)
 
-
-def _extract_text_from_pdf(file):
-    """Extract text from uploaded PDF."""
-    try:
-        reader = PdfReader(file)
-        return "\n".join(p.extract_text() or "" for p in reader.pages)
-    except Exception:
-        return ""
-
-
-def _parse_resume_text(text):
-    """Parse resume text with AI and return structured data."""
-    from app.services.ai_service import get_suggestions
-    # Simple fallback - in production you'd use a dedicated parse API
-    return {
-        "name": "",
-        "role": "",
-        "skills": text[:500] if text else "",
-        "experience": text[500:1500] if len(text) > 500 else text,
-        "education": text[1500:] if len(text) > 1500 else "",
-    }
+MAX_TITLE_LENGTH = Resume.title.type.length
 
 
 @resume_bp.route("/build", methods=["GET", "POST"])
@@ -47,9 +39,15 @@ def builder():
         if "resume_file" in request.files:
             file = request.files["resume_file"]
             if file.filename:
-                text = _extract_text_from_pdf(file)
-                if text:
-                    resume_data = _parse_resume_text(text)
+                try:
+                    outcome = start_import(file, current_user.id, request.form.get("template_name", "modern_minimal"))
+                except QueueFull as e:
+                    flash(str(e), "error")
+                    return redirect(url_for("resume.builder"))
+                if "job_id" in outcome:
+                    # Extraction runs in the background; the builder polls for progress
+                    return redirect(url_for("resume.builder", import_job=outcome["job_id"]))
+                resume_data = outcome["resume_data"]
 
         if not resume_data:
             experience = request.form.get("experience")
@@ -106,17 +104,82 @@ def builder():
             flash("Please provide at least Skills and Experience.", "error")
             return redirect(url_for("resume.builder"))
 
-        session["resume_data"] = resume_data
+        start_build(current_user.id, resume_data)
         return redirect(url_for("resume.template_picker"))
 
-    return render_template("builder.html", templates=TEMPLATES)
+    return render_template("builder.html", templates=TEMPLATES, import_job=request.args.get("import_job"))
+
+
+@resume_bp.route("/build/draft", methods=["GET", "PATCH"])
+@login_required
+def draft_autosave():
+    """
+    Builder autosave. GET returns {"version", "fields"} to restore the form;
+    PATCH {"version": n, "fields": {name: value | null}} stores only the
+    changed fields and answers {"version"}, or 409 with the current version
+    and fields when the draft moved on since n.
+    """
+    if request.method == "GET":
+        version, fields = form_progress(current_user.id)
+        return jsonify({"version": version, "fields": fields})
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({"error": "Expected a JSON object."}), 400
+    try:
+        applied, version, fields = patch_form(current_user.id, payload.get("fields"), payload.get("version"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if not applied:
+        return jsonify({"error": "Draft has changed.", "version": version, "fields": fields}), 409
+    return jsonify({"version": version})
+
+
+@resume_bp.route("/build/import", methods=["POST"])
+@login_required
+def import_pdf():
+    """Start a background PDF import; returns a job to poll (or a redirect on cache hit)."""
+    file = request.files.get("resume_file")
+    if file is None or not file.filename:
+        return jsonify({"error": "Please choose a PDF file."}), 400
+    try:
+        outcome = start_import(file, current_user.id, request.form.get("template_name", "modern_minimal"))
+    except QueueFull as e:
+        resp = jsonify({"error": str(e)})
+        resp.headers["Retry-After"] = "5"
+        return resp, 503
+    if "job_id" in outcome:
+        job_id = outcome["job_id"]
+        return jsonify({"job_id": job_id, "status_url": url_for("resume.import_status", job_id=job_id)}), 202
+    return _finish_import(outcome["resume_data"])
+
+
+@resume_bp.route("/build/import/<job_id>")
+@login_required
+def import_status(job_id):
+    """Poll a PDF import: progress while running, draft + redirect when done."""
+    job = job_queue.get(job_id, user_id=current_user.id)
+    if job is None or job.kind != "pdf_import":
+        return jsonify({"error": "Import not found."}), 404
+    if job.status in ("queued", "running"):
+        return jsonify({"status": job.status, "progress": job.progress or {}})
+    if job.status == "failed":
+        return jsonify({"status": "failed", "error": job.error or "Import failed."})
+    return _finish_import((job.result or {}).get("resume_data") or {})
+
+
+def _finish_import(resume_data):
+    """Store imported data as the draft and point the client at the template picker."""
+    if not resume_data.get("skills") or not resume_data.get("experience"):
+        return jsonify({"status": "failed", "error": "We couldn't read enough from that PDF. Please fill in the form instead."})
+    start_build(current_user.id, resume_data)
+    return jsonify({"status": "done", "redirect": url_for("resume.template_picker")})
 
 
 @resume_bp.route("/templates")
 @login_required
 def template_picker():
     """Show template picker after resume form is filled."""
-    resume_data = session.get("resume_data")
+    resume_data = load_draft(current_user.id)
     if not resume_data:
         flash("Please fill in your resume details first.", "error")
         return redirect(url_for("resume.builder"))
@@ -150,17 +213,24 @@ def template_picker():
 @resume_bp.route("/templates/preview", methods=["POST"])
 @login_required
 def template_preview():
-    """AJAX endpoint: render resume with a given template and return HTML."""
-    resume_data = session.get("resume_data")
+    """
+    AJAX endpoint: render resume with a given template and return HTML.
+    Pass {"all": true} to get every template rendered from one enhancement.
+    """
+    resume_data = load_draft(current_user.id)
     if not resume_data:
         return jsonify({"error": "No resume data in session."}), 400
 
     data = request.get_json() or {}
+    context = enhance_resume(resume_data)
+    if data.get("all"):
+        return jsonify({"templates": render_all_templates(context)})
+
     template_name = data.get("template_name", "modern_minimal")
     if template_name not in TEMPLATES:
         template_name = "modern_minimal"
 
-    html = build_resume_html(resume_data, template_name)
+    html = render_resume(context, template_name)
     return jsonify({"html": html})
 
 
@@ -168,7 +238,7 @@ def template_preview():
 @login_required
 def template_select():
     """Final template selection: save resume and redirect to view."""
-    resume_data = session.get("resume_data")
+    resume_data = load_draft(current_user.id)
     if not resume_data:
         flash("Session expired. Please start over.", "error")
         return redirect(url_for("resume.builder"))
@@ -178,30 +248,14 @@ def template_select():
         template_name = "modern_minimal"
 
     resume_data["template_name"] = template_name
-    session["resume_data"] = resume_data
+    save_draft(current_user.id, resume_data)
 
-    # Save to database
+    # Save to database (reuses the resume this draft already saved into)
     title = f"Resume - {resume_data.get('role', 'Untitled')}"
-    resume = Resume(
-        user_id=current_user.id,
-        title=title,
-        template_name=template_name,
-    )
-    db.session.add(resume)
-    db.session.flush()
-
-    sections_data = [
-        ("personal", {"name": resume_data.get("name"), "email": resume_data.get("email"), "phone": resume_data.get("phone"), "country": resume_data.get("country"), "links": resume_data.get("links"), "role": resume_data.get("role")}),
-        ("summary", {"raw": resume_data.get("career_objective", "") or resume_data.get("abilities", "")}),
-        ("experience", {"raw": resume_data.get("experience", "")}),
-        ("education", {"raw": resume_data.get("education", "")}),
-        ("skills", {"raw": resume_data.get("skills", "")}),
-    ]
-    for section_type, content in sections_data:
-        sec = ResumeSection(resume_id=resume.id, section_type=section_type, content=content)
-        db.session.add(sec)
-
-    db.session.commit()
+    resume, changed = save_resume(current_user.id, resume_data, template_name, title, draft_id=session.get(DRAFT_SESSION_KEY))
+    end_build(current_user.id)
+    if changed:
+        _after_resume_change(resume)
 
     # Render with chosen template and show
     html = build_resume_html(resume_data, template_name)
@@ -212,8 +266,8 @@ def template_select():
 @resume_bp.route("/save", methods=["POST"])
 @login_required
 def save():
-    """Save resume from session to database."""
-    resume_data = session.get("resume_data")
+    """Save resume from the current draft to database."""
+    resume_data = load_draft(current_user.id)
     if not resume_data:
         flash("No resume data to save.", "error")
         return redirect(url_for("resume.builder"))
@@ -221,48 +275,72 @@ def save():
     title = request.form.get("title", f"Resume - {resume_data.get('role', 'Untitled')}")
     template_name = resume_data.get("template_name", "modern_minimal")
 
-    resume = Resume(
-        user_id=current_user.id,
-        title=title,
-        template_name=template_name,
-    )
-    db.session.add(resume)
-    db.session.flush()
-
-    # Store full resume data in sections for easy retrieval
-    sections_data = [
-        ("personal", {"name": resume_data.get("name"), "email": resume_data.get("email"), "phone": resume_data.get("phone"), "country": resume_data.get("country"), "links": resume_data.get("links"), "role": resume_data.get("role")}),
-        ("summary", {"raw": resume_data.get("career_objective", "") or resume_data.get("abilities", "")}),
-        ("experience", {"raw": resume_data.get("experience", "")}),
-        ("education", {"raw": resume_data.get("education", "")}),
-        ("skills", {"raw": resume_data.get("skills", "")}),
-    ]
-    for section_type, content in sections_data:
-        sec = ResumeSection(resume_id=resume.id, section_type=section_type, content=content)
-        db.session.add(sec)
-
-    db.session.commit()
+    resume, changed = save_resume(current_user.id, resume_data, template_name, title, draft_id=session.get(DRAFT_SESSION_KEY))
+    end_build(current_user.id)
+    if changed:
+        _after_resume_change(resume)
     flash("Resume saved to dashboard.", "success")
     return redirect(url_for("dashboard.index"))
 
 
-def _resume_to_data(resume):
-    """Build resume_data dict from Resume model for template rendering."""
-    data = {"name": resume.title, "role": "", "email": "", "phone": "", "country": "", "links": "", "career_objective": "", "experience": "", "education": "", "skills": ""}
-    for sec in resume.sections:
-        c = sec.content or {}
-        if sec.section_type == "personal":
-            data["name"] = c.get("name", data["name"])
-            data["role"] = c.get("role", "")
-            data["email"] = c.get("email", "")
-            data["phone"] = c.get("phone", "")
-            data["country"] = c.get("country", "")
-            data["links"] = c.get("links", "")
-        elif sec.section_type == "summary":
-            data["career_objective"] = c.get("raw", c.get("text", ""))
-        else:
-            data[sec.section_type] = c.get("raw", c.get("text", ""))
-    return data
+def _after_resume_change(resume):
+    """Refresh derived assets after a resume's content, title or template changed."""
+    request_thumbnail(resume.id, resume.user_id)
+    if resume.is_public:
+        refresh_snapshot(resume)
+        db.session.commit()
+
+
+def _with_validators(resp, etag, last_modified):
+    """Attach validators; private because resumes are per-user, no-cache so every reuse revalidates."""
+    resp.set_etag(etag)
+    if last_modified is not None:
+        resp.last_modified = last_modified
+    resp.cache_control.private = True
+    resp.cache_control.no_cache = True
+    return resp
+
+
+def _not_modified(etag, last_modified=None):
+    """A 304 response if the client's copy is current, else None (checked before any rendering)."""
+    if is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        return None
+    return _with_validators(current_app.response_class(status=304), etag, last_modified)
+
+
+def _page_etag(key: str):
+    """
+    Validator for an HTML page around a rendered resume (view, HTML download).
+    The page also carries the session's CSRF token, signed with a timestamp,
+    so the ETag covers that token and the half of WTF_CSRF_TIME_LIMIT it was
+    issued in: a revalidated copy never holds an expired token. Returns None
+    while flashes are queued, since those must be rendered (no 304).
+    """
+    if session.get("_flashes"):
+        return None
+    generate_csrf()  # make sure the session token exists before it is hashed
+    limit = int(current_app.config.get("WTF_CSRF_TIME_LIMIT") or 0)
+    window = int(time.time() // max(1, limit // 2)) if limit else 0
+    token = session.get(current_app.config.get("WTF_CSRF_FIELD_NAME", "csrf_token"), "")
+    return hashlib.sha256(f"{key}:{token}:{window}".encode("utf-8")).hexdigest()[:32]
+
+
+def _render_page(resume):
+    """The HTML page for a saved resume, answering revalidations with 304 before rendering."""
+    etag = _page_etag(render_key(resume))
+    if etag is not None:
+        not_modified = _not_modified(etag)
+        if not_modified is not None:
+            return not_modified
+    data = resume_to_data(resume)
+    html = build_resume_html(data, resume.template_name)
+    resp = make_response(render_template("tailored.html", content=html))
+    if etag is None:
+        resp.cache_control.private = True
+        resp.cache_control.no_store = True
+        return resp
+    # No Last-Modified: the page changes with the CSRF window, not only with the resume
+    return _with_validators(resp, etag, None)
 
 
 @resume_bp.route("/resume/<int:id>")
@@ -270,19 +348,149 @@ def _resume_to_data(resume):
 def view(id):
     """View a saved resume."""
     resume = Resume.query.filter_by(id=id, user_id=current_user.id).first_or_404()
-    data = _resume_to_data(resume)
-    html = build_resume_html(data, resume.template_name)
-    return render_template("tailored.html", content=html)
+    return _render_page(resume)
 
 
 @resume_bp.route("/resume/<int:id>/download")
 @login_required
 def download(id):
-    """Download resume as HTML (print to PDF from browser)."""
+    """Download resume as PDF; cold misses are rendered in the background."""
     resume = Resume.query.filter_by(id=id, user_id=current_user.id).first_or_404()
-    data = _resume_to_data(resume)
-    html = build_resume_html(data, resume.template_name)
-    return render_template("tailored.html", content=html)
+    if not pdf_available():
+        # No renderer on this server: fall back to the printable HTML page
+        return _render_page(resume)
+
+    etag = pdf_key(resume)
+    not_modified = _not_modified(etag, resume.updated_at)
+    if not_modified is not None:
+        return not_modified
+
+    filename = f"{secure_filename(resume.title or '') or 'resume'}.pdf"
+    path = cached_pdf(resume)
+    if path is None:
+        fallback = take_fallback_pdf(resume)
+        if fallback is None:
+            try:
+                job_id = request_pdf(resume, current_user.id)
+            except QueueFull:
+                return _pdf_pending(id)
+            job = job_queue.wait(job_id, current_user.id, timeout=float(current_app.config.get("RESUME_PDF_WAIT", 3)))
+            if job is not None and job.status == "failed":
+                flash("We couldn't generate the PDF. Please try again.", "error")
+                return redirect(url_for("resume.view", id=id))
+            path = cached_pdf(resume)
+            fallback = take_fallback_pdf(resume) if path is None else None
+        if fallback is not None:
+            # Rendered without the AI enhancement: send it once, without validators
+            resp = send_file(io.BytesIO(fallback), mimetype="application/pdf", as_attachment=True, download_name=filename)
+            resp.cache_control.no_store = True
+            return resp
+        if path is None:
+            return _pdf_pending(id)
+
+    resp = send_file(path, mimetype="application/pdf", as_attachment=True, download_name=filename)
+    return _with_validators(resp, etag, resume.updated_at)
+
+
+def _pdf_pending(resume_id, retry_after=2):
+    """Page that refreshes until the background render has stored the PDF."""
+    resp = make_response(render_template("resume_pdf_pending.html", resume_id=resume_id, retry_after=retry_after), 202)
+    resp.headers["Retry-After"] = str(retry_after)
+    return resp
+
+
+@resume_bp.route("/resume/<int:id>/edit", methods=["POST"])
+@login_required
+def edit(id):
+    """
+    In-place edit (JSON): {"fields": {...}, "title": ..., "template_name": ...}.
+    Only the changed fields are stored, as a new revision.
+    """
+    resume = Resume.query.filter_by(id=id, user_id=current_user.id).first_or_404()
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({"error": "Expected a JSON object."}), 400
+    template_name = payload.get("template_name")
+    if template_name is not None and template_name not in TEMPLATES:
+        return jsonify({"error": "Unknown template."}), 400
+    if not isinstance(payload.get("fields", {}), dict):
+        return jsonify({"error": "fields must be an object."}), 400
+    title = payload.get("title")
+    if title is not None and (not isinstance(title, str) or len(title) > MAX_TITLE_LENGTH):
+        return jsonify({"error": f"title must be a string of at most {MAX_TITLE_LENGTH} characters."}), 400
+    try:
+        changed = update_resume(resume, payload.get("fields"), title=title, template_name=template_name)
+    except EditConflict as e:
+        return jsonify({"error": str(e), "revision": latest_number(resume.id)}), 409
+    if changed:
+        _after_resume_change(resume)
+    return jsonify({"changed": changed, "revision": latest_number(resume.id), "updated_at": resume.updated_at.isoformat()})
+
+
+@resume_bp.route("/resume/<int:id>/revisions")
+@login_required
+def revisions(id):
+    """Revision history, newest first."""
+    resume = Resume.query.filter_by(id=id, user_id=current_user.id).first_or_404()
+    return jsonify({"revisions": list_revisions(resume.id)})
+
+
+@resume_bp.route("/resume/<int:id>/revisions/<int:number>")
+@login_required
+def revision(id, number):
+    """The full resume as of one revision."""
+    resume = Resume.query.filter_by(id=id, user_id=current_user.id).first_or_404()
+    state = state_at(resume.id, number)
+    if state is None:
+        return jsonify({"error": "Revision not found."}), 404
+    return jsonify({"number": number, "state": state})
+
+
+@resume_bp.route("/resume/<int:id>/revisions/<int:old>/diff/<int:new>")
+@login_required
+def revision_diff(id, old, new):
+    """Field-level changes between two revisions."""
+    resume = Resume.query.filter_by(id=id, user_id=current_user.id).first_or_404()
+    before, after = state_at(resume.id, old), state_at(resume.id, new)
+    if before is None or after is None:
+        return jsonify({"error": "Revision not found."}), 404
+    return jsonify({"from": old, "to": new, "changes": diff_states(before, after)})
+
+
+@resume_bp.route("/resume/<int:id>/revisions/<int:number>/restore", methods=["POST"])
+@login_required
+def revision_restore(id, number):
+    """Make an earlier revision current (recorded as a new revision, history is kept)."""
+    resume = Resume.query.filter_by(id=id, user_id=current_user.id).first_or_404()
+    try:
+        changed = restore_revision(resume, number)
+    except EditConflict as e:
+        return jsonify({"error": str(e), "revision": latest_number(resume.id)}), 409
+    if changed is None:
+        return jsonify({"error": "Revision not found."}), 404
+    if changed:
+        _after_resume_change(resume)
+    return jsonify({"changed": changed, "revision": latest_number(resume.id)})
+
+
+@resume_bp.route("/resume/<int:id>/publish", methods=["POST"])
+@login_required
+def publish_resume(id):
+    """Share a resume at a public link (renders its snapshot once, here)."""
+    resume = Resume.query.filter_by(id=id, user_id=current_user.id).first_or_404()
+    slug = publish(resume)
+    flash(f"Resume shared: {url_for('landing.public_resume', slug=slug, _external=True)}", "success")
+    return redirect(url_for("dashboard.index"))
+
+
+@resume_bp.route("/resume/<int:id>/unpublish", methods=["POST"])
+@login_required
+def unpublish_resume(id):
+    """Stop sharing a resume."""
+    resume = Resume.query.filter_by(id=id, user_id=current_user.id).first_or_404()
+    unpublish(resume)
+    flash("Resume is no longer shared.", "success")
+    return redirect(url_for("dashboard.index"))
 
 
 # Legacy route for PDF upload from landing
@@ -5,16 +5,12 @@ Uses Hugging Face Inference API (OpenAI-compatible router) for all AI calls.
 import json
 import os
 import re
-import urllib.error
-import urllib.request
+from urllib.parse import urlsplit
 from flask import current_app
-from app import db
-from app.models import AIUsage
-from prompts import (
-    RESUME_GENERATION_PROMPT,
-    RESUME_WIZARD_PROMPT,
-    RESUME_ENHANCER_PROMPT,
-)
+from app.services.http_client import HTTPRequestError, get_http_client
+from app.services.llm_cache import get_cache, make_key
+from app.services.prompt_registry import Prompt, prompt_registry
+from app.services.usage import usage_recorder
 
 # Default model – officially recommended chat model on HF Inference API
 _DEFAULT_MODEL = "Qwen/Qwen2.5-Coder-32B-Instruct"
@@ -39,11 +35,9 @@ def _get_settings():
     return api_token, model
 
 
-def _track_tokens(user_id: int, tokens: int):
-    """Record AI token usage for a user."""
-    usage = AIUsage(user_id=user_id, tokens_used=tokens)
-    db.session.add(usage)
-    db.session.commit()
+def _track_tokens(user_id: int, tokens: int, prompt: Prompt = None):
+    """Record AI token usage for a user, against the prompt version when known (buffered, written in bulk)."""
+    usage_recorder.record(user_id, tokens, prompt=prompt)
 
 
 def _extract_json_text(raw_text: str) -> str:
@@ -59,11 +53,62 @@ def _extract_json_text(raw_text: str) -> str:
     return text
 
 
-def _hf_text(system_prompt: str, user_content: str, temperature: float = 0.6) -> tuple[str, int]:
-    """Call Hugging Face router (OpenAI-compatible) and return plain text + tokens."""
-    api_token, model = _get_settings()
+def _api_url() -> str:
+    """Chat completions endpoint (overridable for tests / self-hosted routers)."""
+    try:
+        url = current_app.config.get("HF_API_URL")
+    except RuntimeError:
+        url = None
+    return url or os.environ.get("HF_API_URL") or _HF_API_URL
+
+
+def _raise_for_status(status: int, raw: str):
+    """Map router error responses to readable errors."""
+    try:
+        parsed = json.loads(raw)
+        message = parsed.get("error", {}).get("message") or parsed.get("message") or raw
+    except Exception:
+        message = raw
+    if status == 401:
+        raise RuntimeError("Hugging Face API error: Invalid API token. Check your HF_API_TOKEN.")
+    if status == 429:
+        raise RuntimeError("Hugging Face API error: Rate limit exceeded. Please try again later.")
+    raise RuntimeError(f"Hugging Face API error ({status}): {message}")
+
+
+def _open_chat_completion(payload: dict, api_token: str):
+    """POST a chat completion on the pooled keep-alive client; returns the unread response."""
+    url = _api_url()
+    headers = {
+        "Authorization": f"Bearer {api_token}",
+        "Content-Type": "application/json",
+    }
+    parts = urlsplit(url)
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+
+    try:
+        resp = get_http_client(url).request("POST", path, body=json.dumps(payload).encode("utf-8"), headers=headers)
+    except HTTPRequestError as err:
+        raise RuntimeError(f"Hugging Face API request failed: {err.reason}") from err
+    if resp.status >= 400:
+        _raise_for_status(resp.status, resp.read().decode("utf-8", errors="replace"))
+    return resp
+
+
+def _post_chat_completion(payload: dict, api_token: str) -> dict:
+    """POST a chat completion request to the router and return the decoded body."""
+    resp = _open_chat_completion(payload, api_token)
+    try:
+        return json.loads(resp.read().decode("utf-8"))
+    except HTTPRequestError as err:
+        raise RuntimeError(f"Hugging Face API request failed: {err.reason}") from err
+    except OSError as err:
+        raise RuntimeError(f"Hugging Face API request failed: {err}") from err
+
 
-    payload = {
+def _build_payload(model: str, system_prompt: str, user_content: str, temperature: float) -> dict:
+    """Chat completion request body."""
+    return {
         "model": model,
         "messages": [
             {"role": "system", "content": system_prompt},
@@ -72,65 +117,192 @@ def _hf_text(system_prompt: str, user_content: str, temperature: float = 0.6) ->
         "max_tokens": 2048,
         "temperature": temperature,
     }
-    headers = {
-        "Authorization": f"Bearer {api_token}",
-        "Content-Type": "application/json",
-    }
 
-    req = urllib.request.Request(
-        _HF_API_URL,
-        data=json.dumps(payload).encode("utf-8"),
-        headers=headers,
-        method="POST",
-    )
 
-    try:
-        with urllib.request.urlopen(req, timeout=90) as resp:
-            body = json.loads(resp.read().decode("utf-8"))
-    except urllib.error.HTTPError as err:
-        raw = err.read().decode("utf-8", errors="replace") if hasattr(err, "read") else str(err)
-        try:
-            parsed = json.loads(raw)
-            message = parsed.get("error", {}).get("message") or parsed.get("message") or raw
-        except Exception:
-            message = raw
-        if err.code == 401:
-            raise RuntimeError("Hugging Face API error: Invalid API token. Check your HF_API_TOKEN.") from err
-        if err.code == 429:
-            raise RuntimeError("Hugging Face API error: Rate limit exceeded. Please try again later.") from err
-        raise RuntimeError(f"Hugging Face API error ({err.code}): {message}") from err
-    except urllib.error.URLError as err:
-        raise RuntimeError(f"Hugging Face API request failed: {err.reason}") from err
+def _system_text(system_prompt, json_output: bool) -> str:
+    """System message: the fixed prompt (plus JSON guidance), never request data, so it is a stable cacheable prefix."""
+    return str(system_prompt) + (_JSON_GUIDANCE if json_output else "")
+
+
+def _observe(system_prompt, usage: dict = None, cached: bool = False):
+    if isinstance(system_prompt, Prompt):
+        prompt_registry.observe(system_prompt, usage, cached=cached)
+
+
+def _hf_text(system_prompt: str | Prompt, user_content: str, temperature: float = 0.6, json_output: bool = False) -> tuple[str, int]:
+    """
+    Call Hugging Face router (OpenAI-compatible) and return plain text + tokens.
+    Identical requests are served from the LLM response cache (0 tokens spent).
+    """
+    api_token, model = _get_settings()
+    payload = _build_payload(model, _system_text(system_prompt, json_output), user_content, temperature)
+
+    cache = get_cache()
+    cache_key = make_key(payload) if cache is not None else None
+    if cache is not None:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            _observe(system_prompt, cached=True)
+            return cached[0], 0
+
+    body = _post_chat_completion(payload, api_token)
 
     text = body.get("choices", [{}])[0].get("message", {}).get("content", "")
     usage = body.get("usage", {})
     tokens = int(usage.get("total_tokens", 0) or 0)
-    return text.strip(), tokens
+    _observe(system_prompt, usage)
+    text = text.strip()
+    if cache is not None and text:
+        cache.set(cache_key, text, tokens)
+    return text, tokens
+
 
+def _hf_stream(system_prompt: str | Prompt, user_content: str, temperature: float = 0.6, json_output: bool = False, on_usage=None):
+    """
+    Streaming variant of _hf_text (``stream: true``); yields text deltas as tokens arrive.
+    on_usage(tokens) is called exactly once when the stream ends, also when the
+    consumer stops early (client disconnect), so upstream tokens are always
+    accounted. A cached response is replayed as a single delta with 0 tokens.
+    """
+    api_token, model = _get_settings()
+    payload = _build_payload(model, _system_text(system_prompt, json_output), user_content, temperature)
 
-def _hf_json(system_prompt: str, user_content: str, temperature: float = 0.6) -> tuple[dict, int]:
+    cache = get_cache()
+    cache_key = make_key(payload) if cache is not None else None
+    if cache is not None:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            _observe(system_prompt, cached=True)
+            if on_usage is not None:
+                on_usage(0)
+            yield cached[0]
+            return
+
+    payload["stream"] = True
+    payload["stream_options"] = {"include_usage": True}
+    resp = _open_chat_completion(payload, api_token)
+
+    parts = []
+    chunks = 0
+    usage = {}
+    try:
+        for line in resp.iter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                break
+            try:
+                event = json.loads(data)
+            except ValueError:
+                continue
+            if event.get("usage"):
+                usage = event["usage"]
+            for choice in event.get("choices") or []:
+                delta = (choice.get("delta") or {}).get("content")
+                if delta:
+                    chunks += 1
+                    parts.append(delta)
+                    yield delta
+    except (HTTPRequestError, OSError) as err:
+        raise RuntimeError(f"Hugging Face API stream failed: {err}") from err
+    finally:
+        resp.close()
+        # Routers that ignore include_usage, and streams cut short: one streamed chunk is ~one token
+        tokens = int(usage.get("total_tokens") or 0) or chunks
+        _observe(system_prompt, usage or {"total_tokens": tokens})
+        if on_usage is not None:
+            on_usage(tokens)
+
+    text = "".join(parts).strip()
+    if cache is not None and text:
+        cache.set(cache_key, text, tokens)
+
+
+_JSON_GUIDANCE = (
+    "\n\nReturn only valid JSON. Do not include markdown fences, extra commentary, or text before/after the JSON."
+)
+
+
+def _hf_json(system_prompt: str | Prompt, user_content: str, temperature: float = 0.6) -> tuple[dict, int]:
     """Call Hugging Face and parse JSON response."""
-    guidance = (
-        "\n\nReturn only valid JSON. Do not include markdown fences, extra commentary, or text before/after the JSON."
-    )
-    text, tokens = _hf_text(system_prompt + guidance, user_content, temperature=temperature)
+    text, tokens = _hf_text(system_prompt, user_content, temperature=temperature, json_output=True)
     parsed = json.loads(_extract_json_text(text))
     return parsed, tokens
 
 
+class IncrementalJSONParser:
+    """
+    Incremental parser for a streamed JSON object.
+    feed() returns top-level (key, value) pairs as soon as each value is complete,
+    skipping any preamble or markdown fence before the opening brace.
+    """
+
+    def __init__(self):
+        self._buf = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._member_start = None
+        self.done = False
+
+    def feed(self, chunk: str) -> list:
+        fields = []
+        self._buf += chunk
+        while self._pos < len(self._buf) and not self.done:
+            ch = self._buf[self._pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif self._depth == 0:
+                if ch == "{":
+                    self._depth = 1
+                    self._member_start = self._pos + 1
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "]}":
+                self._depth -= 1
+                if self._depth == 0:
+                    fields.extend(self._emit(self._pos))
+                    self.done = True
+            elif ch == "," and self._depth == 1:
+                fields.extend(self._emit(self._pos))
+                self._member_start = self._pos + 1
+            self._pos += 1
+        return fields
+
+    def _emit(self, end: int) -> list:
+        member = self._buf[self._member_start:end].strip()
+        if not member:
+            return []
+        try:
+            return list(json.loads("{" + member + "}").items())
+        except ValueError:
+            return []
+
+
+_ENHANCE_PROMPT = (
+    "Rewrite the following resume content to be professional, achievement-oriented, "
+    "and ATS-optimized. Use bullet points and action verbs. Keep it concise."
+)
+
+
 def enhance_section(section_type: str, content: str, user_id: int = None) -> tuple[str | None, str | None]:
     """
     Enhance a resume section with AI: professional, achievement-oriented, ATS-optimized.
     Returns (enhanced_content, error_message).
     """
-    prompt = (
-        "Rewrite the following resume content to be professional, achievement-oriented, "
-        "and ATS-optimized. Use bullet points and action verbs. Keep it concise."
-    )
     user_content = f"Section: {section_type}\n\nContent:\n{content}"
 
     try:
-        result, tokens = _hf_text(prompt, user_content, temperature=0.6)
+        result, tokens = _hf_text(_ENHANCE_PROMPT, user_content, temperature=0.6)
         if user_id:
             _track_tokens(user_id, tokens)
         return result, None
@@ -179,26 +351,27 @@ def generate_tailored_resume(resume_data: dict, photo_base64: str = None, user_i
         ai_data["include_photo_placeholder"] = True
 
     user_content = f"Rewrite this resume for the role of {resume_data.get('role')}:\n\n{json.dumps(ai_data)}"
+    prompt = prompt_registry.get("resume_generation", endpoint="generate")
 
     try:
-        content, tokens = _hf_text(RESUME_GENERATION_PROMPT, user_content, temperature=0.7)
+        content, tokens = _hf_text(prompt, user_content, temperature=0.7)
         if photo_base64:
             content = content.replace("PHOTO_PLACEHOLDER", f"data:image/jpeg;base64,{photo_base64}")
 
         if user_id:
-            _track_tokens(user_id, tokens)
+            _track_tokens(user_id, tokens, prompt)
         return content, None
     except Exception as e:
         return None, str(e)
 
 
-def get_suggestions(step: int, form_data: dict, user_id: int = None) -> tuple[dict | None, str | None]:
-    """Get AI suggestions for wizard step or enhancer."""
+def _suggestion_prompts(step: int, form_data: dict, endpoint: str = "suggest") -> tuple[Prompt, str]:
+    """System prompt and user content for a wizard step (1, 3) or the enhancer."""
     if step in (1, 3):
-        system_prompt = RESUME_WIZARD_PROMPT
-        user_content = f"Current Step: {step}\nUser Data: {json.dumps(form_data)}"
+        system_prompt = prompt_registry.get("resume_wizard", endpoint=endpoint)
+        user_content = f"Current Step: {step}\nUser Data: {json.dumps(form_data, sort_keys=True)}"
     else:
-        system_prompt = RESUME_ENHANCER_PROMPT
+        system_prompt = prompt_registry.get("resume_enhancer", endpoint=endpoint)
         resume_object = {
             "identity": {
                 "name": form_data.get("name"),
@@ -233,11 +406,63 @@ def get_suggestions(step: int, form_data: dict, user_id: int = None) -> tuple[di
             "job_type": form_data.get("job_type"),
         }
         user_content = json.dumps(resume_object)
+    return system_prompt, user_content
 
+
+def get_suggestions(step: int, form_data: dict, user_id: int = None) -> tuple[dict | None, str | None]:
+    """Get AI suggestions for wizard step or enhancer."""
+    system_prompt, user_content = _suggestion_prompts(step, form_data)
     try:
         data, tokens = _hf_json(system_prompt, user_content, temperature=0.7)
         if user_id:
-            _track_tokens(user_id, tokens)
+            _track_tokens(user_id, tokens, system_prompt)
         return data, None
     except Exception as e:
         return None, str(e)
+
+
+def stream_enhance_section(section_type: str, content: str, user_id: int = None):
+    """
+    Streaming enhance_section. Yields (event, data) pairs: ("delta", {"text"}) as
+    tokens arrive, then ("done", {"enhanced"}) or ("error", {"error"}).
+    Token usage is recorded when the stream ends, even if the client disconnects.
+    """
+    user_content = f"Section: {section_type}\n\nContent:\n{content}"
+    track = (lambda tokens: _track_tokens(user_id, tokens)) if user_id else None
+    stream = _hf_stream(_ENHANCE_PROMPT, user_content, temperature=0.6, on_usage=track)
+    parts = []
+    try:
+        for delta in stream:
+            parts.append(delta)
+            yield "delta", {"text": delta}
+    except Exception as e:
+        yield "error", {"error": str(e)}
+        return
+    finally:
+        # A disconnect closes this generator first; closing the upstream stream records its usage
+        stream.close()
+    yield "done", {"enhanced": "".join(parts).strip()}
+
+
+def stream_suggestions(step: int, form_data: dict, user_id: int = None):
+    """
+    Streaming get_suggestions. Yields ("field", {"key", "value"}) for each top-level
+    JSON field as soon as it is complete, then ("done", full_result) or ("error", {"error"}).
+    """
+    system_prompt, user_content = _suggestion_prompts(step, form_data, endpoint="suggest_stream")
+    track = (lambda tokens: _track_tokens(user_id, tokens, system_prompt)) if user_id else None
+    stream = _hf_stream(system_prompt, user_content, temperature=0.7, json_output=True, on_usage=track)
+    parser = IncrementalJSONParser()
+    parts = []
+    try:
+        for delta in stream:
+            parts.append(delta)
+            for key, field_value in parser.feed(delta):
+                yield "field", {"key": key, "value": field_value}
+        data = json.loads(_extract_json_text("".join(parts)))
+    except Exception as e:
+        yield "error", {"error": str(e)}
+        return
+    finally:
+        stream.close()
+    yield "done", data
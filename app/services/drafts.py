@@ -0,0 +1,195 @@
+"""
+Server-side draft store for the resume builder.
+The session only carries an opaque draft id; the resume data lives in the
+resume_drafts table and expires after DRAFT_TTL_HOURS of inactivity (reads
+and writes both push the expiry out).
+While the builder form is being filled, its raw fields are autosaved to the
+same draft as small patches guarded by a version counter; they are cleared
+once the build is saved. Expired drafts are deleted by the background
+sweeper (app.services.sweeper).
+"""
+import re
+import secrets
+from datetime import datetime, timedelta
+
+from flask import current_app, session
+from sqlalchemy import delete, update
+
+from app import db
+from app.models import ResumeDraft
+from app.services.sweeper import sweeper
+
+SESSION_KEY = "draft_id"
+
+# Autosave limits; builder field names look like "experience_0_company"
+_FIELD_NAME = re.compile(r"^[a-z][a-z0-9_]{0,63}$")
+MAX_FORM_FIELDS = 200
+MAX_FIELD_LENGTH = 20000
+
+
+def _ttl() -> timedelta:
+    return timedelta(hours=float(current_app.config.get("DRAFT_TTL_HOURS", 72)))
+
+
+def purge_expired() -> int:
+    """Delete expired drafts; returns rows removed."""
+    result = db.session.execute(delete(ResumeDraft).where(ResumeDraft.expires_at <= datetime.utcnow()))
+    return result.rowcount or 0
+
+
+@sweeper.register("drafts")
+def _sweep_drafts(conn, now) -> int:
+    """Sweeper task: abandoned drafts go away without any new draft activity."""
+    table = ResumeDraft.__table__
+    return conn.execute(delete(table).where(table.c.expires_at <= now)).rowcount
+
+
+def get_draft(user_id: int, draft_id: str = None):
+    """Load the session's (or given) draft for this user, or None if missing/expired."""
+    sweeper.ensure_started()
+    draft_id = draft_id or session.get(SESSION_KEY)
+    if not draft_id:
+        return None
+    draft = ResumeDraft.query.filter_by(id=draft_id, user_id=user_id).first()
+    if draft is None or draft.expires_at <= datetime.utcnow():
+        return None
+    return draft
+
+
+def load_draft(user_id: int) -> dict | None:
+    """Resume data from the session's draft. Migrates legacy cookie-stored data on first access."""
+    legacy = session.pop("resume_data", None)
+    if legacy:
+        save_draft(user_id, legacy)
+        return legacy
+    draft = get_draft(user_id)
+    if draft is None:
+        return None
+    data = dict(draft.data or {})
+    _touch(draft)
+    return data
+
+
+def _touch(draft):
+    """Push an active draft's expiry out on read; skipped if it was refreshed in the last minute."""
+    expires_at = datetime.utcnow() + _ttl()
+    if expires_at - draft.expires_at < timedelta(minutes=1):
+        return
+    # Core UPDATE: expiry only, so the autosave version is left alone
+    table = ResumeDraft.__table__
+    db.session.execute(update(table).where(table.c.id == draft.id).values(expires_at=expires_at))
+    db.session.commit()
+
+
+def save_draft(user_id: int, data: dict) -> ResumeDraft:
+    """Create or replace the session's draft and refresh its expiry."""
+    now = datetime.utcnow()
+    draft = get_draft(user_id)
+    if draft is None:
+        purge_expired()
+        draft = ResumeDraft(id=secrets.token_hex(16), user_id=user_id)
+        db.session.add(draft)
+    draft.data = dict(data)
+    draft.version = (draft.version or 0) + 1
+    draft.updated_at = now
+    draft.expires_at = now + _ttl()
+    db.session.commit()
+    session[SESSION_KEY] = draft.id
+    return draft
+
+
+def start_build(user_id: int, data: dict) -> ResumeDraft:
+    """
+    Store a newly submitted build as a fresh draft (new id) and drop the
+    session's previous one. The draft id keys the resume a build saves into,
+    so two builds in one session never save over each other.
+    """
+    previous = session.pop(SESSION_KEY, None)
+    if previous:
+        db.session.execute(delete(ResumeDraft).where(ResumeDraft.id == previous, ResumeDraft.user_id == user_id))
+    return save_draft(user_id, data)
+
+
+def end_build(user_id: int):
+    """
+    Mark the session's build as saved: drop its autosaved form fields, so the
+    next /build starts empty. The draft itself stays until the next build
+    replaces it (see start_build), so repeated saves still reuse one resume.
+    """
+    draft = get_draft(user_id)
+    if draft is None or draft.form is None:
+        return
+    draft.form = None
+    draft.version = (draft.version or 0) + 1
+    db.session.commit()
+
+
+def form_progress(user_id: int) -> tuple[int, dict]:
+    """(version, autosaved builder fields) of the session's draft; (0, {}) when there is none."""
+    draft = get_draft(user_id)
+    if draft is None:
+        return 0, {}
+    return draft.version, dict(draft.form or {})
+
+
+def _clean_changes(changes) -> dict:
+    if not isinstance(changes, dict) or not changes:
+        raise ValueError("fields must be a non-empty object.")
+    for name, value in changes.items():
+        if not _FIELD_NAME.match(name):
+            raise ValueError(f"Invalid field name: {name[:64]!r}.")
+        if value is not None and not isinstance(value, str):
+            raise ValueError(f"{name} must be a string or null.")
+        if value is not None and len(value) > MAX_FIELD_LENGTH:
+            raise ValueError(f"{name} is too long.")
+    return changes
+
+
+def patch_form(user_id: int, changes: dict, version: int) -> tuple[bool, int, dict]:
+    """
+    Apply an autosave patch ({field: value, or None to drop it}) to the
+    session's draft if it is still at `version` (0 = no draft yet). Returns
+    (applied, version, fields); on a conflict nothing is written and the
+    current version and fields come back so the client can rebase.
+    Raises ValueError for malformed patches.
+    """
+    changes = _clean_changes(changes)
+    if not isinstance(version, int) or isinstance(version, bool):
+        raise ValueError("version must be an integer.")
+    draft = get_draft(user_id)
+    current = draft.version if draft is not None else 0
+    form = dict(draft.form or {}) if draft is not None else {}
+    if version != current:
+        return False, current, form
+
+    for name, value in changes.items():
+        if value is None:
+            form.pop(name, None)
+        else:
+            form[name] = value
+    if len(form) > MAX_FORM_FIELDS:
+        raise ValueError("Too many fields.")
+
+    now = datetime.utcnow()
+    if draft is None:
+        purge_expired()
+        draft = ResumeDraft(
+            id=secrets.token_hex(16), user_id=user_id, data={}, form=form, version=1,
+            updated_at=now, expires_at=now + _ttl(),
+        )
+        db.session.add(draft)
+        db.session.commit()
+        session[SESSION_KEY] = draft.id
+        return True, 1, form
+
+    # Compare-and-swap: a write from another tab or worker since `version` matches no row
+    result = db.session.execute(
+        update(ResumeDraft)
+        .where(ResumeDraft.id == draft.id, ResumeDraft.version == version)
+        .values(form=form, version=ResumeDraft.version + 1, updated_at=now, expires_at=now + _ttl())
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    if result.rowcount != 1:
+        return False, draft.version, dict(draft.form or {})
+    return True, version + 1, form
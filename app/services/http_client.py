@@ -0,0 +1,212 @@
+"""
+Pooled keep-alive HTTP client for the inference router.
+One client per process reuses TCP/TLS connections across requests, with
+separate connect and read timeouts. HTTP/2 is used when enabled and the
+optional httpx[http2] package is installed.
+"""
+import http.client
+import os
+import socket
+import ssl
+import threading
+from collections import deque
+from urllib.parse import urlsplit
+
+from app.utils import config_value
+
+try:
+    import httpx
+except Exception:  # pragma: no cover
+    httpx = None
+
+# Errors that mean a pooled keep-alive connection went stale; safe to retry once
+_STALE_ERRORS = (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError, http.client.CannotSendRequest)
+
+
+class HTTPRequestError(Exception):
+    """Transport-level failure (DNS, connect, timeout, TLS)."""
+
+    def __init__(self, reason):
+        super().__init__(str(reason))
+        self.reason = reason
+
+
+class _PooledResponse:
+    """Response wrapper that returns its connection to the pool once fully read."""
+
+    def __init__(self, pool, conn, resp):
+        self._pool = pool
+        self._conn = conn
+        self._resp = resp
+        self.status = resp.status
+        self.headers = resp.headers
+
+    def read(self) -> bytes:
+        try:
+            return self._resp.read()
+        finally:
+            self.close()
+
+    def iter_lines(self):
+        """Yield decoded lines as they arrive (for streamed responses)."""
+        try:
+            while True:
+                line = self._resp.readline()
+                if not line:
+                    break
+                yield line.decode("utf-8", errors="replace").rstrip("\r\n")
+        finally:
+            self.close()
+
+    def close(self):
+        if self._conn is None:
+            return
+        conn, self._conn = self._conn, None
+        if self._resp.isclosed() and not self._resp.will_close:
+            self._pool._release(conn)
+        else:
+            # Partially read or server asked to close: drop the connection
+            conn.close()
+
+
+class PooledHTTPClient:
+    """Thread-safe keep-alive connection pool for a single origin (stdlib http.client)."""
+
+    def __init__(self, base_url: str, pool_size: int = 10, connect_timeout: float = 5.0, read_timeout: float = 90.0):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme or "https"
+        self.host = parts.hostname
+        self.port = parts.port or (443 if self.scheme == "https" else 80)
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self._idle = deque()
+        self._lock = threading.Lock()
+        self._ssl_context = ssl.create_default_context() if self.scheme == "https" else None
+        self.connections_opened = 0
+
+    def _new_connection(self):
+        if self.scheme == "https":
+            conn = http.client.HTTPSConnection(self.host, self.port, timeout=self.connect_timeout, context=self._ssl_context)
+        else:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.connect_timeout)
+        conn.connect()
+        conn.sock.settimeout(self.read_timeout)
+        with self._lock:
+            self.connections_opened += 1
+        return conn
+
+    def _acquire(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+        return None, False
+
+    def _release(self, conn):
+        with self._lock:
+            if len(self._idle) < self.pool_size:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def request(self, method: str, path: str, body: bytes = None, headers: dict = None) -> _PooledResponse:
+        """Send a request on a pooled connection and return the response (body unread)."""
+        headers = dict(headers or {})
+        headers.setdefault("Connection", "keep-alive")
+        conn, reused = self._acquire()
+        for attempt in range(2):
+            try:
+                if conn is None:
+                    conn = self._new_connection()
+                conn.request(method, path, body=body, headers=headers)
+                resp = conn.getresponse()
+                return _PooledResponse(self, conn, resp)
+            except _STALE_ERRORS as err:
+                if conn is not None:
+                    conn.close()
+                conn = None
+                if not (reused and attempt == 0):
+                    raise HTTPRequestError(err) from err
+                reused = False
+            except (OSError, http.client.HTTPException) as err:
+                if conn is not None:
+                    conn.close()
+                reason = "timed out" if isinstance(err, socket.timeout) else err
+                raise HTTPRequestError(reason) from err
+        raise HTTPRequestError("request failed")  # pragma: no cover
+
+    def close(self):
+        with self._lock:
+            while self._idle:
+                self._idle.pop().close()
+
+
+class _HTTP2Response:
+    """Adapter giving httpx streamed responses the pooled-response interface."""
+
+    def __init__(self, resp):
+        self._resp = resp
+        self.status = resp.status_code
+        self.headers = resp.headers
+
+    def read(self) -> bytes:
+        try:
+            return self._resp.read()
+        finally:
+            self._resp.close()
+
+    def iter_lines(self):
+        try:
+            yield from self._resp.iter_lines()
+        finally:
+            self._resp.close()
+
+    def close(self):
+        self._resp.close()
+
+
+class HTTP2Client:
+    """httpx-backed client with HTTP/2 multiplexing (optional dependency)."""
+
+    def __init__(self, base_url: str, pool_size: int = 10, connect_timeout: float = 5.0, read_timeout: float = 90.0):
+        parts = urlsplit(base_url)
+        self._origin = f"{parts.scheme}://{parts.netloc}"
+        self.pool_size = pool_size
+        self._client = httpx.Client(
+            http2=True,
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        )
+
+    def request(self, method: str, path: str, body: bytes = None, headers: dict = None) -> _HTTP2Response:
+        try:
+            req = self._client.build_request(method, self._origin + path, content=body, headers=headers)
+            return _HTTP2Response(self._client.send(req, stream=True))
+        except httpx.HTTPError as err:
+            raise HTTPRequestError(err) from err
+
+    def close(self):
+        self._client.close()
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_http_client(base_url: str):
+    """Return the long-lived client for base_url in this process."""
+    pool_size = int(config_value("HF_POOL_SIZE", 10))
+    connect_timeout = float(config_value("HF_CONNECT_TIMEOUT", 5))
+    read_timeout = float(config_value("HF_READ_TIMEOUT", 90))
+    http2 = str(config_value("HF_HTTP2", "false")).lower() in {"1", "true", "yes", "on"}
+    use_http2 = http2 and httpx is not None and base_url.startswith("https")
+
+    parts = urlsplit(base_url)
+    # Keyed by pid so a forked worker never shares sockets with its parent
+    ident = (os.getpid(), parts.scheme, parts.netloc, pool_size, connect_timeout, read_timeout, use_http2)
+    with _clients_lock:
+        client = _clients.get(ident)
+        if client is None:
+            cls = HTTP2Client if use_http2 else PooledHTTPClient
+            client = _clients[ident] = cls(base_url, pool_size=pool_size, connect_timeout=connect_timeout, read_timeout=read_timeout)
+    return client
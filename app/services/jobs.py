@@ -0,0 +1,219 @@
+"""
+Background job queue for slow work (AI calls, PDF imports) so requests return immediately.
+Jobs are persisted in the jobs table and executed on a bounded per-process
+thread pool; clients poll (or long-poll) the job status. Payloads and results
+carry CV text and model output, so jobs are deleted JOB_RETENTION_HOURS after
+they were created.
+"""
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import delete, update
+
+from app import db
+from app.models import Job
+from app.services.sweeper import sweeper
+
+
+class QueueFull(Exception):
+    """Raised when the job queue is at capacity."""
+
+
+class _Timings:
+    """Rolling wait/run time stats for jobs executed in this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.failed = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.run_total = 0.0
+        self.run_max = 0.0
+
+    def record(self, wait: float, run: float, ok: bool):
+        with self._lock:
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+            self.run_total += run
+            self.run_max = max(self.run_max, run)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            n = self.completed + self.failed
+            return {
+                "completed": self.completed,
+                "failed": self.failed,
+                "wait_avg_s": round(self.wait_total / n, 3) if n else 0.0,
+                "wait_max_s": round(self.wait_max, 3),
+                "run_avg_s": round(self.run_total / n, 3) if n else 0.0,
+                "run_max_s": round(self.run_max, 3),
+            }
+
+
+class JobQueue:
+    """Bounded executor plus handler registry, initialized per app like other extensions."""
+
+    def __init__(self):
+        self.app = None
+        self._handlers = {}
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._done_events = {}
+        self.max_workers = 4
+        self.max_queue = 32
+        self.job_timeout = 300
+        self.timings = _Timings()
+        self._local = threading.local()
+
+    def init_app(self, app):
+        self.app = app
+        self.max_workers = int(app.config.get("JOB_WORKERS", 4))
+        self.max_queue = int(app.config.get("JOB_QUEUE_MAX", 32))
+        self.job_timeout = int(app.config.get("JOB_TIMEOUT", 300))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="resumeghana-job")
+
+    def register(self, kind: str, handler=None):
+        """Register handler(payload, user_id) -> (result, error) for a job kind. Usable as decorator."""
+        if handler is None:
+            def decorator(fn):
+                self._handlers[kind] = fn
+                return fn
+            return decorator
+        self._handlers[kind] = handler
+        return handler
+
+    def submit(self, kind: str, payload: dict, user_id: int = None, max_pending: int = None) -> str:
+        """
+        Persist and enqueue a job; returns its id. Raises QueueFull at capacity,
+        or (for low-priority work) once `max_pending` jobs are already waiting.
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        limit = self.max_queue if max_pending is None else min(max_pending, self.max_queue)
+        with self._lock:
+            if self._pending >= limit:
+                raise QueueFull("Job queue is full. Please try again shortly.")
+            self._pending += 1
+
+        try:
+            job = Job(id=secrets.token_hex(16), user_id=user_id, kind=kind, status="queued", payload=payload)
+            db.session.add(job)
+            db.session.commit()
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+
+        self._done_events[job.id] = threading.Event()
+        self._executor.submit(self._run, job.id, time.monotonic())
+        sweeper.ensure_started()
+        return job.id
+
+    def _run(self, job_id: str, enqueued_at: float):
+        started = time.monotonic()
+        with self._lock:
+            self._pending -= 1
+            self._running += 1
+        ok = False
+        try:
+            with self.app.app_context():
+                job = db.session.get(Job, job_id)
+                if job is None:
+                    return
+                job.status = "running"
+                job.started_at = datetime.utcnow()
+                db.session.commit()
+                self._local.job_id = job_id
+                try:
+                    result, error = self._handlers[job.kind](job.payload or {}, job.user_id)
+                except Exception as e:
+                    db.session.rollback()
+                    result, error = None, str(e)
+                finally:
+                    self._local.job_id = None
+                job.result = result
+                job.error = error
+                job.status = "failed" if error else "done"
+                job.finished_at = datetime.utcnow()
+                db.session.commit()
+                ok = not error
+        finally:
+            with self._lock:
+                self._running -= 1
+            self.timings.record(started - enqueued_at, time.monotonic() - started, ok)
+            event = self._done_events.pop(job_id, None)
+            if event is not None:
+                event.set()
+
+    def report_progress(self, progress: dict):
+        """Called from inside a handler: publish progress for the running job (own connection)."""
+        job_id = getattr(self._local, "job_id", None)
+        if job_id is None:
+            return
+        with db.engine.begin() as conn:
+            conn.execute(update(Job.__table__).where(Job.__table__.c.id == job_id).values(progress=progress))
+
+    def get(self, job_id: str, user_id: int = None):
+        """Load a job (scoped to user when given); stale unfinished jobs are reported failed."""
+        query = Job.query.filter_by(id=job_id)
+        if user_id is not None:
+            query = query.filter_by(user_id=user_id)
+        job = query.first()
+        if job is not None and job.status in ("queued", "running"):
+            if job.created_at and job.created_at < datetime.utcnow() - timedelta(seconds=self.job_timeout):
+                job.status = "failed"
+                job.error = "Job expired before completing."
+                job.finished_at = datetime.utcnow()
+                db.session.commit()
+        return job
+
+    def wait(self, job_id: str, user_id: int = None, timeout: float = 0):
+        """Long-poll: block up to timeout seconds for the job to finish, then return it."""
+        deadline = time.monotonic() + max(0.0, timeout)
+        event = self._done_events.get(job_id)
+        if event is not None:
+            event.wait(timeout=max(0.0, timeout))
+        else:
+            # Job may be running in another worker process: poll the table
+            while time.monotonic() < deadline:
+                job = self.get(job_id, user_id)
+                if job is None or job.status in ("done", "failed"):
+                    return job
+                db.session.expire_all()
+                time.sleep(0.5)
+        db.session.expire_all()
+        return self.get(job_id, user_id)
+
+    def stats(self) -> dict:
+        """Queue depth, in-flight count and timing stats for this process."""
+        with self._lock:
+            depth, running = self._pending, self._running
+        return {
+            "depth": depth,
+            "running": running,
+            "workers": self.max_workers,
+            "max_queue": self.max_queue,
+            **self.timings.as_dict(),
+        }
+
+
+job_queue = JobQueue()
+
+
+@sweeper.register("jobs")
+def _sweep_jobs(conn, now) -> int:
+    """Sweeper task: drop jobs past retention (long finished, or long dead if never finished)."""
+    retention = timedelta(hours=float(current_app.config.get("JOB_RETENTION_HOURS", 24)))
+    table = Job.__table__
+    return conn.execute(delete(table).where(table.c.created_at < now - retention)).rowcount
@@ -0,0 +1,194 @@
+"""
+Content-addressed cache for LLM responses.
+Keys are a hash of (model, messages, temperature, max_tokens). Two backends:
+in-process (per worker) and database (shared by all gunicorn workers).
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.utils import config_value
+
+_DEFAULT_TTL = 3600
+_DEFAULT_MAX_ENTRIES = 1000
+
+
+def make_key(payload: dict) -> str:
+    """Hash the request fields that determine the model output."""
+    material = {
+        "model": payload.get("model"),
+        "messages": payload.get("messages"),
+        "temperature": payload.get("temperature"),
+        "max_tokens": payload.get("max_tokens"),
+    }
+    raw = json.dumps(material, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class _Stats:
+    """Thread-safe hit/miss counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+class MemoryCache:
+    """In-process LRU cache with per-entry TTL."""
+    backend = "memory"
+
+    def __init__(self, ttl: int = _DEFAULT_TTL, max_entries: int = _DEFAULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.stats = _Stats()
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, text, tokens)
+
+    def get(self, key: str):
+        """Return (text, tokens) or None."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        self.stats.record(entry is not None)
+        return (entry[1], entry[2]) if entry is not None else None
+
+    def set(self, key: str, text: str, tokens: int):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, text, tokens)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def info(self) -> dict:
+        with self._lock:
+            size = len(self._entries)
+        return {"backend": self.backend, "size": size, "max_entries": self.max_entries, "ttl": self.ttl, **self.stats.as_dict()}
+
+
+class DatabaseCache:
+    """
+    Cache stored in the llm_cache table, shared across workers.
+    Uses its own connection so cache writes never commit the request's session.
+    """
+    backend = "database"
+
+    def __init__(self, ttl: int = _DEFAULT_TTL, max_entries: int = _DEFAULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.stats = _Stats()
+
+    @staticmethod
+    def _table():
+        from app.models import LLMCacheEntry
+        return LLMCacheEntry.__table__
+
+    @staticmethod
+    def _engine():
+        from app import db
+        return db.engine
+
+    def get(self, key: str):
+        table = self._table()
+        now = datetime.utcnow()
+        with self._engine().begin() as conn:
+            row = conn.execute(
+                select(table.c.text, table.c.tokens).where(table.c.key == key, table.c.expires_at > now)
+            ).first()
+            if row is not None:
+                conn.execute(update(table).where(table.c.key == key).values(accessed_at=now))
+        self.stats.record(row is not None)
+        return (row.text, row.tokens or 0) if row is not None else None
+
+    def set(self, key: str, text: str, tokens: int):
+        table = self._table()
+        now = datetime.utcnow()
+        values = {
+            "key": key,
+            "text": text,
+            "tokens": tokens,
+            "created_at": now,
+            "accessed_at": now,
+            "expires_at": now + timedelta(seconds=self.ttl),
+        }
+        try:
+            with self._engine().begin() as conn:
+                conn.execute(delete(table).where(table.c.key == key))
+                conn.execute(insert(table).values(**values))
+                conn.execute(delete(table).where(table.c.expires_at <= now))
+                # Evict least recently used beyond the size bound
+                overflow = select(table.c.key).order_by(table.c.accessed_at.desc()).offset(self.max_entries)
+                conn.execute(delete(table).where(table.c.key.in_(overflow.scalar_subquery())))
+        except IntegrityError:
+            # Another worker stored the same response concurrently
+            pass
+
+    def clear(self):
+        with self._engine().begin() as conn:
+            conn.execute(delete(self._table()))
+
+    def info(self) -> dict:
+        from sqlalchemy import func
+        table = self._table()
+        with self._engine().connect() as conn:
+            size = conn.execute(select(func.count()).select_from(table)).scalar() or 0
+        return {"backend": self.backend, "size": size, "max_entries": self.max_entries, "ttl": self.ttl, **self.stats.as_dict()}
+
+
+_BACKENDS = {"memory": MemoryCache, "database": DatabaseCache}
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache():
+    """Return the configured cache for this process, or None when disabled."""
+    backend = str(config_value("LLM_CACHE_BACKEND", "memory")).lower()
+    if backend not in _BACKENDS:
+        return None
+    ttl = int(config_value("LLM_CACHE_TTL", _DEFAULT_TTL))
+    max_entries = int(config_value("LLM_CACHE_MAX_ENTRIES", _DEFAULT_MAX_ENTRIES))
+    ident = (backend, ttl, max_entries)
+    with _caches_lock:
+        cache = _caches.get(ident)
+        if cache is None:
+            cache = _caches[ident] = _BACKENDS[backend](ttl=ttl, max_entries=max_entries)
+    return cache
+
+
+def cache_stats() -> dict:
+    """Hit/miss counters and size for the active cache."""
+    cache = get_cache()
+    if cache is None:
+        return {"backend": "none"}
+    return cache.info()
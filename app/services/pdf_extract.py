@@ -0,0 +1,156 @@
+"""
+PDF text extraction, serial or split into page ranges across a process pool.
+pypdf is pure Python and CPU-bound, so large documents are divided into
+contiguous page ranges, extracted in parallel worker processes (no GIL
+contention with request threads) and merged back in page order.
+Workers are recycled after a fixed number of tasks to cap memory growth, and
+the pool is replaced when a document overruns its deadline.
+"""
+import io
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+from pypdf import PdfReader
+
+
+def _open(source):
+    """Accept a path, raw bytes or a file-like object."""
+    if isinstance(source, (bytes, bytearray)):
+        return PdfReader(io.BytesIO(source))
+    return PdfReader(source)
+
+
+def extract_range(source, start: int, stop: int, page_budget: float) -> tuple[list[str], bool]:
+    """
+    Extract pages [start, stop). Runs in a worker process.
+    Returns (texts, cut_short); cut_short is True if a page blew the time budget.
+    """
+    reader = _open(source)
+    texts = []
+    for index in range(start, stop):
+        started = time.monotonic()
+        try:
+            texts.append(reader.pages[index].extract_text() or "")
+        except Exception:
+            texts.append("")
+        if time.monotonic() - started > page_budget:
+            return texts, True
+    return texts, False
+
+
+def page_ranges(count: int, parts: int) -> list[tuple[int, int]]:
+    """Split [0, count) into at most `parts` contiguous, near-equal ranges."""
+    parts = max(1, min(parts, count))
+    size, extra = divmod(count, parts)
+    ranges, start = [], 0
+    for i in range(parts):
+        stop = start + size + (1 if i < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+class ExtractionPool:
+    """Lazily created, bounded ProcessPoolExecutor with worker recycling."""
+
+    def __init__(self, processes: int = None, tasks_per_child: int = 50):
+        self.processes = processes or min(4, os.cpu_count() or 1)
+        self.tasks_per_child = tasks_per_child
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                # max_tasks_per_child recycles workers (and implies the spawn start method)
+                self._executor = ProcessPoolExecutor(max_workers=self.processes, max_tasks_per_child=self.tasks_per_child)
+                self._pid = os.getpid()
+            return self._executor
+
+    def reset(self):
+        """
+        Drop a broken or stuck pool; a fresh one is created on next use.
+        Queued work is cancelled. A worker already inside a range cannot be
+        interrupted: it exits once that range returns (the page budget is
+        checked between pages), so new imports never wait behind it.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def extract_text(source, max_pages: int = 20, page_budget: float = 2.0, on_page=None,
+                 pool: ExtractionPool = None, min_parallel_pages: int = 4) -> tuple[str, int, int]:
+    """
+    Extract text from a PDF. Returns (text, pages_extracted, page_count).
+    Documents with at least `min_parallel_pages` pages (after the max_pages cap)
+    are extracted in parallel page ranges when a pool is given; pages are merged
+    in order and extraction stops after the first page that blows the budget.
+    The budget is only checked between pages, so on the serial path (small
+    documents, or no pool) a single pathological page blocks the caller until it
+    finishes; the parallel path is additionally bounded by an overall deadline.
+    """
+    if hasattr(source, "read"):
+        source = source.read()
+    reader = _open(source)
+    page_count = len(reader.pages)
+    limit = min(page_count, max_pages)
+
+    if pool is None or limit < min_parallel_pages or pool.processes < 2:
+        texts, _ = _extract_serial(reader, limit, page_budget, on_page)
+        return "\n".join(texts), len(texts), page_count
+
+    ranges = page_ranges(limit, pool.processes)
+    results = {}
+    done = 0
+    try:
+        executor = pool.executor()
+        futures = {executor.submit(extract_range, source, start, stop, page_budget): i for i, (start, stop) in enumerate(ranges)}
+        # Overall deadline: every page at its budget, spread over the workers, plus startup slack
+        deadline = page_budget * limit / len(ranges) + 10
+        for future in as_completed(futures, timeout=deadline):
+            texts, cut = future.result()
+            results[futures[future]] = (texts, cut)
+            done += len(texts)
+            if on_page is not None:
+                on_page(done, limit)
+    except FuturesTimeout:
+        # Past the deadline the document is too slow to redo serially; keep what finished
+        pool.reset()
+    except (BrokenProcessPool, OSError):
+        pool.reset()
+        if not results:
+            # Pool unusable: fall back to extracting in this process
+            texts, _ = _extract_serial(reader, limit, page_budget, on_page)
+            return "\n".join(texts), len(texts), page_count
+
+    merged = []
+    for i in range(len(ranges)):
+        if i not in results:
+            break
+        texts, cut = results[i]
+        merged.extend(texts)
+        if cut:
+            break
+    return "\n".join(merged), len(merged), page_count
+
+
+def _extract_serial(reader, limit: int, page_budget: float, on_page=None) -> tuple[list[str], bool]:
+    texts = []
+    for index in range(limit):
+        started = time.monotonic()
+        try:
+            texts.append(reader.pages[index].extract_text() or "")
+        except Exception:
+            texts.append("")
+        if on_page is not None:
+            on_page(len(texts), limit)
+        if time.monotonic() - started > page_budget:
+            return texts, True
+    return texts, False
@@ -0,0 +1,134 @@
+"""
+Background PDF import pipeline for resume uploads.
+Uploads are hashed and handed to a background job that extracts text page by
+page (with a page limit and per-page time budget) and reports progress.
+Extracted text and the parsed resume fields are cached per file hash, so
+re-uploading the same CV is instant and costs no AI tokens.
+"""
+import hashlib
+import os
+
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import PdfImport
+from app.services.jobs import job_queue
+from app.services.pdf_extract import ExtractionPool, extract_text
+from app.services.resume_parser import parse_resume
+
+
+_pool = None
+
+
+def _extraction_pool():
+    """Process pool for page-parallel extraction (None when disabled by config)."""
+    global _pool
+    processes = int(current_app.config.get("PDF_EXTRACT_PROCESSES", 0) or 0)
+    if processes < 2:
+        return None
+    tasks_per_child = int(current_app.config.get("PDF_EXTRACT_TASKS_PER_CHILD", 50))
+    if _pool is None or (_pool.processes, _pool.tasks_per_child) != (processes, tasks_per_child):
+        _pool = ExtractionPool(processes=processes, tasks_per_child=tasks_per_child)
+    return _pool
+
+
+def extract_pages(source, max_pages: int = 20, page_budget: float = 2.0, on_page=None) -> tuple[str, int, int]:
+    """
+    Stream text out of a PDF, page-parallel across the extraction pool for
+    larger documents. Stops at max_pages, or after any page that exceeds
+    page_budget seconds (pathological content). Returns (text, pages_extracted, page_count).
+    """
+    try:
+        pool = _extraction_pool()
+        min_parallel = int(current_app.config.get("PDF_PARALLEL_MIN_PAGES", 4))
+    except RuntimeError:
+        pool, min_parallel = None, 4
+    return extract_text(source, max_pages, page_budget, on_page=on_page, pool=pool, min_parallel_pages=min_parallel)
+
+
+def _import_dir() -> str:
+    path = os.path.join(current_app.config.get("UPLOAD_FOLDER", "uploads"), "imports")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _parse(text: str, user_id: int = None) -> dict:
+    threshold = float(current_app.config.get("PARSE_AI_THRESHOLD", 0.75))
+    return parse_resume(text, user_id=user_id, threshold=threshold) if text else {}
+
+
+def cached_resume_data(file_hash: str, user_id: int = None) -> dict | None:
+    """Parsed resume data for a previously imported file, or None if never seen."""
+    record = db.session.get(PdfImport, file_hash)
+    if record is None:
+        return None
+    if record.parsed is None:
+        record.parsed = _parse(record.text, user_id)
+        db.session.commit()
+    return dict(record.parsed)
+
+
+def start_import(file_storage, user_id: int, template_name: str = "modern_minimal") -> dict:
+    """
+    Begin importing an uploaded PDF.
+    Returns {"resume_data": ...} immediately on a cache hit, otherwise {"job_id": ...}.
+    """
+    raw = file_storage.read()
+    file_hash = hashlib.sha256(raw).hexdigest()
+
+    data = cached_resume_data(file_hash, user_id)
+    if data is not None:
+        if data:
+            data["template_name"] = template_name
+        return {"resume_data": data}
+
+    path = os.path.join(_import_dir(), f"{file_hash}.pdf")
+    if not os.path.exists(path):
+        with open(path, "wb") as f:
+            f.write(raw)
+    job_id = job_queue.submit(
+        "pdf_import",
+        {"file_hash": file_hash, "path": path, "template_name": template_name},
+        user_id=user_id,
+    )
+    return {"job_id": job_id}
+
+
+@job_queue.register("pdf_import")
+def _run_pdf_import(payload, user_id):
+    """Job handler: extract, parse, and cache both by file hash. The upload is always removed."""
+    try:
+        return _import_upload(payload, user_id)
+    finally:
+        try:
+            os.remove(payload["path"])
+        except OSError:
+            pass
+
+
+def _import_upload(payload, user_id):
+    file_hash = payload["file_hash"]
+    data = cached_resume_data(file_hash, user_id)
+    if data is None:
+        max_pages = int(current_app.config.get("PDF_IMPORT_MAX_PAGES", 20))
+        page_budget = float(current_app.config.get("PDF_IMPORT_PAGE_BUDGET", 2.0))
+
+        def _progress(done, total):
+            job_queue.report_progress({"pages_done": done, "pages_total": total})
+
+        try:
+            text, extracted, page_count = extract_pages(payload["path"], max_pages, page_budget, on_page=_progress)
+        except Exception as e:
+            return None, f"Could not read PDF: {e}"
+
+        data = _parse(text, user_id)
+        db.session.add(PdfImport(file_hash=file_hash, page_count=page_count, pages_extracted=extracted, text=text, parsed=data))
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+
+    if data:
+        data["template_name"] = payload.get("template_name", "modern_minimal")
+    return {"resume_data": data}, None
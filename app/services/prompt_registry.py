@@ -0,0 +1,134 @@
+"""
+Prompt registry for the large system prompts in prompts.py.
+Each prompt is registered by name with a full and a compact variant. A
+variant's version is a hash of its text, so usage can always be traced to
+the exact wording that produced it, and its token count is estimated once
+at startup. The system message is the frozen prompt text and nothing else;
+per-request data only ever goes in the user message, so every call with the
+same prompt shares a byte-identical prefix that upstream prefix caching can
+reuse. Variants are chosen per endpoint with AI_PROMPT_VARIANTS, e.g.
+"*=full,suggest_stream=compact" ("*" sets the default).
+"""
+import functools
+import hashlib
+import logging
+import math
+import re
+import threading
+from collections import Counter
+
+from flask import current_app
+
+import prompts
+
+logger = logging.getLogger(__name__)
+
+VARIANTS = ("full", "compact")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    BPE-style token estimate (~4 characters per word piece, one token per
+    symbol). No tokenizer dependency; the router's reported usage is exact.
+    """
+    words = re.findall(r"\w+", text)
+    return sum(math.ceil(len(w) / 4) for w in words) + len(re.findall(r"[^\w\s]", text))
+
+
+class Prompt:
+    """One registered prompt variant; str(prompt) is the system message text."""
+
+    __slots__ = ("name", "variant", "text", "version", "tokens")
+
+    def __init__(self, name: str, variant: str, text: str):
+        self.name = name
+        self.variant = variant
+        self.text = text
+        self.version = f"{variant}-{hashlib.sha256(text.encode('utf-8')).hexdigest()[:8]}"
+        self.tokens = estimate_tokens(text)
+
+    @property
+    def label(self) -> str:
+        return f"{self.name}@{self.version}"
+
+    def __str__(self):
+        return self.text
+
+    def __repr__(self):
+        return f"<Prompt {self.label} ~{self.tokens} tokens>"
+
+
+@functools.lru_cache(maxsize=8)
+def _parse_variants(setting: str) -> dict:
+    """"endpoint=variant,..." -> {endpoint: variant}; unknown variants are ignored."""
+    selection = {}
+    for item in (setting or "").split(","):
+        endpoint, _, variant = item.partition("=")
+        endpoint, variant = endpoint.strip(), variant.strip().lower()
+        if not endpoint:
+            continue
+        if variant not in VARIANTS:
+            logger.warning("AI_PROMPT_VARIANTS: unknown variant %r for %s (using full)", variant, endpoint)
+            continue
+        selection[endpoint] = variant
+    return selection
+
+
+class PromptRegistry:
+    """Named, versioned prompts with per-endpoint variant selection and per-version usage counters."""
+
+    def __init__(self):
+        self._prompts = {}  # (name, variant) -> Prompt
+        self._usage = {}  # label -> Counter
+        self._lock = threading.Lock()
+
+    def register(self, name: str, full: str, compact: str = None):
+        self._prompts[(name, "full")] = Prompt(name, "full", full)
+        if compact:
+            self._prompts[(name, "compact")] = Prompt(name, "compact", compact)
+
+    def init_app(self, app):
+        _parse_variants(app.config.get("AI_PROMPT_VARIANTS", ""))  # warn about bad settings at startup
+        for prompt in self._prompts.values():
+            logger.info("Prompt %s: ~%d tokens", prompt.label, prompt.tokens)
+
+    def variant_for(self, endpoint: str = None) -> str:
+        try:
+            setting = current_app.config.get("AI_PROMPT_VARIANTS", "")
+        except RuntimeError:
+            setting = ""
+        selection = _parse_variants(setting)
+        return selection.get(endpoint) or selection.get("*") or "full"
+
+    def get(self, name: str, endpoint: str = None) -> Prompt:
+        """The variant of `name` configured for `endpoint` (full when there is no compact text)."""
+        return self._prompts.get((name, self.variant_for(endpoint))) or self._prompts[(name, "full")]
+
+    def observe(self, prompt: Prompt, usage: dict = None, cached: bool = False):
+        """Count one call made with `prompt` (usage: the router's usage object)."""
+        usage = usage or {}
+        details = usage.get("prompt_tokens_details") or {}
+        with self._lock:
+            counters = self._usage.setdefault(prompt.label, Counter())
+            counters["calls"] += 1
+            if cached:
+                counters["cached_calls"] += 1
+            counters["prompt_tokens"] += int(usage.get("prompt_tokens") or 0)
+            counters["completion_tokens"] += int(usage.get("completion_tokens") or 0)
+            counters["total_tokens"] += int(usage.get("total_tokens") or 0)
+            counters["prefix_cached_tokens"] += int(details.get("cached_tokens") or 0)
+
+    def stats(self) -> dict:
+        """Per prompt version: estimated size and this worker's call / token counters."""
+        with self._lock:
+            usage = {label: dict(counters) for label, counters in self._usage.items()}
+        return {
+            prompt.label: {"name": prompt.name, "version": prompt.version, "tokens": prompt.tokens, **usage.get(prompt.label, {})}
+            for prompt in self._prompts.values()
+        }
+
+
+prompt_registry = PromptRegistry()
+prompt_registry.register("resume_generation", prompts.RESUME_GENERATION_PROMPT, prompts.RESUME_GENERATION_PROMPT_COMPACT)
+prompt_registry.register("resume_wizard", prompts.RESUME_WIZARD_PROMPT, prompts.RESUME_WIZARD_PROMPT_COMPACT)
+prompt_registry.register("resume_enhancer", prompts.RESUME_ENHANCER_PROMPT, prompts.RESUME_ENHANCER_PROMPT_COMPACT)
@@ -0,0 +1,241 @@
+"""
+Public resume sharing.
+Publishing renders a standalone HTML snapshot once and stores it under a
+content hash; /r/<slug> is a short-lived pointer to that immutable file, so
+public traffic never renders, calls the model or writes per hit. View counts
+are buffered in memory per worker and added to resumes.views in batches.
+A snapshot rendered while the AI enhancement was unavailable is marked as a
+fallback and re-rendered in the background when the link is next visited.
+"""
+import atexit
+import hashlib
+import logging
+import os
+import secrets
+import threading
+import time
+from collections import Counter
+
+from flask import current_app, render_template
+from sqlalchemy import bindparam, update
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app import db
+from app.models import Resume
+from app.services.jobs import QueueFull, job_queue
+from app.services.resume_builder import TEMPLATES, build_resume_html, has_stored_enhancement
+from app.services.resume_store import resume_to_data
+
+logger = logging.getLogger(__name__)
+
+# resume id -> monotonic time of the last fallback re-render queued (per process)
+_retried = {}
+_retry_lock = threading.Lock()
+
+# Snapshots are static documents: inline styles and data: images only, no scripts, forms or framing
+SNAPSHOT_CSP = (
+    "default-src 'none'; style-src 'unsafe-inline'; img-src data:; script-src 'none'; "
+    "base-uri 'none'; form-action 'none'; frame-ancestors 'none'; sandbox"
+)
+
+
+def _snapshot_dir() -> str:
+    path = current_app.config.get("PUBLIC_RESUME_DIR") or os.path.join(current_app.instance_path, "public_resumes")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def snapshot_path(snapshot: str) -> str | None:
+    """Path of a stored snapshot, or None for unknown / malformed hashes."""
+    if not snapshot or len(snapshot) != 32 or any(c not in "0123456789abcdef" for c in snapshot):
+        return None
+    path = os.path.join(_snapshot_dir(), f"{snapshot}.html")
+    return path if os.path.exists(path) else None
+
+
+def _remove_snapshot(snapshot: str):
+    path = snapshot_path(snapshot)
+    if path is not None:
+        for name in (path, f"{path}.fallback"):
+            try:
+                os.remove(name)
+            except OSError:
+                pass
+
+
+def is_fallback_snapshot(snapshot: str) -> bool:
+    """Whether a stored snapshot was rendered without the AI enhancement."""
+    path = snapshot_path(snapshot)
+    return path is not None and os.path.exists(f"{path}.fallback")
+
+
+def refresh_snapshot(resume) -> str:
+    """
+    Render and store the public snapshot for a published resume; call after
+    publishing or updating it. Returns the snapshot hash (caller commits).
+    """
+    template_name = resume.template_name if resume.template_name in TEMPLATES else "modern_minimal"
+    resume_data = resume_to_data(resume)
+    body = build_resume_html(resume_data, template_name)
+    html = render_template("resume_public.html", content=body, title=resume.title)
+    # Slug is part of the hash so identical resumes never share (or delete) a file
+    snapshot = hashlib.sha256(f"{resume.public_slug}\n{html}".encode("utf-8")).hexdigest()[:32]
+
+    path = os.path.join(_snapshot_dir(), f"{snapshot}.html")
+    if not os.path.exists(path):
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(html)
+        os.replace(tmp, path)
+    if not has_stored_enhancement(resume_data):
+        # Model error: serve this, but don't let it stand in for the real snapshot
+        open(f"{path}.fallback", "a").close()
+
+    previous, resume.public_snapshot = resume.public_snapshot, snapshot
+    if previous and previous != snapshot:
+        _remove_snapshot(previous)
+    return snapshot
+
+
+def _store_sharing(resume, **values):
+    """
+    Write sharing columns with a core UPDATE that keeps updated_at, which
+    tracks content edits (dashboard order, page validators), not sharing.
+    """
+    # Set without history first so autoflush never issues an ORM update (and its onupdate)
+    for key, value in values.items():
+        set_committed_value(resume, key, value)
+    table = Resume.__table__
+    db.session.execute(
+        update(table)
+        .where(table.c.id == resume.id)
+        .values(**values, updated_at=table.c.updated_at)
+    )
+    db.session.commit()
+
+
+def publish(resume) -> str:
+    """Make a resume public (assigning a slug on first publish) and snapshot it."""
+    slug = resume.public_slug or secrets.token_urlsafe(9)
+    set_committed_value(resume, "public_slug", slug)  # the snapshot hash includes it
+    snapshot = refresh_snapshot(resume)
+    _store_sharing(resume, is_public=True, public_slug=slug, public_snapshot=snapshot)
+    return slug
+
+
+def unpublish(resume):
+    """Stop sharing a resume; the slug is kept so republishing restores the same link."""
+    if resume.public_snapshot:
+        _remove_snapshot(resume.public_snapshot)
+    _store_sharing(resume, is_public=False, public_snapshot=None)
+
+
+def request_snapshot_retry(resume) -> str | None:
+    """
+    Queue a re-render of a fallback snapshot (call on public hits). At most one
+    per resume every PUBLIC_SNAPSHOT_RETRY_AFTER seconds per process, so an
+    outage doesn't turn traffic into model calls. Returns the job id or None.
+    """
+    retry_after = float(current_app.config.get("PUBLIC_SNAPSHOT_RETRY_AFTER", 600))
+    now = time.monotonic()
+    with _retry_lock:
+        last = _retried.get(resume.id)
+        if last is not None and now - last < retry_after:
+            return None
+        _retried[resume.id] = now
+    try:
+        return job_queue.submit("public_snapshot", {"resume_id": resume.id}, user_id=resume.user_id)
+    except QueueFull:
+        return None
+
+
+@job_queue.register("public_snapshot")
+def _run_public_snapshot(payload, user_id):
+    """Job handler: re-render a fallback snapshot; sharing columns only, updated_at untouched."""
+    resume = db.session.get(Resume, payload["resume_id"])
+    if resume is None or resume.user_id != user_id or not resume.is_public:
+        return None, "Resume not found."
+    if is_fallback_snapshot(resume.public_snapshot):
+        _store_sharing(resume, public_snapshot=refresh_snapshot(resume))
+    return {"snapshot": resume.public_snapshot}, None
+
+
+class ViewCounter:
+    """Per-process buffer of public view counts, flushed as one batched UPDATE."""
+
+    def __init__(self):
+        self.app = None
+        self.flush_size = 100
+        self.flush_interval = 30.0
+        self._counts = Counter()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._atexit_registered = False
+
+    def init_app(self, app):
+        self.app = app
+        self.flush_size = int(app.config.get("PUBLIC_VIEW_FLUSH_SIZE", 100))
+        self.flush_interval = float(app.config.get("PUBLIC_VIEW_FLUSH_INTERVAL", 30))
+        if not self._atexit_registered:
+            atexit.register(self.flush)
+            self._atexit_registered = True
+
+    def hit(self, resume_id: int):
+        """Count one view; never touches the database."""
+        self._ensure_flusher()
+        with self._lock:
+            self._counts[resume_id] += 1
+            full = sum(self._counts.values()) >= self.flush_size
+        if full:
+            self._wake.set()
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(self._counts.values())
+
+    def flush(self) -> int:
+        """Add buffered counts to resumes.views (one statement per batch); returns views written."""
+        with self._flush_lock:
+            with self._lock:
+                counts, self._counts = self._counts, Counter()
+            if not counts or self.app is None:
+                return 0
+            table = Resume.__table__
+            stmt = (
+                update(table)
+                .where(table.c.id == bindparam("b_id"))
+                # Keep updated_at: views are not an edit (it keys ETags, PDFs and dashboard order)
+                .values(views=db.func.coalesce(table.c.views, 0) + bindparam("b_n"), updated_at=table.c.updated_at)
+            )
+            try:
+                with self.app.app_context(), db.engine.begin() as conn:
+                    conn.execute(stmt, [{"b_id": rid, "b_n": n} for rid, n in counts.items()])
+            except Exception:
+                logger.exception("Public view flush failed; re-buffering %d resumes", len(counts))
+                with self._lock:
+                    self._counts.update(counts)
+                return 0
+            return sum(counts.values())
+
+    def _ensure_flusher(self):
+        # Started lazily and per pid so forked gunicorn workers each get their own thread
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="resumeghana-view-flush", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(timeout=self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+
+view_counter = ViewCounter()
@@ -0,0 +1,146 @@
+"""
+Token-bucket rate limiting for the AI API.
+Each key (user, IP) holds a bucket of `limit` tokens refilled continuously
+over `period` seconds; a request spends one token. Checking a key is O(1):
+one dict entry (memory backend) or one primary-key row (database backend,
+shared across gunicorn workers).
+"""
+import logging
+import math
+import re
+import threading
+import time
+
+from flask import current_app, jsonify, request
+from flask_login import current_user
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+logger = logging.getLogger(__name__)
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+def parse_rate(rate: str) -> tuple[int, float]:
+    """Parse "30 per minute" / "100/hour" into (limit, period_seconds)."""
+    match = re.fullmatch(r"\s*(\d+)\s*(?:per|/)\s*(second|minute|hour|day)s?\s*", str(rate or ""), flags=re.IGNORECASE)
+    if not match:
+        raise ValueError(f"Invalid rate limit: {rate!r}")
+    return int(match.group(1)), float(_PERIODS[match.group(2).lower()])
+
+
+def _take(tokens: float, updated_at: float, now: float, limit: int, period: float) -> tuple[float, bool, float]:
+    """Refill and try to spend one token. Returns (new_tokens, allowed, retry_after)."""
+    rate = limit / period
+    tokens = min(float(limit), tokens + (now - updated_at) * rate)
+    if tokens >= 1:
+        return tokens - 1, True, 0.0
+    return tokens, False, (1 - tokens) / rate
+
+
+class MemoryBackend:
+    """Per-process buckets (single worker / development)."""
+
+    def __init__(self, max_keys: int = 100000):
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self.max_keys = max_keys
+
+    def hit(self, key: str, limit: int, period: float) -> tuple[bool, float]:
+        now = time.time()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (float(limit), now))
+            tokens, allowed, retry_after = _take(tokens, updated_at, now, limit, period)
+            if len(self._buckets) >= self.max_keys and key not in self._buckets:
+                # Oldest-inserted keys go first; their buckets have most likely refilled
+                self._buckets.pop(next(iter(self._buckets)))
+            self._buckets[key] = (tokens, now)
+        return allowed, retry_after
+
+
+class DatabaseBackend:
+    """
+    Buckets in the rate_limit_buckets table, shared by all workers. Postgres only:
+    SELECT ... FOR UPDATE is what serializes concurrent hits on a key, and SQLite
+    ignores it (concurrent writers there just hit "database is locked").
+    """
+
+    def hit(self, key: str, limit: int, period: float) -> tuple[bool, float]:
+        from app import db
+        from app.models import RateLimitBucket
+        table = RateLimitBucket.__table__
+        now = time.time()
+        for _ in range(2):
+            try:
+                with db.engine.begin() as conn:
+                    row = conn.execute(
+                        select(table.c.tokens, table.c.updated_at).where(table.c.key == key).with_for_update()
+                    ).first()
+                    if row is None:
+                        tokens, allowed, retry_after = _take(float(limit), now, now, limit, period)
+                        conn.execute(insert(table).values(key=key, tokens=tokens, updated_at=now))
+                    else:
+                        tokens, allowed, retry_after = _take(row.tokens, row.updated_at, now, limit, period)
+                        conn.execute(update(table).where(table.c.key == key).values(tokens=tokens, updated_at=now))
+                return allowed, retry_after
+            except IntegrityError:
+                # Another worker created the bucket first; retry against its row
+                continue
+            except OperationalError:
+                # Lock timeout or database unavailable: retry once, then let the request through
+                logger.warning("Rate limit check failed for %s", key, exc_info=True)
+                continue
+        # Fail open: a limiter outage must not turn every AI call into a 500
+        return True, 0.0
+
+
+class RateLimiter:
+    """Applies configured limits to blueprints; returns 429 with Retry-After when exceeded."""
+
+    def __init__(self):
+        self.backend = None
+        self.enabled = True
+        self.user_limit = (30, 60.0)
+        self.ip_limit = (60, 60.0)
+
+    def init_app(self, app):
+        self.enabled = bool(app.config.get("AI_RATE_LIMIT_ENABLED", True))
+        self.user_limit = parse_rate(app.config.get("AI_RATE_LIMIT", "30 per minute"))
+        self.ip_limit = parse_rate(app.config.get("AI_RATE_LIMIT_IP", "60 per minute"))
+        backend = str(app.config.get("AI_RATE_LIMIT_BACKEND", "memory")).lower()
+        self.backend = DatabaseBackend() if backend == "database" else MemoryBackend()
+
+    def limit_blueprint(self, blueprint, methods=("POST",)):
+        """Rate-limit requests to a blueprint (by default only calls that hit the model)."""
+        @blueprint.before_request
+        def _check_rate_limit():
+            if request.method not in methods:
+                return None
+            return self.check(blueprint.name)
+        return blueprint
+
+    def check(self, scope: str):
+        """Spend a token for the caller's user and IP; returns a 429 response or None."""
+        if not self.enabled or self.backend is None:
+            return None
+        keys = [(f"{scope}:ip:{_client_ip()}", self.ip_limit)]
+        if current_user.is_authenticated:
+            keys.insert(0, (f"{scope}:user:{current_user.id}", self.user_limit))
+        for key, (limit, period) in keys:
+            allowed, retry_after = self.backend.hit(key, limit, period)
+            if not allowed:
+                resp = jsonify({"error": "Rate limit exceeded. Please slow down and try again shortly."})
+                resp.status_code = 429
+                resp.headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+                return resp
+        return None
+
+
+def _client_ip() -> str:
+    """Client address; trusts the proxy's X-Forwarded-For entry only when configured (Render)."""
+    if current_app.config.get("RATE_LIMIT_TRUST_PROXY") and request.access_route:
+        # Rightmost entry is the one appended by our own proxy
+        return request.access_route[-1]
+    return request.remote_addr or "unknown"
+
+
+rate_limiter = RateLimiter()
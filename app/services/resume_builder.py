@@ -1,11 +1,30 @@
 """
 Resume builder service: injects data into templates and generates HTML.
 Uses AI to generate professional summary, polish bullets, and add career value.
+AI output is persisted by input hash so repeat renders skip the model call.
 """
+import hashlib
 import json
 import os
 import re
-from jinja2 import Template
+import threading
+from collections import OrderedDict
+from jinja2 import ChoiceLoader, DictLoader, Environment, FileSystemBytecodeCache, FileSystemLoader, TemplateNotFound
+from markupsafe import escape
+from sqlalchemy.exc import IntegrityError
+
+# Bump when the enhancement prompt or output shape changes to invalidate stored results
+ENHANCEMENT_VERSION = 1
+# Bump when rendered HTML changes for the same data (ETags, PDFs and snapshot keys)
+RENDER_VERSION = 2
+
+_TEMPLATE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "templates", "resume_templates"))
+_FALLBACK_NAME = "_fallback.html"
+
+# Per-process memo of enhanced render contexts, keyed by a hash of the full resume data
+_CONTEXT_CACHE_SIZE = 256
+_context_cache = OrderedDict()
+_context_lock = threading.Lock()
 
 # Template names available
 TEMPLATES = [
@@ -16,13 +35,66 @@ TEMPLATES = [
 ]
 
 
-def _load_template(template_name: str) -> str:
-    """Load template HTML by name."""
-    path = os.path.join(os.path.dirname(__file__), "..", "templates", "resume_templates", f"{template_name}.html")
-    if os.path.exists(path):
-        with open(path, "r") as f:
-            return f.read()
-    return _get_fallback_template()
+class TemplateRegistry:
+    """
+    Compiled resume templates backed by a Jinja Environment.
+    Templates are parsed once (bytecode cached on disk), reloaded on mtime
+    change outside production, and missing files are reported at startup.
+    """
+
+    def __init__(self):
+        self.env = None
+        self.missing = set()
+
+    def init_app(self, app=None):
+        """Build the environment and precompile every entry in TEMPLATES."""
+        production = bool(app.config.get("IS_PRODUCTION")) if app is not None else False
+        bytecode_cache = None
+        if app is not None:
+            cache_dir = app.config.get("TEMPLATE_CACHE_DIR") or os.path.join(app.instance_path, "jinja_cache")
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                # Compiled code depends on env options (autoescape); the pattern keeps older caches out
+                bytecode_cache = FileSystemBytecodeCache(cache_dir, pattern="__jinja2_escaped_%s.cache")
+            except OSError:
+                bytecode_cache = None
+
+        self.env = Environment(
+            loader=ChoiceLoader([
+                FileSystemLoader(_TEMPLATE_DIR),
+                DictLoader({_FALLBACK_NAME: _get_fallback_template()}),
+            ]),
+            bytecode_cache=bytecode_cache,
+            auto_reload=not production,
+            # Resume fields are user (and model) text; only the pre-escaped *_format fragments are |safe
+            autoescape=True,
+        )
+
+        self.missing = set()
+        for name in TEMPLATES:
+            try:
+                self.env.get_template(f"{name}.html")
+            except TemplateNotFound:
+                self.missing.add(name)
+        self.env.get_template(_FALLBACK_NAME)
+
+        if self.missing and app is not None:
+            app.logger.warning(
+                "Resume templates missing from %s, using fallback: %s",
+                _TEMPLATE_DIR, ", ".join(sorted(self.missing)),
+            )
+        return self
+
+    def get(self, template_name: str):
+        """Return the compiled template (fallback for unknown or missing names)."""
+        if self.env is None:
+            self.init_app()
+        if template_name not in TEMPLATES or template_name in self.missing:
+            return self.env.get_template(_FALLBACK_NAME)
+        return self.env.get_template(f"{template_name}.html")
+
+
+template_registry = TemplateRegistry()
 
 
 def _get_fallback_template() -> str:
@@ -43,6 +115,86 @@ def _get_fallback_template() -> str:
 """
 
 
+def _enhancement_inputs(resume_data: dict) -> dict:
+    """Collect the fields the AI enhancement depends on."""
+    return {
+        "role": resume_data.get("role", "Professional"),
+        "skills": resume_data.get("skills", ""),
+        "experience": resume_data.get("experience", ""),
+        "education": resume_data.get("education", ""),
+        "career_objective": resume_data.get("career_objective", "") or resume_data.get("abilities", ""),
+        "job_level": resume_data.get("job_level", ""),
+        "years_experience": resume_data.get("years_experience", ""),
+    }
+
+
+def enhancement_key(resume_data: dict) -> str:
+    """Content hash of the enhancement inputs (changes when source sections change)."""
+    payload = {"v": ENHANCEMENT_VERSION, "inputs": _enhancement_inputs(resume_data)}
+    raw = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def render_key(resume, variant: str = "html") -> str:
+    """
+    Version key of a saved resume's rendered output (used as ETag and file key).
+    Changes with the resume's updated_at, its template, ENHANCEMENT_VERSION or RENDER_VERSION.
+    """
+    stamp = resume.updated_at.isoformat() if resume.updated_at else ""
+    template_name = resume.template_name if resume.template_name in TEMPLATES else "modern_minimal"
+    raw = f"{resume.id}:{stamp}:{template_name}:{ENHANCEMENT_VERSION}:{RENDER_VERSION}:{variant}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+def _context_key(resume_data: dict) -> str:
+    """Hash of the full resume data (render context depends on more than the AI inputs)."""
+    raw = json.dumps({"v": ENHANCEMENT_VERSION, "data": resume_data}, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _stored_enhancement(resume_data: dict) -> dict | None:
+    """The persisted AI enhancement for these inputs, or None if there isn't one."""
+    from app.models import ResumeEnhancement
+
+    stored = ResumeEnhancement.query.filter_by(content_hash=enhancement_key(resume_data)).first()
+    return dict(stored.content or {}) if stored is not None else None
+
+
+def has_stored_enhancement(resume_data: dict) -> bool:
+    """
+    Whether the AI enhancement for these inputs is persisted. False right after
+    build_resume_html means it fell back to the raw sections (model error), so
+    the output must not be cached as if it were final.
+    """
+    return _stored_enhancement(resume_data) is not None
+
+
+def _get_enhancement(resume_data: dict) -> dict:
+    """
+    Return AI enhancement for resume data, reading the persisted result when the
+    inputs are unchanged and calling the model only on a miss.
+    """
+    from app import db
+    from app.models import ResumeEnhancement
+
+    stored = _stored_enhancement(resume_data)
+    if stored is not None:
+        return stored
+
+    enhanced = _ai_enhance(resume_data)
+    if not enhanced:
+        # Don't persist failures — next render retries the model
+        return enhanced
+
+    db.session.add(ResumeEnhancement(content_hash=enhancement_key(resume_data), content=enhanced))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # A concurrent render stored the same inputs first
+        db.session.rollback()
+    return enhanced
+
+
 def _ai_enhance(resume_data: dict) -> dict:
     """
     Use AI to generate a professional summary, polish experience bullets,
@@ -51,14 +203,14 @@ def _ai_enhance(resume_data: dict) -> dict:
     """
     from app.services.ai_service import _hf_json
 
-    role = resume_data.get("role", "Professional")
-    name = resume_data.get("name", "Candidate")
-    skills = resume_data.get("skills", "")
-    experience_raw = resume_data.get("experience", "")
-    education = resume_data.get("education", "")
-    career_objective = resume_data.get("career_objective", "") or resume_data.get("abilities", "")
-    job_level = resume_data.get("job_level", "")
-    years_exp = resume_data.get("years_experience", "")
+    inputs = _enhancement_inputs(resume_data)
+    role = inputs["role"]
+    skills = inputs["skills"]
+    experience_raw = inputs["experience"]
+    education = inputs["education"]
+    career_objective = inputs["career_objective"]
+    job_level = inputs["job_level"]
+    years_exp = inputs["years_experience"]
 
     system_prompt = """You are a senior resume writer. Given a candidate's raw resume data, produce polished, professional content.
 
@@ -100,17 +252,42 @@ Raw Experience:
         return {}
 
 
-def build_resume_html(resume_data: dict, template_name: str = "modern_minimal") -> str:
+def enhance_resume(resume_data: dict) -> dict:
     """
-    Build final HTML resume by injecting data into the selected template.
-    Uses AI to enhance content before rendering.
+    Enhance stage: run (or reuse) the AI enhancement and format every section.
+    Returns a template-independent render context that any template can apply.
     """
-    template_name = template_name if template_name in TEMPLATES else "modern_minimal"
-    html = _load_template(template_name)
+    key = _context_key(resume_data)
+    with _context_lock:
+        cached = _context_cache.get(key)
+        if cached is not None:
+            _context_cache.move_to_end(key)
+            return dict(cached)
+
+    # AI enhancement — stored result when inputs are unchanged
+    enhanced = _get_enhancement(resume_data)
+    context = _build_context(resume_data, enhanced)
+
+    if enhanced:
+        # Only memoize contexts built from a real enhancement so failures retry
+        with _context_lock:
+            _context_cache[key] = dict(context)
+            while len(_context_cache) > _CONTEXT_CACHE_SIZE:
+                _context_cache.popitem(last=False)
+    return context
+
+
+def stored_context(resume_data: dict) -> dict:
+    """
+    Render context for background renders (thumbnails): the persisted
+    enhancement if there is one, otherwise the formatted raw sections.
+    Never calls the model.
+    """
+    return _build_context(resume_data, _stored_enhancement(resume_data) or {})
 
-    # Run AI enhancement
-    enhanced = _ai_enhance(resume_data)
 
+def _build_context(resume_data: dict, enhanced: dict) -> dict:
+    """Format every section, preferring the AI-enhanced text where present."""
     # Professional summary — AI-generated or fallback to user input
     summary = enhanced.get("professional_summary", "")
     if not summary:
@@ -131,7 +308,7 @@ def build_resume_html(resume_data: dict, template_name: str = "modern_minimal")
 
     full_name = resume_data.get("name", "Your Name")
 
-    context = {
+    return {
         "full_name": full_name,
         "summary": summary,
         "experience": experience,
@@ -146,8 +323,24 @@ def build_resume_html(resume_data: dict, template_name: str = "modern_minimal")
         "certifications": resume_data.get("certifications", ""),
     }
 
-    t = Template(html)
-    return t.render(**context)
+
+def render_resume(context: dict, template_name: str = "modern_minimal") -> str:
+    """Render stage: apply a precompiled template to an enhanced context (no AI, no I/O)."""
+    template_name = template_name if template_name in TEMPLATES else "modern_minimal"
+    return template_registry.get(template_name).render(**context)
+
+
+def render_all_templates(context: dict) -> dict:
+    """Render one enhanced context with every available template."""
+    return {name: render_resume(context, name) for name in TEMPLATES}
+
+
+def build_resume_html(resume_data: dict, template_name: str = "modern_minimal") -> str:
+    """
+    Build final HTML resume by injecting data into the selected template.
+    Uses AI to enhance content before rendering (persisted per input hash).
+    """
+    return render_resume(enhance_resume(resume_data), template_name)
 
 
 def _format_bullet_list(bullets: list) -> str:
@@ -161,7 +354,7 @@ def _format_bullet_list(bullets: list) -> str:
             continue
         # Remove leading bullet chars if present
         b = re.sub(r"^[•\-–—]\s*", "", b)
-        items.append(f"<li>{b}</li>")
+        items.append(f"<li>{escape(b)}</li>")
     return f'<ul>{"".join(items)}</ul>' if items else "<p>No experience listed.</p>"
 
 
@@ -175,8 +368,8 @@ def _format_experience(text: str) -> str:
     for line in lines:
         line = re.sub(r"^[•\-–—]\s*", "", line)
         if line:
-            items.append(f"<li>{line}</li>")
-    return f'<ul>{"".join(items)}</ul>' if items else f"<p>{text}</p>"
+            items.append(f"<li>{escape(line)}</li>")
+    return f'<ul>{"".join(items)}</ul>' if items else f"<p>{escape(text)}</p>"
 
 
 def _format_skills(text: str) -> str:
@@ -185,8 +378,8 @@ def _format_skills(text: str) -> str:
         return "<p>No skills listed.</p>"
     # Split on commas, semicolons, or newlines
     parts = [p.strip() for p in re.split(r"[,;\n]+", text) if p.strip()]
-    tags = " ".join(f'<span class="skill-tag">{s}</span>' for s in parts)
-    return f'<div class="skills">{tags}</div>' if tags else f"<p>{text}</p>"
+    tags = " ".join(f'<span class="skill-tag">{escape(s)}</span>' for s in parts)
+    return f'<div class="skills">{tags}</div>' if tags else f"<p>{escape(text)}</p>"
 
 
 def _format_education(text: str) -> str:
@@ -194,4 +387,4 @@ def _format_education(text: str) -> str:
     if not text:
         return "<p>No education listed.</p>"
     lines = [l.strip() for l in text.replace("---", "\n").split("\n") if l.strip()]
-    return "<br>".join(lines) if lines else f"<p>{text}</p>"
+    return "<br>".join(str(escape(l)) for l in lines) if lines else f"<p>{escape(text)}</p>"
@@ -0,0 +1,88 @@
+"""
+Single-document resume storage (resumes.document).
+One versioned JSON document per resume, laid out like VALIDATOR.JSON
+(identity / summary_inputs / experience / education / skills /
+optional_sections / job_type). Free-text builder fields are kept verbatim
+under "raw" so the document round-trips resume_data losslessly.
+"""
+
+DOCUMENT_SCHEMA_VERSION = 1
+
+STORAGE_MODES = ("sections", "dual", "document")
+
+# resume_data keys stored in the document (and editable in place)
+EDITABLE_FIELDS = (
+    "name", "role", "email", "phone", "country", "job_level", "location_target", "career_objective", "abilities",
+    "years_experience", "functional_focus", "experience", "education", "skills", "certifications",
+    "relevant_coursework", "links", "job_type",
+)
+
+
+def document_from_data(resume_data: dict) -> dict:
+    """Versioned resume document for a resume_data dict."""
+    d = resume_data or {}
+    return {
+        "schema_version": DOCUMENT_SCHEMA_VERSION,
+        "identity": {
+            "name": d.get("name") or "",
+            "target_title": d.get("role") or "",
+            "email": d.get("email") or "",
+            "phone": d.get("phone") or "",
+            "country": d.get("country") or "",
+            "job_level": d.get("job_level") or "",
+            "job_location": d.get("location_target") or "",
+        },
+        "summary_inputs": {
+            "career_objective": d.get("career_objective") or "",
+            "abilities": d.get("abilities") or "",
+            "years_experience": d.get("years_experience") or "",
+            "functional_focus": d.get("functional_focus") or "",
+        },
+        "experience": {"raw": d.get("experience") or ""},
+        "education": {"raw": d.get("education") or ""},
+        "skills": {"raw": d.get("skills") or ""},
+        "optional_sections": {
+            "certifications": d.get("certifications") or "",
+            "relevant_coursework": d.get("relevant_coursework") or "",
+            "links": d.get("links") or "",
+        },
+        "job_type": d.get("job_type") or "",
+    }
+
+
+def upgrade_document(document) -> dict | None:
+    """Bring a stored document to the current schema; None if it can't be read (caller falls back to sections)."""
+    if not isinstance(document, dict):
+        return None
+    version = document.get("schema_version")
+    if version == DOCUMENT_SCHEMA_VERSION:
+        return document
+    # Future schema versions are upgraded here, one step at a time
+    return None
+
+
+def data_from_document(document: dict, title: str = "") -> dict:
+    """resume_data dict for rendering (same keys the section layout produces, plus the extras it drops)."""
+    identity = document.get("identity") or {}
+    summary = document.get("summary_inputs") or {}
+    optional = document.get("optional_sections") or {}
+    return {
+        "name": identity.get("name") or title,
+        "role": identity.get("target_title", ""),
+        "email": identity.get("email", ""),
+        "phone": identity.get("phone", ""),
+        "country": identity.get("country", ""),
+        "links": optional.get("links", ""),
+        "career_objective": summary.get("career_objective") or summary.get("abilities", ""),
+        "experience": (document.get("experience") or {}).get("raw", ""),
+        "education": (document.get("education") or {}).get("raw", ""),
+        "skills": (document.get("skills") or {}).get("raw", ""),
+        "abilities": summary.get("abilities", ""),
+        "years_experience": summary.get("years_experience", ""),
+        "functional_focus": summary.get("functional_focus", ""),
+        "job_level": identity.get("job_level", ""),
+        "location_target": identity.get("job_location", ""),
+        "certifications": optional.get("certifications", ""),
+        "relevant_coursework": optional.get("relevant_coursework", ""),
+        "job_type": document.get("job_type", ""),
+    }
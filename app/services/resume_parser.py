@@ -0,0 +1,181 @@
+"""
+Structured resume parser for imported CV text.
+A local heuristic pass (section headings, contact patterns, date ranges,
+bullets) runs first; the model is called once only when its confidence is low.
+"""
+import re
+
+# Heading keyword -> resume_data field
+_HEADINGS = {
+    "career_objective": ("summary", "professional summary", "profile", "professional profile", "objective",
+                         "career objective", "about me", "personal statement"),
+    "experience": ("experience", "work experience", "professional experience", "employment", "employment history",
+                   "work history", "career history", "internships", "projects"),
+    "education": ("education", "academic background", "academic qualifications", "qualifications", "education and training"),
+    "skills": ("skills", "key skills", "core skills", "technical skills", "competencies", "core competencies",
+               "skills and abilities"),
+    "certifications": ("certifications", "certificates", "licenses", "licences", "licenses and certifications",
+                       "certifications and licenses", "training"),
+    "relevant_coursework": ("relevant coursework", "coursework", "courses"),
+    "links": ("links", "portfolio", "online profiles"),
+    "abilities": ("strengths", "soft skills", "abilities", "key strengths"),
+    # Recognised so their lines don't leak into the previous section, then dropped
+    "_other": ("languages", "interests", "hobbies", "references", "referees", "personal details", "personal information"),
+}
+_HEADING_LOOKUP = {kw: field for field, kws in _HEADINGS.items() for kw in kws}
+
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+# Phone candidates stay on one line; _find_phone filters out year ranges and short digit runs
+_PHONE_RE = re.compile(r"\+?\d[\d \t().-]{7,}\d")
+_YEAR_RANGE_RE = re.compile(r"(?:19|20)\d{2}\s*[-–]\s*(?:19|20)\d{2}")
+_LINK_RE = re.compile(r"(?:https?://|www\.)\S+|(?:linkedin|github)\.com/\S+", re.IGNORECASE)
+_DATE_RANGE_RE = re.compile(
+    r"\b(?:(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?\s+)?(?:19|20)\d{2}\s*"
+    r"(?:-|–|—|to)\s*(?:(?:(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?\s+)?(?:19|20)\d{2}|present|current|date|now)\b",
+    re.IGNORECASE,
+)
+_BULLET_RE = re.compile(r"^\s*(?:[•●▪◦·*\-–—]|\d+[.)])\s+")
+
+_CORE_FIELDS = ("name", "skills", "experience", "education")
+
+
+def _find_phone(text: str) -> str | None:
+    """First phone-shaped run: 9-15 digits (E.164 allows 15) and not a "2019 - 2021" date range."""
+    for match in _PHONE_RE.finditer(text or ""):
+        candidate = match.group(0)
+        digits = sum(c.isdigit() for c in candidate)
+        if 9 <= digits <= 15 and not _YEAR_RANGE_RE.search(candidate):
+            return candidate
+    return None
+
+
+def _heading_field(line: str) -> str | None:
+    """Field for a section heading line, or None if the line isn't a heading."""
+    candidate = re.sub(r"[:|]+\s*$", "", line.strip()).strip().lower()
+    candidate = re.sub(r"\s*&\s*", " and ", candidate)
+    if not candidate or len(candidate.split()) > 5:
+        return None
+    return _HEADING_LOOKUP.get(candidate)
+
+
+def _looks_like_name(line: str) -> bool:
+    words = line.split()
+    if not 1 < len(words) <= 5 or _EMAIL_RE.search(line) or _find_phone(line) or any(c.isdigit() for c in line):
+        return False
+    return all(w[:1].isalpha() for w in words)
+
+
+def _clean_block(lines: list) -> str:
+    """Normalize bullets and drop empty lines in a section body."""
+    out = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if _BULLET_RE.match(line):
+            line = "- " + _BULLET_RE.sub("", line)
+        out.append(line)
+    return "\n".join(out)
+
+
+def parse_heuristic(text: str) -> tuple[dict, float]:
+    """
+    Split CV text into resume_data fields using headings and patterns.
+    Returns (data, confidence in [0, 1]).
+    """
+    lines = [l.rstrip() for l in (text or "").splitlines()]
+    data = {}
+
+    email = _EMAIL_RE.search(text or "")
+    if email:
+        data["email"] = email.group(0)
+    phone = _find_phone(text)
+    if phone:
+        data["phone"] = re.sub(r"\s+", " ", phone).strip()
+    links = _LINK_RE.findall(text or "")
+    if links:
+        data["links"] = "\n".join(dict.fromkeys(l.rstrip(".,;") for l in links))
+
+    # Header block: everything before the first recognised heading
+    sections = {}
+    current = None
+    header = []
+    for line in lines:
+        field = _heading_field(line)
+        if field:
+            current = field
+            sections.setdefault(field, [])
+            continue
+        if current is None:
+            header.append(line)
+        else:
+            sections[current].append(line)
+
+    header_lines = [l.strip() for l in header if l.strip()]
+    for i, line in enumerate(header_lines[:4]):
+        if _looks_like_name(line):
+            data["name"] = line
+            nxt = header_lines[i + 1] if i + 1 < len(header_lines) else ""
+            if nxt and not _EMAIL_RE.search(nxt) and not _find_phone(nxt) and len(nxt.split()) <= 8:
+                data["role"] = nxt
+            break
+
+    for field, body in sections.items():
+        block = _clean_block(body)
+        if not block or field.startswith("_"):
+            continue
+        if field == "skills":
+            # Bulleted or line-separated skills become a comma list
+            items = [re.sub(r"^- ", "", l) for l in block.split("\n")]
+            block = ", ".join(i.strip() for i in items if i.strip())
+        if field == "links" and data.get("links"):
+            block = data["links"] + "\n" + block
+        data[field] = block
+
+    found = sum(1 for f in _CORE_FIELDS if data.get(f))
+    confidence = found / len(_CORE_FIELDS)
+    if data.get("experience") and _DATE_RANGE_RE.search(data["experience"]):
+        confidence = min(1.0, confidence + 0.1)
+    if not sections:
+        confidence = min(confidence, 0.25)
+    return data, round(confidence, 2)
+
+
+_AI_PARSE_PROMPT = """You convert raw CV text into structured resume fields.
+Return ONLY valid JSON with these string keys (use "" when absent):
+{"name": "", "role": "", "email": "", "phone": "", "country": "", "links": "",
+ "career_objective": "", "skills": "comma-separated", "experience": "one entry per block: Company (years) then '- ' bullets",
+ "education": "", "certifications": "", "relevant_coursework": ""}
+Copy facts from the text only; never invent employers, dates or qualifications."""
+
+_PARSED_FIELDS = ("name", "role", "email", "phone", "country", "links", "career_objective", "skills",
+                  "experience", "education", "certifications", "relevant_coursework")
+
+
+def parse_resume(text: str, user_id: int = None, threshold: float = 0.75) -> dict:
+    """
+    Parse CV text into resume_data. Heuristics first; a single _hf_json call fills
+    gaps only when heuristic confidence is below `threshold`.
+    """
+    data, confidence = parse_heuristic(text)
+    if text and confidence < threshold:
+        from app.services.ai_service import _hf_json, _track_tokens
+        try:
+            # Bound the prompt: CV text beyond this adds tokens, not fields
+            ai, tokens = _hf_json(_AI_PARSE_PROMPT, text[:12000], temperature=0.1)
+            if user_id:
+                _track_tokens(user_id, tokens)
+            for field in _PARSED_FIELDS:
+                value = ai.get(field)
+                if isinstance(value, list):
+                    value = ", ".join(str(v) for v in value) if field == "skills" else "\n".join(str(v) for v in value)
+                if value and not data.get(field):
+                    data[field] = str(value).strip()
+        except Exception:
+            pass
+    if not data.get("experience") and text and not any(data.get(f) for f in ("skills", "education")):
+        # Nothing recognised at all: keep the raw text editable rather than dropping it
+        data["experience"] = text.strip()
+    data.setdefault("name", "")
+    data.setdefault("role", "")
+    return data
@@ -0,0 +1,161 @@
+"""
+Server-side PDF export for saved resumes.
+Resume HTML is rendered to PDF with WeasyPrint (local, no network) on the
+background job queue and stored on disk keyed by resume id, updated_at and
+template, so repeat downloads are a file read served with validators.
+WeasyPrint is optional: it needs the system Pango libraries, and without it
+downloads fall back to the printable HTML page.
+"""
+import contextlib
+import io
+import logging
+import os
+import threading
+
+from flask import current_app, render_template
+
+from app import db
+from app.models import Resume
+from app.services.jobs import job_queue
+from app.services.resume_builder import TEMPLATES, build_resume_html, has_stored_enhancement, render_key
+from app.services.resume_store import resume_to_data
+
+logger = logging.getLogger(__name__)
+
+try:
+    # WeasyPrint prints an installation banner to stdout when its libraries fail to load
+    with contextlib.redirect_stdout(io.StringIO()):
+        from weasyprint import HTML
+except ImportError:
+    HTML = None
+except OSError as exc:
+    HTML = None
+    logger.warning("WeasyPrint is installed but its system libraries are missing; PDF export disabled (%s)", exc)
+
+# cache key -> job id of the render in flight, so concurrent misses share one job
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def pdf_available() -> bool:
+    """Whether a PDF renderer is usable in this process."""
+    return HTML is not None and bool(current_app.config.get("RESUME_PDF_ENABLED", True))
+
+
+def _pdf_dir() -> str:
+    path = current_app.config.get("RESUME_PDF_DIR") or os.path.join(current_app.instance_path, "resume_pdfs")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _template_name(resume) -> str:
+    return resume.template_name if resume.template_name in TEMPLATES else "modern_minimal"
+
+
+def pdf_key(resume) -> str:
+    """Cache key for a resume's PDF; changes whenever the resume or its template changes."""
+    return render_key(resume, "pdf")
+
+
+def pdf_path(resume) -> str:
+    return os.path.join(_pdf_dir(), f"{resume.id}-{pdf_key(resume)}.pdf")
+
+
+def _fallback_path(resume) -> str:
+    return os.path.join(_pdf_dir(), f"{resume.id}-{pdf_key(resume)}.fallback.pdf")
+
+
+def cached_pdf(resume) -> str | None:
+    """Path of the stored PDF for the resume's current version, or None."""
+    path = pdf_path(resume)
+    return path if os.path.exists(path) else None
+
+
+def take_fallback_pdf(resume) -> bytes | None:
+    """
+    Claim the one-off PDF left by a render whose AI enhancement failed. It is
+    served to the request that was waiting for it and deleted, never cached,
+    so the next download renders again and retries the model.
+    """
+    path = _fallback_path(resume)
+    claimed = f"{path}.{os.getpid()}.{threading.get_ident()}.claim"
+    try:
+        os.rename(path, claimed)
+    except OSError:
+        return None
+    try:
+        with open(claimed, "rb") as f:
+            return f.read()
+    finally:
+        os.remove(claimed)
+
+
+def html_to_pdf(html: str) -> bytes:
+    """Render a standalone HTML document to PDF bytes."""
+    if HTML is None:
+        raise RuntimeError("PDF rendering is not available on this server.")
+    return HTML(string=html, base_url=current_app.static_folder).write_pdf()
+
+
+def render_pdf(resume) -> str:
+    """
+    Render and store the resume's PDF (replacing older versions); returns its
+    path. A render without the AI enhancement goes to the one-off fallback path.
+    """
+    resume_data = resume_to_data(resume)
+    body = build_resume_html(resume_data, _template_name(resume))
+    pdf = html_to_pdf(render_template("resume_pdf.html", content=body, title=resume.title))
+
+    if not has_stored_enhancement(resume_data):
+        path = _fallback_path(resume)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(pdf)
+        os.replace(tmp, path)
+        return path
+
+    path = pdf_path(resume)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(pdf)
+    os.replace(tmp, path)
+
+    # Older versions of this resume can never be served again
+    prefix = f"{resume.id}-"
+    for name in os.listdir(os.path.dirname(path)):
+        if name.startswith(prefix) and name.endswith(".pdf") and os.path.join(os.path.dirname(path), name) != path:
+            try:
+                os.remove(os.path.join(os.path.dirname(path), name))
+            except OSError:
+                pass
+    return path
+
+
+def request_pdf(resume, user_id: int) -> str:
+    """Enqueue a render for a cold miss (or join the one in flight); returns the job id."""
+    key = pdf_key(resume)
+    with _inflight_lock:
+        job_id = _inflight.get(key)
+    if job_id is not None:
+        job = job_queue.get(job_id, user_id=user_id)
+        if job is not None and job.status in ("queued", "running"):
+            return job_id
+    job_id = job_queue.submit("resume_pdf", {"resume_id": resume.id, "key": key}, user_id=user_id)
+    with _inflight_lock:
+        _inflight[key] = job_id
+    return job_id
+
+
+@job_queue.register("resume_pdf")
+def _run_resume_pdf(payload, user_id):
+    """Job handler: render the PDF unless another job already stored it."""
+    try:
+        resume = db.session.get(Resume, payload["resume_id"])
+        if resume is None or resume.user_id != user_id:
+            return None, "Resume not found."
+        if cached_pdf(resume) is None:
+            render_pdf(resume)
+        return {"key": pdf_key(resume)}, None
+    finally:
+        with _inflight_lock:
+            _inflight.pop(payload.get("key"), None)
@@ -0,0 +1,303 @@
+"""
+Resume hydration: saved resumes as resume_data dicts.
+Resumes with a resumes.document are read from that single row (see
+resume_document); older ones fall back to their sections, loaded through the
+non-dynamic Resume.section_list relationship in one query for any number of
+resumes, never one query per resume.
+Saving goes through save_resume(): the document and/or sections per
+RESUME_STORAGE, one bulk INSERT for a new resume's sections, in-place
+UPDATEs only for sections whose content changed, and an idempotency key so
+double submits and select-then-save reuse one resume. Every change (save,
+in-place edit, restore) appends a revision (see revisions).
+Dashboard listings use keyset pagination over (updated_at, id) with a
+column projection, so every page costs the same regardless of resume count.
+"""
+import base64
+import hashlib
+import json
+from datetime import datetime
+
+from sqlalchemy import and_, func, insert, null, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from flask import current_app
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app import db
+from app.models import Resume, ResumeSection
+from app.services.resume_document import EDITABLE_FIELDS, STORAGE_MODES, data_from_document, document_from_data, upgrade_document
+from app.services.revisions import record_revision, state_at
+
+
+class EditConflict(Exception):
+    """Raised when a concurrent change to the same resume claimed the next revision first."""
+
+
+def storage_mode() -> str:
+    """RESUME_STORAGE: "sections" (legacy rows), "dual" (document + rows) or "document" (document only)."""
+    mode = str(current_app.config.get("RESUME_STORAGE", "dual")).lower()
+    return mode if mode in STORAGE_MODES else "dual"
+
+
+def resume_to_data(resume) -> dict:
+    """Build the resume_data dict for rendering: from the document when present, else from sections."""
+    document = upgrade_document(resume.document)
+    if document is not None:
+        return data_from_document(document, resume.title)
+    data = {"name": resume.title, "role": "", "email": "", "phone": "", "country": "", "links": "", "career_objective": "", "experience": "", "education": "", "skills": ""}
+    for sec in resume.section_list:
+        c = sec.content or {}
+        if sec.section_type == "personal":
+            data["name"] = c.get("name", data["name"])
+            data["role"] = c.get("role", "")
+            data["email"] = c.get("email", "")
+            data["phone"] = c.get("phone", "")
+            data["country"] = c.get("country", "")
+            data["links"] = c.get("links", "")
+        elif sec.section_type == "summary":
+            data["career_objective"] = c.get("raw", c.get("text", ""))
+        else:
+            data[sec.section_type] = c.get("raw", c.get("text", ""))
+    return data
+
+
+def sections_from_data(resume_data: dict) -> list:
+    """(section_type, content) pairs stored for a resume_data dict."""
+    return [
+        ("personal", {"name": resume_data.get("name"), "email": resume_data.get("email"), "phone": resume_data.get("phone"), "country": resume_data.get("country"), "links": resume_data.get("links"), "role": resume_data.get("role")}),
+        ("summary", {"raw": resume_data.get("career_objective", "") or resume_data.get("abilities", "")}),
+        ("experience", {"raw": resume_data.get("experience", "")}),
+        ("education", {"raw": resume_data.get("education", "")}),
+        ("skills", {"raw": resume_data.get("skills", "")}),
+    ]
+
+
+def _content_hash(content) -> str:
+    return hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def idempotency_key(user_id: int, draft_id: str, resume_data: dict) -> str:
+    """
+    Key identifying the resume a draft saves into: same user, same draft and
+    same person/role. Every builder submission starts a new draft (see
+    drafts.start_build), so only repeats within one build (double submits,
+    select-then-save) share a key; a resume for another role from the same
+    draft is a new one.
+    """
+    identity = [user_id, draft_id or "", (resume_data.get("name") or "").strip().lower(), (resume_data.get("role") or "").strip().lower()]
+    return hashlib.sha256(json.dumps(identity).encode("utf-8")).hexdigest()
+
+
+def save_resume(user_id: int, resume_data: dict, template_name: str, title: str, draft_id: str = None) -> tuple:
+    """
+    Create or update the resume for this draft. Returns (resume, changed);
+    changed is False when an identical save was repeated (nothing written).
+    """
+    key = idempotency_key(user_id, draft_id, resume_data)
+    mode = storage_mode()
+    write_sections = mode != "document"
+
+    stmt = select(Resume).where(Resume.user_id == user_id, Resume.idempotency_key == key)
+    if write_sections:
+        stmt = stmt.options(selectinload(Resume.section_list))
+    resume = db.session.scalars(stmt).first()
+    if resume is None:
+        document = document_from_data(resume_data) if mode != "sections" else None
+        resume = Resume(user_id=user_id, title=title, template_name=template_name, idempotency_key=key, document=document)
+        db.session.add(resume)
+        try:
+            db.session.flush()
+        except IntegrityError:
+            # A concurrent submit of the same draft created it first
+            db.session.rollback()
+            return save_resume(user_id, resume_data, template_name, title, draft_id)
+        if write_sections:
+            db.session.execute(
+                insert(ResumeSection),
+                [{"resume_id": resume.id, "section_type": t, "content": c} for t, c in sections_from_data(resume_data)],
+            )
+        record_revision(resume, None, revision_state(title, template_name, resume_data))
+        db.session.commit()
+        return resume, True
+
+    changed = _write(resume, resume_data, template_name, title)
+    if changed:
+        try:
+            _commit_write()
+        except EditConflict:
+            # Another save of this resume landed first; apply this one on top of it
+            return save_resume(user_id, resume_data, template_name, title, draft_id)
+    return resume, changed
+
+
+def revision_state(title: str, template_name: str, resume_data: dict) -> dict:
+    """What the revision log tracks for a resume."""
+    return {"title": title, "template_name": template_name, "document": document_from_data(resume_data)}
+
+
+def _write(resume, resume_data: dict, template_name: str, title: str) -> bool:
+    """
+    Apply resume_data in place (document and/or sections per RESUME_STORAGE)
+    and log a revision. Returns False, writing nothing, when nothing changed.
+    The caller commits.
+    """
+    mode = storage_mode()
+    old_data = resume_to_data(resume)
+    updates, inserts = [], []
+    if mode != "document":
+        existing = {sec.section_type: sec for sec in resume.section_list}
+        for section_type, content in sections_from_data(resume_data):
+            sec = existing.get(section_type)
+            if sec is None:
+                inserts.append({"resume_id": resume.id, "section_type": section_type, "content": content})
+            elif _content_hash(sec.content or {}) != _content_hash(content):
+                updates.append({"id": sec.id, "content": content})
+    document = document_from_data(resume_data) if mode != "sections" else None
+    document_changed = document is not None and _content_hash(resume.document) != _content_hash(document)
+
+    changed = bool(updates or inserts) or document_changed or resume.title != title or resume.template_name != template_name
+    if not changed:
+        return False
+    old_state = revision_state(resume.title, resume.template_name, old_data)
+    if document_changed:
+        resume.document = document
+    elif mode == "sections" and resume.document is not None:
+        # Rolled back to sections: a leftover document would be read instead of the rows written here
+        resume.document = null()
+    if updates:
+        db.session.execute(update(ResumeSection), updates)
+    if inserts:
+        db.session.execute(insert(ResumeSection), inserts)
+    resume.title = title
+    resume.template_name = template_name
+    # Section edits don't touch the resumes row, but updated_at keys ETags and caches
+    resume.updated_at = datetime.utcnow()
+    record_revision(resume, old_state, revision_state(title, template_name, resume_data))
+    return True
+
+
+def _commit_write():
+    """Commit a _write(); EditConflict (rolled back) if a concurrent write took the same revision number."""
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        raise EditConflict("The resume was changed by another request. Reload and try again.")
+
+
+def update_resume(resume, fields: dict, title: str = None, template_name: str = None) -> bool:
+    """In-place edit of some fields of a saved resume (unknown keys ignored). Returns whether anything changed."""
+    data = resume_to_data(resume)
+    data.update({k: ("" if v is None else str(v)) for k, v in (fields or {}).items() if k in EDITABLE_FIELDS})
+    changed = _write(resume, data, template_name or resume.template_name, title or resume.title)
+    if changed:
+        _commit_write()
+    return changed
+
+
+def restore_revision(resume, number: int) -> bool | None:
+    """Make revision `number` current again (logged as a new revision). None if it doesn't exist."""
+    state = state_at(resume.id, number)
+    if state is None:
+        return None
+    data = data_from_document(state["document"], state["title"])
+    changed = _write(resume, data, state["template_name"], state["title"])
+    if changed:
+        _commit_write()
+    return changed
+
+
+def load_resumes(resume_ids, user_id: int = None) -> list:
+    """
+    Resumes ready for resume_to_data, in the order of resume_ids (missing ids skipped).
+    One query when every resume has a document; one more (for all of them) loads
+    the sections of those that don't.
+    """
+    ids = list(dict.fromkeys(resume_ids))
+    if not ids:
+        return []
+    stmt = select(Resume).where(Resume.id.in_(ids))
+    if user_id is not None:
+        stmt = stmt.where(Resume.user_id == user_id)
+    by_id = {r.id: r for r in db.session.scalars(stmt)}
+
+    legacy = [r for r in by_id.values() if upgrade_document(r.document) is None]
+    if legacy:
+        grouped = {r.id: [] for r in legacy}
+        rows = db.session.scalars(
+            select(ResumeSection).where(ResumeSection.resume_id.in_(list(grouped))).order_by(ResumeSection.id)
+        )
+        for sec in rows:
+            grouped[sec.resume_id].append(sec)
+        for r in legacy:
+            set_committed_value(r, "section_list", grouped[r.id])
+    return [by_id[i] for i in ids if i in by_id]
+
+
+def hydrate(resume_ids, user_id: int = None) -> dict:
+    """resume_data dicts keyed by resume id, for any number of resumes in at most two queries."""
+    return {r.id: resume_to_data(r) for r in load_resumes(resume_ids, user_id)}
+
+
+def hydrate_resume(resume_id: int, user_id: int = None) -> tuple:
+    """(Resume, resume_data) for one resume, or (None, None) if not found / not owned."""
+    found = load_resumes([resume_id], user_id)
+    if not found:
+        return None, None
+    return found[0], resume_to_data(found[0])
+
+
+# Columns the dashboard cards need (no sections, no ORM identity map)
+CARD_COLUMNS = (
+    Resume.id,
+    Resume.title,
+    Resume.template_name,
+    Resume.updated_at,
+    Resume.is_public,
+    Resume.public_slug,
+    Resume.views,
+    Resume.thumbnail,
+)
+
+
+def encode_cursor(updated_at: datetime, resume_id: int) -> str:
+    """Opaque keyset cursor for the position after (updated_at, id)."""
+    raw = f"{updated_at.isoformat() if updated_at else ''}|{resume_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """(updated_at, id) from a cursor; raises ValueError for malformed input."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        stamp, resume_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(stamp), int(resume_id)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def resume_cards(user_id: int, cursor: str = None, limit: int = 20) -> tuple:
+    """
+    One page of a user's resumes, newest first, as lightweight rows.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    Served by the (user_id, updated_at DESC, id DESC) index: no OFFSET scan.
+    """
+    stmt = select(*CARD_COLUMNS).where(Resume.user_id == user_id)
+    if cursor:
+        updated_at, resume_id = decode_cursor(cursor)
+        stmt = stmt.where(or_(
+            Resume.updated_at < updated_at,
+            and_(Resume.updated_at == updated_at, Resume.id < resume_id),
+        ))
+    stmt = stmt.order_by(Resume.updated_at.desc(), Resume.id.desc()).limit(limit + 1)
+    rows = db.session.execute(stmt).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].updated_at, rows[-1].id)
+    return rows, next_cursor
+
+
+def resume_count(user_id: int) -> int:
+    """Number of resumes a user has (index-only count)."""
+    return db.session.scalar(select(func.count()).select_from(Resume).where(Resume.user_id == user_id)) or 0
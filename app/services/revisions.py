@@ -0,0 +1,171 @@
+"""
+Resume revision history with delta storage.
+Each change to a resume appends a revision holding only what changed since
+the previous one (per field; long text as line-range replacements). Every
+Nth revision is a full checkpoint, so rebuilding any revision reads at most
+N rows. Storage grows with the size of edits, not the number of saves.
+"""
+import difflib
+import json
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import func, select
+
+from app import db
+from app.models import ResumeRevision
+
+# Strings at least this long are stored as line diffs instead of whole values
+_TEXT_DIFF_MIN = 80
+
+
+def _checkpoint_every() -> int:
+    return max(1, int(current_app.config.get("RESUME_REVISION_CHECKPOINT_EVERY", 20)))
+
+
+def _text_patch(old: str, new: str) -> list:
+    """[start_line, end_line, replacement] edits turning old into new (applied back to front)."""
+    a, b = old.splitlines(keepends=True), new.splitlines(keepends=True)
+    matcher = difflib.SequenceMatcher(None, a, b, autojunk=False)
+    return [[i1, i2, "".join(b[j1:j2])] for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != "equal"]
+
+
+def _apply_text_patch(old: str, patch: list) -> str:
+    lines = old.splitlines(keepends=True)
+    for start, end, replacement in reversed(patch):
+        lines[start:end] = [replacement] if replacement else []
+    return "".join(lines)
+
+
+def make_delta(old: dict, new: dict, path: tuple = ()) -> list:
+    """
+    Ops turning old into new: ["set", path, value], ["del", path] or
+    ["text", path, patch] for long strings. Unchanged fields cost nothing.
+    """
+    ops = []
+    for key in list(old) + [k for k in new if k not in old]:
+        here = path + (key,)
+        if key not in new:
+            ops.append(["del", list(here)])
+            continue
+        before, after = old.get(key), new[key]
+        if key in old and before == after:
+            continue
+        if isinstance(before, dict) and isinstance(after, dict):
+            ops.extend(make_delta(before, after, here))
+        elif isinstance(before, str) and isinstance(after, str) and max(len(before), len(after)) >= _TEXT_DIFF_MIN:
+            ops.append(["text", list(here), _text_patch(before, after)])
+        else:
+            ops.append(["set", list(here), after])
+    return ops
+
+
+def apply_delta(state: dict, ops: list) -> dict:
+    """New state from a state and make_delta ops (input is not modified)."""
+    state = json.loads(json.dumps(state))
+    for op in ops:
+        kind, path = op[0], op[1]
+        parent = state
+        for key in path[:-1]:
+            parent = parent.setdefault(key, {})
+        if kind == "del":
+            parent.pop(path[-1], None)
+        elif kind == "text":
+            parent[path[-1]] = _apply_text_patch(parent.get(path[-1]) or "", op[2])
+        else:
+            parent[path[-1]] = op[2]
+    return state
+
+
+def latest_number(resume_id: int) -> int:
+    return db.session.scalar(select(func.max(ResumeRevision.number)).where(ResumeRevision.resume_id == resume_id)) or 0
+
+
+def record_revision(resume, old_state: dict | None, new_state: dict) -> ResumeRevision:
+    """
+    Append a revision for new_state (caller commits). old_state is the state
+    before the change (None for a new resume).
+    """
+    number = latest_number(resume.id)
+    if number == 0 and old_state is not None:
+        # History starts now: the pre-edit state becomes the baseline checkpoint
+        db.session.add(_revision(resume, 1, "checkpoint", old_state))
+        number = 1
+    number += 1
+    if (number - 1) % _checkpoint_every() == 0:
+        revision = _revision(resume, number, "checkpoint", new_state)
+    else:
+        revision = _revision(resume, number, "delta", make_delta(old_state or {}, new_state))
+    db.session.add(revision)
+    return revision
+
+
+def list_revisions(resume_id: int) -> list:
+    """Revision metadata, newest first (no payloads are reconstructed)."""
+    rows = db.session.execute(
+        select(ResumeRevision.number, ResumeRevision.kind, ResumeRevision.size, ResumeRevision.created_at)
+        .where(ResumeRevision.resume_id == resume_id)
+        .order_by(ResumeRevision.number.desc())
+    ).all()
+    return [
+        {"number": r.number, "kind": r.kind, "size": r.size, "created_at": r.created_at.isoformat() if r.created_at else None}
+        for r in rows
+    ]
+
+
+def state_at(resume_id: int, number: int) -> dict | None:
+    """Rebuild revision `number` from its nearest checkpoint (reads at most N rows); None if unknown."""
+    checkpoint = db.session.scalar(
+        select(func.max(ResumeRevision.number)).where(
+            ResumeRevision.resume_id == resume_id,
+            ResumeRevision.kind == "checkpoint",
+            ResumeRevision.number <= number,
+        )
+    )
+    if checkpoint is None:
+        return None
+    rows = db.session.scalars(
+        select(ResumeRevision)
+        .where(ResumeRevision.resume_id == resume_id, ResumeRevision.number.between(checkpoint, number))
+        .order_by(ResumeRevision.number)
+    ).all()
+    if not rows or rows[-1].number != number:
+        return None
+    state = rows[0].data
+    for row in rows[1:]:
+        state = row.data if row.kind == "checkpoint" else apply_delta(state, row.data)
+    return json.loads(json.dumps(state))
+
+
+def diff_states(old: dict, new: dict) -> list:
+    """Readable field-level differences: [{"field", "before", "after", "diff"?}] (text fields get a unified diff)."""
+    changes = []
+    for op in make_delta(old, new):
+        field = ".".join(str(p) for p in op[1])
+        before, after = _lookup(old, op[1]), _lookup(new, op[1])
+        change = {"field": field, "before": before, "after": after}
+        if op[0] == "text":
+            change["diff"] = "".join(difflib.unified_diff(
+                (before or "").splitlines(keepends=True), (after or "").splitlines(keepends=True),
+            ))
+        changes.append(change)
+    return changes
+
+
+def _lookup(state: dict, path: list):
+    for key in path:
+        if not isinstance(state, dict):
+            return None
+        state = state.get(key)
+    return state
+
+
+def _revision(resume, number: int, kind: str, data) -> ResumeRevision:
+    return ResumeRevision(
+        resume_id=resume.id,
+        number=number,
+        kind=kind,
+        data=data,
+        size=len(json.dumps(data, separators=(",", ":"))),
+        created_at=datetime.utcnow(),
+    )
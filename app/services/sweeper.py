@@ -0,0 +1,73 @@
+"""
+Background cleanup of rows that outlive their use (expired drafts, old jobs).
+Modules register a purge task; one lazily started daemon thread per process
+runs every task on its own connection each SWEEP_INTERVAL seconds.
+"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+from app import db
+
+logger = logging.getLogger(__name__)
+
+
+class Sweeper:
+    """Per-process thread running registered purge tasks, initialized per app like other extensions."""
+
+    def __init__(self):
+        self.app = None
+        self.interval = 900.0
+        self._tasks = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def init_app(self, app):
+        self.app = app
+        self.interval = float(app.config.get("SWEEP_INTERVAL", 900))
+
+    def register(self, name: str, task=None):
+        """Register task(conn, now) -> rows deleted. Usable as decorator."""
+        if task is None:
+            def decorator(fn):
+                self._tasks[name] = fn
+                return fn
+            return decorator
+        self._tasks[name] = task
+        return task
+
+    def sweep(self) -> dict:
+        """Run every task on a dedicated connection; returns rows removed per task."""
+        if self.app is None:
+            return {}
+        removed = {}
+        with self.app.app_context():
+            for name, task in self._tasks.items():
+                try:
+                    with db.engine.begin() as conn:
+                        removed[name] = task(conn, datetime.utcnow()) or 0
+                except Exception:
+                    logger.exception("Sweep task %s failed", name)
+        return removed
+
+    def ensure_started(self):
+        # Started lazily and per pid so forked gunicorn workers each get their own thread
+        if self.app is None or (self._thread is not None and self._pid == os.getpid()):
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="resumeghana-sweep", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            self.sweep()
+
+
+sweeper = Sweeper()
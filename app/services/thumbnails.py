@@ -0,0 +1,168 @@
+"""
+Dashboard thumbnails for saved resumes.
+A background job renders a compact, scaled-down static HTML snapshot of the
+resume's first page and stores it under a content hash in static/thumbnails,
+so dashboard cards are plain static file fetches with no rendering.
+Thumbnails are rendered from stored data only (never the model). Backfilling
+older resumes is low-priority work: capped per user per interval, only queued
+while the shared job queue is mostly idle, and a resume whose render failed
+is skipped for THUMBNAIL_RETRY_AFTER seconds.
+"""
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+
+from flask import current_app, render_template, url_for
+from sqlalchemy import update
+
+from app import db
+from app.models import Resume
+from app.services.jobs import QueueFull, job_queue
+from app.services.resume_builder import TEMPLATES, render_resume, stored_context
+from app.services.resume_store import resume_to_data
+
+logger = logging.getLogger(__name__)
+
+# resume id -> job id of the render in flight (one thumbnail job per resume)
+_inflight = {}
+# resume id -> monotonic time of its last failed render (per process)
+_failed = {}
+# user id -> [window start, backfill renders queued in that window] (per process)
+_backfill_budget = {}
+_inflight_lock = threading.Lock()
+
+_THUMBNAIL_NAME = re.compile(r"^[0-9a-f]{32}$")
+
+
+def _thumbnail_dir() -> str:
+    path = current_app.config.get("THUMBNAIL_DIR") or os.path.join(current_app.static_folder, "thumbnails")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def thumbnail_url(thumbnail: str) -> str | None:
+    """URL of a stored thumbnail hash (None when there isn't one yet)."""
+    if not thumbnail:
+        return None
+    if current_app.config.get("THUMBNAIL_DIR"):
+        # Outside static/: served by the dashboard blueprint
+        return url_for("dashboard.thumbnail", thumbnail=thumbnail)
+    return url_for("static", filename=f"thumbnails/{thumbnail}.html")
+
+
+def thumbnail_path(thumbnail: str) -> str | None:
+    """Path of a stored thumbnail, or None for unknown / malformed hashes."""
+    if not thumbnail or not _THUMBNAIL_NAME.match(thumbnail):
+        return None
+    path = os.path.join(_thumbnail_dir(), f"{thumbnail}.html")
+    return path if os.path.exists(path) else None
+
+
+def render_thumbnail(resume) -> str:
+    """Render and store the resume's thumbnail; returns its content hash (caller records it)."""
+    template_name = resume.template_name if resume.template_name in TEMPLATES else "modern_minimal"
+    body = render_resume(stored_context(resume_to_data(resume)), template_name)
+    html = render_template("resume_thumbnail.html", content=body)
+    # Resume id is part of the hash so replacing one resume's file never affects another's
+    thumbnail = hashlib.sha256(f"{resume.id}\n{html}".encode("utf-8")).hexdigest()[:32]
+
+    directory = _thumbnail_dir()
+    path = os.path.join(directory, f"{thumbnail}.html")
+    if not os.path.exists(path):
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(html)
+        os.replace(tmp, path)
+    if resume.thumbnail and resume.thumbnail != thumbnail:
+        try:
+            os.remove(os.path.join(directory, f"{resume.thumbnail}.html"))
+        except OSError:
+            pass
+    return thumbnail
+
+
+def backfill_thumbnails(resumes, user_id: int) -> int:
+    """
+    Queue thumbnails for dashboard cards that don't have one yet (older
+    resumes), up to THUMBNAIL_BACKFILL_LIMIT per user every
+    THUMBNAIL_BACKFILL_INTERVAL seconds. Returns how many were queued.
+    """
+    limit = int(current_app.config.get("THUMBNAIL_BACKFILL_LIMIT", 5))
+    interval = float(current_app.config.get("THUMBNAIL_BACKFILL_INTERVAL", 60))
+    queued = 0
+    for resume in resumes:
+        if resume.thumbnail:
+            continue
+        now = time.monotonic()
+        with _inflight_lock:
+            budget = _backfill_budget.get(user_id)
+            if budget is None or now - budget[0] >= interval:
+                budget = _backfill_budget[user_id] = [now, 0]
+            if budget[1] >= limit:
+                break
+        if request_thumbnail(resume.id, user_id, backfill=True) is not None:
+            queued += 1
+            with _inflight_lock:
+                budget[1] += 1
+    return queued
+
+
+def request_thumbnail(resume_id: int, user_id: int, backfill: bool = False) -> str | None:
+    """
+    Queue a thumbnail render (call after a resume is saved or its template changes).
+    Returns the job id, or None if one is already in flight, the queue is full,
+    or (for a backfill) the queue is busy or this resume's last render failed recently.
+    """
+    retry_after = float(current_app.config.get("THUMBNAIL_RETRY_AFTER", 3600))
+    with _inflight_lock:
+        if resume_id in _inflight:
+            return None
+        failed_at = _failed.get(resume_id)
+        if backfill and failed_at is not None and time.monotonic() - failed_at < retry_after:
+            return None
+        _inflight[resume_id] = None
+    try:
+        # Backfill only takes the idle quarter of the shared queue, leaving room for AI, import and PDF jobs
+        max_pending = max(1, job_queue.max_queue // 4) if backfill else None
+        job_id = job_queue.submit("resume_thumbnail", {"resume_id": resume_id}, user_id=user_id, max_pending=max_pending)
+    except QueueFull:
+        with _inflight_lock:
+            _inflight.pop(resume_id, None)
+        return None
+    with _inflight_lock:
+        if resume_id in _inflight:
+            _inflight[resume_id] = job_id
+    return job_id
+
+
+@job_queue.register("resume_thumbnail")
+def _run_resume_thumbnail(payload, user_id):
+    """Job handler: render the thumbnail and record its hash without touching updated_at."""
+    try:
+        resume = db.session.get(Resume, payload["resume_id"])
+        if resume is None or resume.user_id != user_id:
+            return None, "Resume not found."
+        try:
+            thumbnail = render_thumbnail(resume)
+        except Exception:
+            logger.exception("Thumbnail render failed for resume %s", resume.id)
+            with _inflight_lock:
+                _failed[resume.id] = time.monotonic()
+            return None, "Thumbnail render failed."
+        with _inflight_lock:
+            _failed.pop(resume.id, None)
+        if thumbnail != resume.thumbnail:
+            table = Resume.__table__
+            with db.engine.begin() as conn:
+                conn.execute(
+                    update(table)
+                    .where(table.c.id == resume.id)
+                    .values(thumbnail=thumbnail, updated_at=table.c.updated_at)
+                )
+        return {"thumbnail": thumbnail}, None
+    finally:
+        with _inflight_lock:
+            _inflight.pop(payload.get("resume_id"), None)
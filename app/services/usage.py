@@ -0,0 +1,216 @@
+"""
+Write-behind AI usage accounting.
+Usage events are buffered in memory per worker and written with one bulk
+INSERT when the buffer reaches AI_USAGE_FLUSH_SIZE events, every
+AI_USAGE_FLUSH_INTERVAL seconds, and at interpreter shutdown.
+
+Delivery is best effort. A graceful shutdown (SIGTERM, gunicorn worker
+restart) flushes the buffer. A hard crash (SIGKILL, OOM kill) loses at most
+the unflushed events: fewer than AI_USAGE_FLUSH_SIZE events, or
+AI_USAGE_FLUSH_INTERVAL seconds' worth. A failed flush re-buffers its batch
+and retries it, so flush errors are at-least-once: a batch whose commit
+succeeded but was reported as failed (e.g. a dropped connection) is written
+again. If the database stays down, only the newest AI_USAGE_MAX_BUFFER
+events are kept.
+
+Each flush also updates the per-user running total and the day/month buckets
+in the same transaction, so stats and quota checks are single-row lookups.
+Events made with a registered prompt carry its name and version, so
+prompt_usage_report() shows what each prompt version costs per call.
+"""
+import atexit
+import logging
+import os
+import threading
+from collections import defaultdict
+from datetime import date, datetime
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app import db
+from app.models import AIUsage, AIUsageBucket, AIUsageTotal
+
+logger = logging.getLogger(__name__)
+
+
+class UsageRecorder:
+    """Per-process buffer of AIUsage rows flushed in bulk."""
+
+    def __init__(self):
+        self.app = None
+        self.flush_size = 50
+        self.flush_interval = 5.0
+        self.max_buffer = 10000
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._atexit_registered = False
+
+    def init_app(self, app):
+        self.app = app
+        self.flush_size = int(app.config.get("AI_USAGE_FLUSH_SIZE", 50))
+        self.flush_interval = float(app.config.get("AI_USAGE_FLUSH_INTERVAL", 5))
+        self.max_buffer = int(app.config.get("AI_USAGE_MAX_BUFFER", 10000))
+        if not self._atexit_registered:
+            atexit.register(self.flush)
+            self._atexit_registered = True
+
+    def record(self, user_id: int, tokens: int, prompt=None):
+        """Buffer one usage event; the caller never waits on the database (a full buffer wakes the flusher)."""
+        self._ensure_flusher()
+        row = {
+            "user_id": user_id,
+            "tokens_used": int(tokens or 0),
+            "prompt": prompt.name if prompt is not None else None,
+            "prompt_version": prompt.version if prompt is not None else None,
+            "created_at": datetime.utcnow(),
+        }
+        with self._lock:
+            self._buffer.append(row)
+            full = len(self._buffer) >= self.flush_size
+        if full:
+            self._wake.set()
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._buffer)
+
+    def flush(self) -> int:
+        """Write all buffered events in one bulk INSERT; returns rows written."""
+        with self._flush_lock:
+            with self._lock:
+                rows, self._buffer = self._buffer, []
+            if not rows or self.app is None:
+                return 0
+            try:
+                with self.app.app_context():
+                    self._write(rows)
+            except Exception:
+                logger.exception("AI usage flush failed; re-buffering %d events", len(rows))
+                with self._lock:
+                    # Keep newest events if the database stays unavailable
+                    self._buffer = (rows + self._buffer)[-self.max_buffer:]
+                return 0
+            return len(rows)
+
+    def _write(self, rows: list):
+        """Persist a batch on a dedicated connection (never the request's session)."""
+        with db.engine.begin() as conn:
+            conn.execute(insert(AIUsage.__table__), rows)
+            _apply_rollups(conn, rows)
+
+    def _ensure_flusher(self):
+        # Started lazily and per pid so forked gunicorn workers each get their own thread
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="resumeghana-usage-flush", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(timeout=self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+
+def _upsert_add(conn, table, keys: dict, tokens: int, extra: dict = None):
+    """INSERT a counter row or add tokens to the existing one (atomic on SQLite/PostgreSQL)."""
+    values = {**keys, "tokens_used": tokens, **(extra or {})}
+    dialect = conn.dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        stmt = (sqlite.insert if dialect == "sqlite" else postgresql.insert)(table).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={"tokens_used": table.c.tokens_used + stmt.excluded.tokens_used, **(extra or {})},
+        )
+        conn.execute(stmt)
+        return
+    where = [table.c[k] == v for k, v in keys.items()]
+    result = conn.execute(update(table).where(*where).values(tokens_used=table.c.tokens_used + tokens, **(extra or {})))
+    if result.rowcount == 0:
+        conn.execute(insert(table).values(**values))
+
+
+def _apply_rollups(conn, rows: list):
+    """Fold a batch of usage events into ai_usage_totals and ai_usage_buckets."""
+    totals = defaultdict(int)
+    buckets = defaultdict(int)
+    for row in rows:
+        user_id, tokens = row["user_id"], row["tokens_used"]
+        day = row["created_at"].date()
+        totals[user_id] += tokens
+        buckets[(user_id, "day", day)] += tokens
+        buckets[(user_id, "month", day.replace(day=1))] += tokens
+
+    now = datetime.utcnow()
+    for user_id, tokens in totals.items():
+        _upsert_add(conn, AIUsageTotal.__table__, {"user_id": user_id}, tokens, {"updated_at": now})
+    bucket_table = AIUsageBucket.__table__
+    for (user_id, period, start), tokens in buckets.items():
+        _upsert_add(conn, bucket_table, {"user_id": user_id, "period": period, "period_start": start}, tokens)
+
+
+def period_start(period: str, when: date = None) -> date:
+    """First day of the day/month bucket containing `when` (default: today, UTC)."""
+    when = when or datetime.utcnow().date()
+    if period == "month":
+        return when.replace(day=1)
+    if period == "day":
+        return when
+    raise ValueError(f"Unknown usage period: {period}")
+
+
+def get_total_tokens(user_id: int) -> int:
+    """Lifetime tokens for a user (one primary-key lookup)."""
+    total = db.session.execute(
+        select(AIUsageTotal.tokens_used).where(AIUsageTotal.user_id == user_id)
+    ).scalar()
+    return int(total or 0)
+
+
+def get_period_tokens(user_id: int, period: str = "month", when: date = None) -> int:
+    """Tokens used by a user in the current (or given) day/month bucket, for quota checks."""
+    tokens = db.session.execute(
+        select(AIUsageBucket.tokens_used).where(
+            AIUsageBucket.user_id == user_id,
+            AIUsageBucket.period == period,
+            AIUsageBucket.period_start == period_start(period, when),
+        )
+    ).scalar()
+    return int(tokens or 0)
+
+
+def prompt_usage_report(since: datetime = None, user_id: int = None) -> list:
+    """Calls and tokens per prompt version (optionally since a time / for one user), most expensive first."""
+    total = func.sum(AIUsage.tokens_used)
+    query = (
+        select(AIUsage.prompt, AIUsage.prompt_version, func.count().label("calls"), total.label("tokens"))
+        .where(AIUsage.prompt.is_not(None))
+        .group_by(AIUsage.prompt, AIUsage.prompt_version)
+        .order_by(total.desc())
+    )
+    if since is not None:
+        query = query.where(AIUsage.created_at >= since)
+    if user_id is not None:
+        query = query.where(AIUsage.user_id == user_id)
+    return [
+        {
+            "prompt": row.prompt,
+            "version": row.prompt_version,
+            "calls": row.calls,
+            "tokens": int(row.tokens or 0),
+            "tokens_per_call": round((row.tokens or 0) / row.calls, 1) if row.calls else 0,
+        }
+        for row in db.session.execute(query)
+    ]
+
+
+usage_recorder = UsageRecorder()
@@ -1,6 +1,9 @@
 """
 Utility functions for ResumeGhana.
 """
+import os
+
+from flask import current_app
 from werkzeug.security import generate_password_hash, check_password_hash
 
 
@@ -12,3 +15,14 @@ def hash_password(password: str) -> str:
 def verify_password(password: str, password_hash: str) -> bool:
     """Verify a password against its hash."""
     return check_password_hash(password_hash, password)
+
+
+def config_value(name: str, default):
+    """App config value, or the environment variable of the same name outside an app context (or when unset)."""
+    try:
+        value = current_app.config.get(name)
+    except RuntimeError:
+        value = None
+    if value is None:
+        value = os.environ.get(name, default)
+    return value
@@ -0,0 +1,54 @@
+"""
+Benchmark: serial vs process-pool PDF text extraction on 1-, 5- and 20-page CVs.
+
+    python -m benchmarks.bench_pdf_extract [--processes N] [--repeat R]
+
+Fixtures are generated in memory (tests/pdf_factory.py), with dense text
+pages similar to an exported CV.
+"""
+import argparse
+import os
+import statistics
+import time
+
+from app.services.pdf_extract import ExtractionPool, extract_text
+from tests.pdf_factory import make_pdf
+
+_LINE = "Led cross-functional delivery of reporting dashboards, cutting monthly close time by 30 percent"
+
+
+def _fixture(pages: int) -> bytes:
+    return make_pdf([[f"{_LINE} ({p}.{i})" for i in range(48)] for p in range(pages)])
+
+
+def _time(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--processes", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pool = ExtractionPool(processes=max(2, args.processes), tasks_per_child=50)
+    # Warm the pool so process start-up isn't billed to the first measurement
+    extract_text(_fixture(4), pool=pool, min_parallel_pages=1)
+
+    print(f"cpus={os.cpu_count()} processes={pool.processes} repeat={args.repeat}")
+    print(f"{'pages':>5}  {'serial ms':>10}  {'parallel ms':>11}  {'speedup':>7}")
+    for pages in (1, 5, 20):
+        pdf = _fixture(pages)
+        serial = _time(lambda: extract_text(pdf, max_pages=pages), args.repeat)
+        parallel = _time(lambda: extract_text(pdf, max_pages=pages, pool=pool, min_parallel_pages=1), args.repeat)
+        print(f"{pages:>5}  {serial * 1000:>10.1f}  {parallel * 1000:>11.1f}  {serial / parallel:>6.2f}x")
+    pool.reset()
+
+
+if __name__ == "__main__":
+    main()
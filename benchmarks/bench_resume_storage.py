@@ -0,0 +1,123 @@
+"""
+Benchmark: resume_sections rows vs the single resumes.document column.
+
+    python -m benchmarks.bench_resume_storage [--resumes N] [--repeat R]
+
+Runs against a throwaway in-memory SQLite database. For each layout it
+saves N resumes, re-saves them with one edited section, hydrates them one
+at a time (view/download) and as a batch (dashboard/export), and renders
+them; reporting rows stored, statements per operation and median times.
+"""
+import argparse
+import os
+import statistics
+import time
+
+os.environ["DATABASE_URL"] = "sqlite://"
+
+from sqlalchemy import event  # noqa: E402
+
+from app import create_app, db  # noqa: E402
+from app.models import Resume, ResumeSection, User  # noqa: E402
+from app.services import resume_builder  # noqa: E402
+from app.services.resume_store import hydrate, hydrate_resume, save_resume  # noqa: E402
+
+_DRAFT = {
+    "name": "Prince Asante",
+    "role": "Senior Teacher",
+    "email": "prince@example.com",
+    "phone": "+233 24 000 0000",
+    "country": "Ghana",
+    "links": "linkedin.com/in/prince",
+    "career_objective": "Experienced educator focused on learning outcomes.",
+    "experience": "ABC School (2016 - 2024)\n- Delivered curriculum\n- Mentored staff\n- Coordinated events",
+    "education": "Master of Education, Accra Teachers College (2015)",
+    "skills": "Lesson Planning, Curriculum Design, Team Leadership",
+}
+
+
+class _Counter:
+    def __init__(self):
+        self.statements = 0
+
+    def __call__(self, *args):
+        self.statements += 1
+
+
+def _measure(fn, repeat: int) -> tuple[float, int]:
+    """(median seconds, statements per call) for fn()."""
+    counter = _Counter()
+    samples = []
+    for _ in range(repeat):
+        counter.statements = 0
+        event.listen(db.engine, "before_cursor_execute", counter)
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+        event.remove(db.engine, "before_cursor_execute", counter)
+        db.session.expunge_all()
+    return statistics.median(samples), counter.statements
+
+
+def _run_layout(app, mode: str, count: int, repeat: int) -> dict:
+    app.config["RESUME_STORAGE"] = mode
+    db.drop_all()
+    db.create_all()
+    user = User(full_name="Bench", email=f"{mode}@example.com", password_hash="x")
+    db.session.add(user)
+    db.session.commit()
+    user_id = user.id
+
+    drafts = [dict(_DRAFT, role=f"{_DRAFT['role']} {i}") for i in range(count)]
+    write_s, write_q = _measure(lambda: [save_resume(user_id, d, "modern_minimal", "Resume", f"d{i}") for i, d in enumerate(drafts)], 1)
+    edited = [dict(d, skills=d["skills"] + ", Mentoring") for d in drafts]
+    update_s, update_q = _measure(lambda: [save_resume(user_id, d, "modern_minimal", "Resume", f"d{i}") for i, d in enumerate(edited)], 1)
+
+    ids = [r.id for r in Resume.query.order_by(Resume.id)]
+    one_s, one_q = _measure(lambda: [hydrate_resume(i, user_id) for i in ids], repeat)
+    batch_s, batch_q = _measure(lambda: hydrate(ids, user_id), repeat)
+
+    contexts = {}
+
+    def _render():
+        for resume_id, data in hydrate(ids, user_id).items():
+            context = contexts.get(resume_id)
+            if context is None:
+                # Enhancement (the model call) is identical across layouts; only measure data + template
+                context = contexts[resume_id] = resume_builder.enhance_resume(data)
+            resume_builder.render_resume(context, "modern_minimal")
+
+    _render()
+    render_s, render_q = _measure(_render, repeat)
+
+    rows = db.session.query(Resume).count() + db.session.query(ResumeSection).count()
+    return {
+        "rows/resume": rows / count,
+        "write ms": write_s * 1000 / count, "write q": write_q / count,
+        "update ms": update_s * 1000 / count, "update q": update_q / count,
+        "read ms": one_s * 1000 / count, "read q": one_q / count,
+        "batch ms": batch_s * 1000, "batch q": batch_q,
+        "render ms": render_s * 1000 / count, "render q": render_q / count,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--resumes", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_app()
+    app.config["HF_API_TOKEN"] = ""  # enhancement falls back to raw data, no network
+    with app.app_context():
+        results = {mode: _run_layout(app, mode, args.resumes, args.repeat) for mode in ("sections", "document")}
+
+    print(f"resumes={args.resumes} repeat={args.repeat} (per-resume unless noted; batch = all resumes at once)")
+    columns = list(results["sections"])
+    print(f"{'layout':>9}  " + "  ".join(f"{c:>10}" for c in columns))
+    for mode, row in results.items():
+        print(f"{mode:>9}  " + "  ".join(f"{row[c]:>10.2f}" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
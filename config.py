@@ -21,14 +21,82 @@ class Config:
 
     # Upload folder for profile photos
     UPLOAD_FOLDER = os.path.join(os.getcwd(), "uploads")
+    TEMPLATE_CACHE_DIR = os.environ.get("TEMPLATE_CACHE_DIR", "")  # compiled resume templates; default: <instance>/jinja_cache
     MAX_CONTENT_LENGTH = 5 * 1024 * 1024  # 5MB max upload
 
+    # Background PDF import
+    PDF_IMPORT_MAX_PAGES = int(os.environ.get("PDF_IMPORT_MAX_PAGES", "20"))
+    PDF_IMPORT_PAGE_BUDGET = float(os.environ.get("PDF_IMPORT_PAGE_BUDGET", "2.0"))  # seconds per page, checked between pages
+    PARSE_AI_THRESHOLD = float(os.environ.get("PARSE_AI_THRESHOLD", "0.75"))  # below this heuristic confidence, ask the model
+    PDF_EXTRACT_PROCESSES = int(os.environ.get("PDF_EXTRACT_PROCESSES", str(min(4, os.cpu_count() or 1))))  # <2 = serial
+    PDF_PARALLEL_MIN_PAGES = int(os.environ.get("PDF_PARALLEL_MIN_PAGES", "4"))
+    PDF_EXTRACT_TASKS_PER_CHILD = int(os.environ.get("PDF_EXTRACT_TASKS_PER_CHILD", "50"))  # worker recycling
+
+    # Resume storage layout: sections (legacy rows) | dual (document + rows) | document
+    RESUME_STORAGE = os.environ.get("RESUME_STORAGE", "dual")
+    RESUME_REVISION_CHECKPOINT_EVERY = int(os.environ.get("RESUME_REVISION_CHECKPOINT_EVERY", "20"))  # full copy every N revisions
+
+    # Server-side PDF export (optional: pip install weasyprint plus the system Pango libraries;
+    # without them downloads fall back to the printable HTML page)
+    RESUME_PDF_ENABLED = os.environ.get("RESUME_PDF_ENABLED", "true").lower() in {"1", "true", "yes", "on"}
+    RESUME_PDF_DIR = os.environ.get("RESUME_PDF_DIR", "")  # default: <instance>/resume_pdfs
+    RESUME_PDF_WAIT = float(os.environ.get("RESUME_PDF_WAIT", "3"))  # seconds a download waits on a cold render
+
+    # Public resume links (/r/<slug>)
+    PUBLIC_RESUME_DIR = os.environ.get("PUBLIC_RESUME_DIR", "")  # default: <instance>/public_resumes
+    PUBLIC_RESUME_POINTER_MAX_AGE = int(os.environ.get("PUBLIC_RESUME_POINTER_MAX_AGE", "60"))  # seconds
+    PUBLIC_SNAPSHOT_RETRY_AFTER = float(os.environ.get("PUBLIC_SNAPSHOT_RETRY_AFTER", "600"))  # seconds between re-renders of a snapshot made without AI
+    PUBLIC_VIEW_FLUSH_SIZE = int(os.environ.get("PUBLIC_VIEW_FLUSH_SIZE", "100"))
+    PUBLIC_VIEW_FLUSH_INTERVAL = float(os.environ.get("PUBLIC_VIEW_FLUSH_INTERVAL", "30"))  # seconds
+
+    # Dashboard thumbnails (static/thumbnails by default; /dashboard/thumbnails serves THUMBNAIL_DIR)
+    THUMBNAIL_DIR = os.environ.get("THUMBNAIL_DIR", "")  # default: static/thumbnails
+    THUMBNAIL_RETRY_AFTER = float(os.environ.get("THUMBNAIL_RETRY_AFTER", "3600"))  # seconds before the dashboard re-queues a failed render
+    THUMBNAIL_BACKFILL_LIMIT = int(os.environ.get("THUMBNAIL_BACKFILL_LIMIT", "5"))  # renders queued per user per interval
+    THUMBNAIL_BACKFILL_INTERVAL = float(os.environ.get("THUMBNAIL_BACKFILL_INTERVAL", "60"))  # seconds
+
+    # Server-side builder drafts (session holds only the draft id)
+    DRAFT_TTL_HOURS = float(os.environ.get("DRAFT_TTL_HOURS", "72"))
+
+    # Background cleanup of expired drafts and old jobs
+    SWEEP_INTERVAL = float(os.environ.get("SWEEP_INTERVAL", "900"))  # seconds
+
     # Hugging Face
     HF_API_TOKEN = os.environ.get("HF_API_TOKEN", "")
     HF_MODEL = os.environ.get("HF_MODEL", "Qwen/Qwen2.5-Coder-32B-Instruct")
+    HF_API_URL = os.environ.get("HF_API_URL", "https://router.huggingface.co/v1/chat/completions")
+    # Prompt variant per endpoint (generate, suggest, suggest_stream; "*" = default): full | compact
+    AI_PROMPT_VARIANTS = os.environ.get("AI_PROMPT_VARIANTS", "*=full")
+
+    # Pooled keep-alive client for the inference router (per worker process)
+    HF_POOL_SIZE = int(os.environ.get("HF_POOL_SIZE", "10"))
+    HF_CONNECT_TIMEOUT = float(os.environ.get("HF_CONNECT_TIMEOUT", "5"))  # seconds
+    HF_READ_TIMEOUT = float(os.environ.get("HF_READ_TIMEOUT", "90"))  # seconds
+    HF_HTTP2 = os.environ.get("HF_HTTP2", "false").lower() in {"1", "true", "yes", "on"}  # needs httpx[http2]
+
+    # LLM response cache: "memory" (per worker), "database" (shared), or "none"
+    LLM_CACHE_BACKEND = os.environ.get("LLM_CACHE_BACKEND", "memory")
+    LLM_CACHE_TTL = int(os.environ.get("LLM_CACHE_TTL", "3600"))  # seconds
+    LLM_CACHE_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "1000"))
+
+    # Background job queue (per worker process)
+    JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "4"))
+    JOB_QUEUE_MAX = int(os.environ.get("JOB_QUEUE_MAX", "32"))
+    JOB_TIMEOUT = int(os.environ.get("JOB_TIMEOUT", "300"))  # seconds before an unfinished job is failed
+    JOB_RETENTION_HOURS = float(os.environ.get("JOB_RETENTION_HOURS", "24"))  # jobs (payloads hold CV text) are deleted after this
+    JOB_LONGPOLL_MAX = 25  # seconds a status request may wait
+
+    # Write-behind AI usage accounting (per worker buffer)
+    AI_USAGE_FLUSH_SIZE = int(os.environ.get("AI_USAGE_FLUSH_SIZE", "50"))
+    AI_USAGE_FLUSH_INTERVAL = float(os.environ.get("AI_USAGE_FLUSH_INTERVAL", "5"))  # seconds
+    AI_USAGE_MAX_BUFFER = int(os.environ.get("AI_USAGE_MAX_BUFFER", "10000"))  # events kept while the DB is down; oldest dropped
 
-    # Rate limiting for AI routes (requests per minute)
+    # Rate limiting for AI routes (token bucket per user and per IP)
     AI_RATE_LIMIT = "30 per minute"
+    AI_RATE_LIMIT_IP = os.environ.get("AI_RATE_LIMIT_IP", "60 per minute")  # higher: shared NAT / mobile carrier IPs
+    AI_RATE_LIMIT_BACKEND = os.environ.get("AI_RATE_LIMIT_BACKEND", "memory")  # memory | database (shared by workers; Postgres only)
+    AI_RATE_LIMIT_ENABLED = True
+    RATE_LIMIT_TRUST_PROXY = IS_PRODUCTION  # Render terminates TLS and appends X-Forwarded-For
 
     # Session/cookie hardening
     SESSION_COOKIE_HTTPONLY = True
@@ -0,0 +1,35 @@
+"""Persist AI resume enhancements
+
+Revision ID: a1f3c9d2e4b7
+Revises: 5c20245b88e2
+Create Date: 2026-10-16 09:12:41.204518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1f3c9d2e4b7'
+down_revision = '5c20245b88e2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('resume_enhancements',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('content', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('resume_enhancements', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_resume_enhancements_content_hash'), ['content_hash'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('resume_enhancements', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_resume_enhancements_content_hash'))
+
+    op.drop_table('resume_enhancements')
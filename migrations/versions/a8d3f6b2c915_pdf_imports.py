@@ -0,0 +1,36 @@
+"""PDF import cache and job progress
+
+Revision ID: a8d3f6b2c915
+Revises: f2c7e5a8b694
+Create Date: 2026-10-17 09:14:26.372519
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a8d3f6b2c915'
+down_revision = 'f2c7e5a8b694'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('pdf_imports',
+    sa.Column('file_hash', sa.String(length=64), nullable=False),
+    sa.Column('page_count', sa.Integer(), nullable=True),
+    sa.Column('pages_extracted', sa.Integer(), nullable=True),
+    sa.Column('text', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('file_hash')
+    )
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('progress', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.drop_column('progress')
+
+    op.drop_table('pdf_imports')
@@ -0,0 +1,74 @@
+"""Single JSON document per resume (backfilled from resume_sections)
+
+Revision ID: a9e5d3b7c204
+Revises: f8c3a1d5e627
+Create Date: 2026-10-17 14:52:40.219836
+
+"""
+from collections import defaultdict
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9e5d3b7c204'
+down_revision = 'f8c3a1d5e627'
+branch_labels = None
+depends_on = None
+
+
+def _raw(content):
+    content = content or {}
+    return content.get('raw', content.get('text', '')) or ''
+
+
+def _document(sections):
+    """Schema v1 document (app/services/resume_document.py) from legacy section rows."""
+    personal = sections.get('personal') or {}
+    return {
+        'schema_version': 1,
+        'identity': {
+            'name': personal.get('name') or '',
+            'target_title': personal.get('role') or '',
+            'email': personal.get('email') or '',
+            'phone': personal.get('phone') or '',
+            'country': personal.get('country') or '',
+            'job_level': '',
+            'job_location': '',
+        },
+        'summary_inputs': {'career_objective': _raw(sections.get('summary')), 'abilities': '', 'years_experience': '', 'functional_focus': ''},
+        'experience': {'raw': _raw(sections.get('experience'))},
+        'education': {'raw': _raw(sections.get('education'))},
+        'skills': {'raw': _raw(sections.get('skills'))},
+        'optional_sections': {'certifications': '', 'relevant_coursework': '', 'links': personal.get('links') or ''},
+        'job_type': '',
+    }
+
+
+def upgrade():
+    with op.batch_alter_table('resumes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('document', sa.JSON().with_variant(postgresql.JSONB(astext_type=sa.Text()), 'postgresql'), nullable=True))
+
+    # Backfill: one document per resume from its section rows (sections are kept for rollback)
+    bind = op.get_bind()
+    sections = sa.table('resume_sections', sa.column('id', sa.Integer), sa.column('resume_id', sa.Integer),
+                        sa.column('section_type', sa.String), sa.column('content', sa.JSON))
+    resumes = sa.table('resumes', sa.column('id', sa.Integer), sa.column('document', sa.JSON),
+                       sa.column('updated_at', sa.DateTime))
+    by_resume = defaultdict(dict)
+    for resume_id, section_type, content in bind.execute(
+        sa.select(sections.c.resume_id, sections.c.section_type, sections.c.content).order_by(sections.c.id)
+    ):
+        by_resume[resume_id][section_type] = content
+    if by_resume:
+        bind.execute(
+            resumes.update().where(resumes.c.id == sa.bindparam('b_id')).values(document=sa.bindparam('b_document')),
+            [{'b_id': rid, 'b_document': _document(secs)} for rid, secs in by_resume.items()],
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('resumes', schema=None) as batch_op:
+        batch_op.drop_column('document')
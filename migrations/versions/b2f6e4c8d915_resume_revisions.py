@@ -0,0 +1,35 @@
+"""Resume revision history (checkpoints and deltas)
+
+Revision ID: b2f6e4c8d915
+Revises: a9e5d3b7c204
+Create Date: 2026-10-17 15:34:18.940352
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b2f6e4c8d915'
+down_revision = 'a9e5d3b7c204'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('resume_revisions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('resume_id', sa.Integer(), nullable=False),
+    sa.Column('number', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=10), nullable=False),
+    sa.Column('data', sa.JSON(), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['resume_id'], ['resumes.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('resume_id', 'number', name='uq_resume_revisions_resume_number')
+    )
+
+
+def downgrade():
+    op.drop_table('resume_revisions')
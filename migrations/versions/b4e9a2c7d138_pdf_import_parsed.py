@@ -0,0 +1,26 @@
+"""Cache parsed resume fields with PDF imports
+
+Revision ID: b4e9a2c7d138
+Revises: a8d3f6b2c915
+Create Date: 2026-10-17 11:03:48.529661
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4e9a2c7d138'
+down_revision = 'a8d3f6b2c915'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('pdf_imports', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('parsed', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('pdf_imports', schema=None) as batch_op:
+        batch_op.drop_column('parsed')
@@ -0,0 +1,39 @@
+"""Shared LLM response cache
+
+Revision ID: b7e2d4f18c30
+Revises: a1f3c9d2e4b7
+Create Date: 2026-10-16 11:40:07.918244
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e2d4f18c30'
+down_revision = 'a1f3c9d2e4b7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('llm_cache',
+    sa.Column('key', sa.String(length=64), nullable=False),
+    sa.Column('text', sa.Text(), nullable=False),
+    sa.Column('tokens', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('accessed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('key')
+    )
+    with op.batch_alter_table('llm_cache', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_llm_cache_expires_at'), ['expires_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_llm_cache_accessed_at'), ['accessed_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('llm_cache', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_llm_cache_accessed_at'))
+        batch_op.drop_index(batch_op.f('ix_llm_cache_expires_at'))
+
+    op.drop_table('llm_cache')
@@ -0,0 +1,28 @@
+"""Builder autosave: resume_drafts.form and version
+
+Revision ID: c3a7f5d9e126
+Revises: b2f6e4c8d915
+Create Date: 2026-10-17 17:02:41.518274
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3a7f5d9e126'
+down_revision = 'b2f6e4c8d915'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('resume_drafts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('form', sa.JSON(), nullable=True))
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('resume_drafts', schema=None) as batch_op:
+        batch_op.drop_column('version')
+        batch_op.drop_column('form')
@@ -0,0 +1,26 @@
+"""Add public snapshot hash to resumes
+
+Revision ID: c6f1d8e3a457
+Revises: b4e9a2c7d138
+Create Date: 2026-10-17 12:20:31.804112
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c6f1d8e3a457'
+down_revision = 'b4e9a2c7d138'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('resumes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('public_snapshot', sa.String(length=32), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('resumes', schema=None) as batch_op:
+        batch_op.drop_column('public_snapshot')
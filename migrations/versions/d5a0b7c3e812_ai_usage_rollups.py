@@ -0,0 +1,84 @@
+"""AI usage rollups (per-user totals and day/month buckets)
+
+Revision ID: d5a0b7c3e812
+Revises: c3d8a6e91f52
+Create Date: 2026-10-16 16:25:13.477092
+
+"""
+from collections import defaultdict
+from datetime import date, datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5a0b7c3e812'
+down_revision = 'c3d8a6e91f52'
+branch_labels = None
+depends_on = None
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+
+def upgrade():
+    totals = op.create_table('ai_usage_totals',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('tokens_used', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    buckets = op.create_table('ai_usage_buckets',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('period', sa.String(length=10), nullable=False),
+    sa.Column('period_start', sa.Date(), nullable=False),
+    sa.Column('tokens_used', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'period', 'period_start', name='uq_ai_usage_buckets_user_period')
+    )
+
+    # Backfill from existing ai_usages rows (aggregated per user per day in SQL)
+    usages = sa.table('ai_usages', sa.column('user_id', sa.Integer), sa.column('tokens_used', sa.Integer), sa.column('created_at', sa.DateTime))
+    day = sa.func.date(usages.c.created_at)
+    rows = op.get_bind().execute(
+        sa.select(usages.c.user_id, day.label('day'), sa.func.sum(usages.c.tokens_used).label('tokens'))
+        .where(usages.c.created_at.isnot(None))
+        .group_by(usages.c.user_id, day)
+    ).fetchall()
+
+    user_totals = defaultdict(int)
+    day_buckets = defaultdict(int)
+    month_buckets = defaultdict(int)
+    for user_id, day_value, tokens in rows:
+        d = _as_date(day_value)
+        tokens = int(tokens or 0)
+        user_totals[user_id] += tokens
+        day_buckets[(user_id, d)] += tokens
+        month_buckets[(user_id, d.replace(day=1))] += tokens
+
+    now = datetime.utcnow()
+    if user_totals:
+        op.bulk_insert(totals, [
+            {'user_id': uid, 'tokens_used': t, 'updated_at': now} for uid, t in user_totals.items()
+        ])
+    bucket_rows = [
+        {'user_id': uid, 'period': 'day', 'period_start': d, 'tokens_used': t} for (uid, d), t in day_buckets.items()
+    ] + [
+        {'user_id': uid, 'period': 'month', 'period_start': d, 'tokens_used': t} for (uid, d), t in month_buckets.items()
+    ]
+    if bucket_rows:
+        op.bulk_insert(buckets, bucket_rows)
+
+
+def downgrade():
+    op.drop_table('ai_usage_buckets')
+    op.drop_table('ai_usage_totals')
@@ -0,0 +1,28 @@
+"""Tag AI usage events with the prompt name and version
+
+Revision ID: d5b8e1f3a642
+Revises: c3a7f5d9e126
+Create Date: 2026-10-17 18:11:07.302915
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5b8e1f3a642'
+down_revision = 'c3a7f5d9e126'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('ai_usages', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('prompt', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('prompt_version', sa.String(length=32), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('ai_usages', schema=None) as batch_op:
+        batch_op.drop_column('prompt_version')
+        batch_op.drop_column('prompt')
@@ -0,0 +1,29 @@
+"""Composite index for dashboard keyset pagination
+
+Revision ID: d7a2e9f4b168
+Revises: c6f1d8e3a457
+Create Date: 2026-10-17 13:02:15.377940
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7a2e9f4b168'
+down_revision = 'c6f1d8e3a457'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'ix_resumes_user_id_updated_at',
+        'resumes',
+        ['user_id', sa.text('updated_at DESC'), sa.text('id DESC')],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index('ix_resumes_user_id_updated_at', table_name='resumes')
@@ -0,0 +1,26 @@
+"""Add dashboard thumbnail hash to resumes
+
+Revision ID: e4b8c2a7d391
+Revises: d7a2e9f4b168
+Create Date: 2026-10-17 13:41:52.106284
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4b8c2a7d391'
+down_revision = 'd7a2e9f4b168'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('resumes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('thumbnail', sa.String(length=32), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('resumes', schema=None) as batch_op:
+        batch_op.drop_column('thumbnail')
@@ -0,0 +1,29 @@
+"""Shared rate-limit token buckets
+
+Revision ID: e9b4c1d6a273
+Revises: d5a0b7c3e812
+Create Date: 2026-10-16 18:48:30.115092
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e9b4c1d6a273'
+down_revision = 'd5a0b7c3e812'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('rate_limit_buckets',
+    sa.Column('key', sa.String(length=128), nullable=False),
+    sa.Column('tokens', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+
+
+def downgrade():
+    op.drop_table('rate_limit_buckets')
@@ -0,0 +1,40 @@
+"""Server-side resume drafts
+
+Revision ID: f2c7e5a8b694
+Revises: e9b4c1d6a273
+Create Date: 2026-10-16 20:31:52.840337
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2c7e5a8b694'
+down_revision = 'e9b4c1d6a273'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('resume_drafts',
+    sa.Column('id', sa.String(length=32), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('data', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('resume_drafts', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_resume_drafts_user_id'), ['user_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_resume_drafts_expires_at'), ['expires_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('resume_drafts', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_resume_drafts_expires_at'))
+        batch_op.drop_index(batch_op.f('ix_resume_drafts_user_id'))
+
+    op.drop_table('resume_drafts')
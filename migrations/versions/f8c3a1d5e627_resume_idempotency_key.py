@@ -0,0 +1,28 @@
+"""Add draft idempotency key to resumes
+
+Revision ID: f8c3a1d5e627
+Revises: e4b8c2a7d391
+Create Date: 2026-10-17 14:15:07.662918
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f8c3a1d5e627'
+down_revision = 'e4b8c2a7d391'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('resumes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('idempotency_key', sa.String(length=64), nullable=True))
+        batch_op.create_index('ux_resumes_user_id_idempotency_key', ['user_id', 'idempotency_key'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('resumes', schema=None) as batch_op:
+        batch_op.drop_index('ux_resumes_user_id_idempotency_key')
+        batch_op.drop_column('idempotency_key')
@@ -7,12 +7,21 @@ from app.models import User
 
 
 @pytest.fixture
-def app():
+def app(tmp_path):
     """Create application for testing."""
-    app = create_app()
+    from config import Config
+
+    class TestConfig(Config):
+        # Both are read during create_app, so they can't be set afterwards. A file
+        # rather than :memory:, whose single shared connection background job threads would race on
+        SQLALCHEMY_DATABASE_URI = "sqlite:///" + str(tmp_path / "test.db")
+        TEMPLATE_CACHE_DIR = str(tmp_path / "jinja_cache")
+
+    app = create_app(TestConfig)
     app.config["TESTING"] = True
-    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
     app.config["WTF_CSRF_ENABLED"] = False
+    app.config["THUMBNAIL_DIR"] = str(tmp_path / "thumbnails")
+    app.config["UPLOAD_FOLDER"] = str(tmp_path)
     return app
 
 
@@ -49,3 +58,10 @@ def user(db_session):
     db.session.add(u)
     db.session.commit()
     return u
+
+
+@pytest.fixture
+def auth_client(client, user):
+    """Client logged in as the test user."""
+    client.post("/auth/login", data={"email": "test@example.com", "password": "testpass123"})
+    return client
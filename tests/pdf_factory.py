@@ -0,0 +1,42 @@
+"""
+Minimal text-PDF builder for tests and benchmarks (no extra dependencies).
+"""
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(pages: list[list[str]]) -> bytes:
+    """Build a PDF where each page shows the given lines in Helvetica."""
+    objects = []
+    page_ids = []
+    font_id = 3
+    next_id = 4
+    body = []
+    for lines in pages:
+        content = "BT /F1 11 Tf 14 TL 50 780 Td " + " ".join(f"({_escape(line)}) Tj T*" for line in lines) + " ET"
+        content_id, page_id = next_id, next_id + 1
+        next_id += 2
+        body.append((content_id, f"<< /Length {len(content.encode('latin-1'))} >>\nstream\n{content}\nendstream"))
+        body.append((page_id, f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {content_id} 0 R /Resources << /Font << /F1 {font_id} 0 R >> >> >>"))
+        page_ids.append(page_id)
+
+    objects.append((1, "<< /Type /Catalog /Pages 2 0 R >>"))
+    kids = " ".join(f"{pid} 0 R" for pid in page_ids)
+    objects.append((2, f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>"))
+    objects.append((font_id, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"))
+    objects.extend(body)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for obj_id, obj in sorted(objects):
+        offsets[obj_id] = len(out)
+        out += f"{obj_id} 0 obj\n{obj}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    size = max(offsets) + 1
+    out += f"xref\n0 {size}\n0000000000 65535 f \n".encode("latin-1")
+    for obj_id in range(1, size):
+        out += f"{offsets[obj_id]:010d} 00000 n \n".encode("latin-1")
+    out += f"trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    return bytes(out)
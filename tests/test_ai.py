@@ -0,0 +1,198 @@
+"""
+AI route tests.
+"""
+import json
+
+from app.routes import ai as ai_routes
+
+
+def test_suggest_async_returns_job_and_completes(auth_client, monkeypatch):
+    """Async mode returns a job id immediately; long-poll yields the result."""
+    monkeypatch.setattr(ai_routes, "get_suggestions", lambda step, form_data, user_id=None: ({"tips": [step]}, None))
+    r = auth_client.post("/api/suggest", json={"step": 2, "formData": {"role": "Nurse"}, "async": True})
+    assert r.status_code == 202
+    job_id = r.get_json()["job_id"]
+
+    r = auth_client.get(f"/api/jobs/{job_id}?wait=5")
+    assert r.status_code == 200
+    body = r.get_json()
+    assert body["status"] == "done"
+    assert body["result"] == {"tips": [2]}
+
+
+def test_enhance_async_failure_reported(auth_client, monkeypatch):
+    """Handler errors surface as a failed job."""
+    monkeypatch.setattr(ai_routes, "enhance_section", lambda section_type, content, user_id=None: (None, "HF_API_TOKEN not set"))
+    r = auth_client.post("/api/enhance?async=1", json={"section_type": "skills", "content": "Excel"})
+    job_id = r.get_json()["job_id"]
+    body = auth_client.get(f"/api/jobs/{job_id}?wait=5").get_json()
+    assert body["status"] == "failed"
+    assert body["error"] == "HF_API_TOKEN not set"
+
+
+def test_old_jobs_are_swept(app, auth_client, monkeypatch):
+    """Jobs (payloads hold CV text) are deleted once past JOB_RETENTION_HOURS."""
+    from datetime import datetime, timedelta
+    from app import db
+    from app.models import Job
+    from app.services.sweeper import sweeper
+    monkeypatch.setattr(ai_routes, "get_suggestions", lambda step, form_data, user_id=None: ({"tips": [step]}, None))
+    job_id = auth_client.post("/api/suggest", json={"step": 2, "formData": {"role": "Nurse"}, "async": True}).get_json()["job_id"]
+    auth_client.get(f"/api/jobs/{job_id}?wait=5")
+    with app.app_context():
+        assert sweeper.sweep()["jobs"] == 0
+        db.session.get(Job, job_id).created_at = datetime.utcnow() - timedelta(hours=25)
+        db.session.commit()
+        assert sweeper.sweep()["jobs"] == 1
+    assert auth_client.get(f"/api/jobs/{job_id}").status_code == 404
+
+
+def test_job_status_scoped_to_owner(auth_client):
+    """Unknown or foreign job ids are 404."""
+    assert auth_client.get("/api/jobs/does-not-exist").status_code == 404
+
+
+def test_stats_exposes_queue_and_cache(auth_client):
+    """Stats endpoint reports queue depth and cache counters."""
+    body = auth_client.get("/api/stats").get_json()
+    assert "depth" in body["jobs"]
+    assert "hits" in body["llm_cache"]
+
+
+class _FakeStream:
+    """Stands in for a streamed router response."""
+
+    def __init__(self, deltas, total_tokens):
+        self._lines = []
+        for d in deltas:
+            self._lines.append("data: " + json.dumps({"choices": [{"delta": {"content": d}}]}))
+            self._lines.append("")
+        self._lines.append("data: " + json.dumps({"choices": [], "usage": {"total_tokens": total_tokens}}))
+        self._lines.append("data: [DONE]")
+
+    def iter_lines(self):
+        yield from self._lines
+
+    def close(self):
+        pass
+
+
+def _sse_events(raw: str):
+    events = []
+    for block in raw.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_suggest_stream_emits_fields_and_tracks_usage(app, auth_client, monkeypatch):
+    """JSON fields are emitted incrementally and usage lands in AIUsage at stream end."""
+    from app.models import AIUsage
+    from app.services import ai_service
+    from app.services.usage import usage_recorder
+    deltas = ['{"summary": "Caring ', 'nurse", "skills": ["triage", ', '"charting"]', "}"]
+    app.config["HF_API_TOKEN"] = "test-token"
+    app.config["LLM_CACHE_BACKEND"] = "none"
+    monkeypatch.setattr(ai_service, "_open_chat_completion", lambda payload, token: _FakeStream(deltas, 33))
+
+    r = auth_client.post("/api/suggest/stream", json={"step": 2, "formData": {"role": "Nurse"}})
+    assert r.mimetype == "text/event-stream"
+    events = _sse_events(r.get_data(as_text=True))
+    assert events[0] == ("field", {"key": "summary", "value": "Caring nurse"})
+    assert events[1] == ("field", {"key": "skills", "value": ["triage", "charting"]})
+    assert events[-1] == ("done", {"summary": "Caring nurse", "skills": ["triage", "charting"]})
+    usage_recorder.flush()
+    with app.app_context():
+        assert [u.tokens_used for u in AIUsage.query.all()] == [33]
+
+
+def test_builder_requests_suggestions_as_stream(auth_client):
+    """The builder's suggestion button consumes the SSE endpoint rather than the blocking one."""
+    page = auth_client.get("/build").get_data(as_text=True)
+    assert "/api/suggest/stream" in page
+    assert "getReader()" in page
+
+
+def test_stream_usage_recorded_when_client_disconnects(app, db_session, user, monkeypatch):
+    """Closing the stream mid-way still records usage (chunk count when no usage event arrived)."""
+    from app.models import AIUsage
+    from app.services import ai_service
+    from app.services.usage import usage_recorder
+    deltas = ['{"summary": "Caring ', 'nurse", "skills": ["triage", ', '"charting"]', "}"]
+    app.config["HF_API_TOKEN"] = "test-token"
+    app.config["LLM_CACHE_BACKEND"] = "none"
+    monkeypatch.setattr(ai_service, "_open_chat_completion", lambda payload, token: _FakeStream(deltas, 33))
+
+    events = ai_service.stream_suggestions(2, {"role": "Nurse"}, user_id=user.id)
+    assert next(events) == ("field", {"key": "summary", "value": "Caring nurse"})
+    events.close()
+    usage_recorder.flush()
+    assert [u.tokens_used for u in AIUsage.query.all()] == [2]
+
+
+def test_incremental_json_parser_skips_fences():
+    """Parser ignores preamble and handles escapes and nesting across chunks."""
+    from app.services.ai_service import IncrementalJSONParser
+    parser = IncrementalJSONParser()
+    assert parser.feed('```json\n{"a": "x,}\\"y", "b": [1, {"c"') == [("a", 'x,}"y')]
+    assert parser.feed(': 2}]}\n```') == [("b", [1, {"c": 2}])]
+    assert parser.done
+
+
+def test_prompt_registry_versions_and_variants(app):
+    """Each variant is versioned by its text; compact variants are smaller and chosen per endpoint."""
+    from app.services.prompt_registry import prompt_registry
+    import prompts
+    full = prompt_registry.get("resume_wizard")
+    assert full.text == prompts.RESUME_WIZARD_PROMPT
+    assert full.version.startswith("full-")
+    with app.app_context():
+        app.config["AI_PROMPT_VARIANTS"] = "*=full,suggest_stream=compact"
+        assert prompt_registry.get("resume_wizard", endpoint="suggest") is full
+        compact = prompt_registry.get("resume_wizard", endpoint="suggest_stream")
+        assert compact.text == prompts.RESUME_WIZARD_PROMPT_COMPACT
+        assert compact.version.startswith("compact-")
+        assert compact.tokens < full.tokens / 2
+        app.config["AI_PROMPT_VARIANTS"] = "*=tiny"
+        assert prompt_registry.get("resume_enhancer", endpoint="suggest").variant == "full"
+
+
+def test_suggest_usage_reported_against_prompt_version(app, auth_client, monkeypatch):
+    """The system message is the same for every request; usage is tagged with the prompt version."""
+    from app import db
+    from app.models import AIUsage, User
+    from app.services import ai_service
+    from app.services.prompt_registry import prompt_registry
+    from app.services.usage import usage_recorder
+    sent = []
+
+    def _fake_post(payload, token):
+        sent.append(payload["messages"])
+        return {"choices": [{"message": {"content": '{"review": "ok"}'}}], "usage": {"prompt_tokens": 300, "completion_tokens": 20, "total_tokens": 320}}
+
+    app.config["HF_API_TOKEN"] = "test-token"
+    app.config["LLM_CACHE_BACKEND"] = "none"
+    app.config["AI_PROMPT_VARIANTS"] = "suggest=compact"
+    monkeypatch.setattr(ai_service, "_post_chat_completion", _fake_post)
+
+    for role in ("Nurse", "Teacher"):
+        assert auth_client.post("/api/suggest", json={"step": 1, "formData": {"role": role}}).get_json() == {"review": "ok"}
+    assert sent[0][0] == sent[1][0]
+    assert sent[0][0]["role"] == "system"
+    assert "Nurse" not in sent[0][0]["content"]
+
+    prompt = prompt_registry.get("resume_wizard", endpoint="suggest")
+    usage_recorder.flush()
+    with app.app_context():
+        # Another user's usage never shows up in this user's report
+        other = User(full_name="Other", email="other@example.com", password_hash="x")
+        db.session.add(other)
+        db.session.flush()
+        db.session.add(AIUsage(user_id=other.id, tokens_used=999, prompt="resume_wizard", prompt_version=prompt.version))
+        db.session.commit()
+    body = auth_client.get("/api/stats").get_json()
+    assert body["prompts"][prompt.label]["calls"] >= 2
+    assert body["prompts"][prompt.label]["prompt_tokens"] >= 600
+    assert body["prompt_usage_30d"] == [
+        {"prompt": "resume_wizard", "version": prompt.version, "calls": 2, "tokens": 640, "tokens_per_call": 320.0}
+    ]
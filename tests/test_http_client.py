@@ -0,0 +1,77 @@
+"""
+Pooled HTTP client tests against a local fake OpenAI-compatible server.
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from app.services import http_client
+from app.services.http_client import PooledHTTPClient
+
+
+class _FakeRouter(BaseHTTPRequestHandler):
+    """Minimal /v1/chat/completions endpoint with keep-alive."""
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length))
+        self.server.requests.append((self.client_address, payload))
+        if self.headers.get("Authorization") != "Bearer test-token":
+            status, body = 401, {"error": {"message": "bad token"}}
+        else:
+            content = f"echo: {payload['messages'][-1]['content']}"
+            status, body = 200, {"choices": [{"message": {"content": content}}], "usage": {"total_tokens": 7}}
+        raw = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_router():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeRouter)
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_pooled_client_reuses_connection(fake_router):
+    """Sequential requests share one keep-alive connection."""
+    host, port = fake_router.server_address
+    client = PooledHTTPClient(f"http://{host}:{port}", pool_size=2, connect_timeout=2, read_timeout=5)
+    body = json.dumps({"messages": [{"role": "user", "content": "hi"}]}).encode("utf-8")
+    headers = {"Authorization": "Bearer test-token", "Content-Type": "application/json"}
+    for _ in range(3):
+        resp = client.request("POST", "/v1/chat/completions", body=body, headers=headers)
+        assert resp.status == 200
+        assert json.loads(resp.read())["choices"][0]["message"]["content"] == "echo: hi"
+    assert client.connections_opened == 1
+    assert len({addr for addr, _ in fake_router.requests}) == 1
+    client.close()
+
+
+def test_hf_text_through_fake_router(app, fake_router, monkeypatch):
+    """_hf_text talks to a configured OpenAI-compatible endpoint and maps errors."""
+    from app.services import ai_service
+    host, port = fake_router.server_address
+    app.config["HF_API_URL"] = f"http://{host}:{port}/v1/chat/completions"
+    app.config["HF_API_TOKEN"] = "test-token"
+    app.config["LLM_CACHE_BACKEND"] = "none"
+    monkeypatch.setattr(http_client, "_clients", {})
+    with app.app_context():
+        assert ai_service._hf_text("sys", "one") == ("echo: one", 7)
+        assert ai_service._hf_text("sys", "two") == ("echo: two", 7)
+        app.config["HF_API_TOKEN"] = "wrong"
+        with pytest.raises(RuntimeError, match="Invalid API token"):
+            ai_service._hf_text("sys", "three")
+    assert len({addr for addr, _ in fake_router.requests}) == 1
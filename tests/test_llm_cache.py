@@ -0,0 +1,72 @@
+"""
+LLM response cache tests.
+"""
+from app.services import llm_cache
+from app.services.llm_cache import DatabaseCache, MemoryCache, make_key
+
+
+def _payload(content="hello", temperature=0.6):
+    return {
+        "model": "test-model",
+        "messages": [{"role": "system", "content": "sys"}, {"role": "user", "content": content}],
+        "max_tokens": 2048,
+        "temperature": temperature,
+    }
+
+
+def test_key_depends_on_request_fields():
+    """Identical requests share a key; any field change produces a new one."""
+    assert make_key(_payload()) == make_key(_payload())
+    assert make_key(_payload()) != make_key(_payload(content="other"))
+    assert make_key(_payload()) != make_key(_payload(temperature=0.7))
+
+
+def test_memory_cache_lru_eviction():
+    """Least recently used entry is evicted past max_entries."""
+    cache = MemoryCache(ttl=60, max_entries=2)
+    cache.set("a", "A", 1)
+    cache.set("b", "B", 2)
+    assert cache.get("a") == ("A", 1)
+    cache.set("c", "C", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == ("A", 1)
+    assert cache.info()["hits"] == 2
+    assert cache.info()["misses"] == 1
+
+
+def test_memory_cache_ttl_expiry():
+    """Expired entries are misses."""
+    cache = MemoryCache(ttl=0, max_entries=10)
+    cache.set("a", "A", 1)
+    assert cache.get("a") is None
+
+
+def test_database_cache_roundtrip_and_bound(app, db_session):
+    """Database backend stores, serves and bounds entries."""
+    cache = DatabaseCache(ttl=60, max_entries=2)
+    cache.set("a", "A", 1)
+    cache.set("b", "B", 2)
+    cache.set("c", "C", 3)
+    assert cache.info()["size"] == 2
+    assert cache.get("c") == ("C", 3)
+    assert cache.get("missing") is None
+
+
+def test_hf_text_served_from_cache(app, monkeypatch):
+    """Second identical call does not reach the router."""
+    from app.services import ai_service
+    calls = []
+
+    def _fake_request(payload, api_token):
+        calls.append(payload)
+        return {"choices": [{"message": {"content": "polished"}}], "usage": {"total_tokens": 12}}
+
+    app.config["HF_API_TOKEN"] = "test-token"
+    app.config["LLM_CACHE_BACKEND"] = "memory"
+    monkeypatch.setattr(llm_cache, "_caches", {})
+    monkeypatch.setattr(ai_service, "_post_chat_completion", _fake_request)
+    with app.app_context():
+        assert ai_service._hf_text("sys", "hello") == ("polished", 12)
+        assert ai_service._hf_text("sys", "hello") == ("polished", 0)
+        assert llm_cache.cache_stats()["hits"] == 1
+    assert len(calls) == 1
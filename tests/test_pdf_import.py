@@ -0,0 +1,116 @@
+"""
+PDF import pipeline tests.
+"""
+import io
+import time
+
+from app.models import PdfImport
+from app.services.pdf_import import extract_pages
+from tests.pdf_factory import make_pdf
+
+
+def _cv_pdf(pages=3):
+    first = ["Ama Mensah", "Data Analyst", "ama@example.com | +233 24 123 4567", "SKILLS", "SQL, Python, Excel",
+             "EXPERIENCE", "Acme Ltd (2021 - Present)"]
+    more = [f"- Experience line {i}: built dashboards and automated monthly KPI reports" for i in range(12)]
+    last = ["EDUCATION", "BSc Statistics, University of Ghana"]
+    return make_pdf([first + more] + [more for _ in range(pages - 2)] + ([last] if pages > 1 else []))
+
+
+def _poll(client, status_url, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        body = client.get(status_url).get_json()
+        if body.get("status") in ("done", "failed"):
+            return body
+        time.sleep(0.05)
+    raise AssertionError("import did not finish")
+
+
+def test_extract_pages_respects_page_limit():
+    """Extraction stops at max_pages and reports progress per page."""
+    seen = []
+    text, extracted, total = extract_pages(io.BytesIO(_cv_pdf(5)), max_pages=2, on_page=lambda d, t: seen.append((d, t)))
+    assert (extracted, total) == (2, 5)
+    assert seen == [(1, 2), (2, 2)]
+    assert "Experience line 0" in text
+    assert "University of Ghana" not in text
+
+
+def test_import_runs_in_background_and_is_cached(app, auth_client):
+    """Upload returns a job; polling yields a draft; re-upload hits the hash cache."""
+    pdf = _cv_pdf(3)
+    r = auth_client.post("/build/import", data={"resume_file": (io.BytesIO(pdf), "cv.pdf")})
+    assert r.status_code == 202
+    body = _poll(auth_client, r.get_json()["status_url"])
+    assert body["status"] == "done"
+    assert body["redirect"].endswith("/templates")
+    with app.app_context():
+        record = PdfImport.query.one()
+        assert record.parsed["name"] == "Ama Mensah"
+        assert record.parsed["skills"] == "SQL, Python, Excel"
+
+    r = auth_client.post("/build/import", data={"resume_file": (io.BytesIO(pdf), "cv-again.pdf")})
+    assert r.status_code == 200
+    assert r.get_json()["status"] == "done"
+
+
+def test_unreadable_upload_is_removed(app, auth_client):
+    """A PDF that fails to parse doesn't stay in the import folder."""
+    import os
+    r = auth_client.post("/build/import", data={"resume_file": (io.BytesIO(b"%PDF-1.4 not really"), "bad.pdf")})
+    body = _poll(auth_client, r.get_json()["status_url"])
+    assert body["status"] == "failed"
+    assert os.listdir(os.path.join(app.config["UPLOAD_FOLDER"], "imports")) == []
+
+
+def test_builder_upload_redirects_to_progress(auth_client):
+    """Legacy multipart /build upload redirects to the builder with an import job to poll."""
+    r = auth_client.post("/build", data={"resume_file": (io.BytesIO(_cv_pdf(1)), "cv.pdf")})
+    assert r.status_code == 302
+    assert "import_job=" in r.location
+
+
+def test_parallel_extraction_matches_serial():
+    """Page ranges extracted in worker processes merge back in page order."""
+    from app.services.pdf_extract import ExtractionPool, extract_text, page_ranges
+    assert page_ranges(10, 3) == [(0, 4), (4, 7), (7, 10)]
+    assert page_ranges(2, 4) == [(0, 1), (1, 2)]
+
+    pdf = make_pdf([[f"Page {i} marker"] for i in range(6)])
+    serial = extract_text(pdf, max_pages=20)
+    pool = ExtractionPool(processes=2, tasks_per_child=2)
+    try:
+        progress = []
+        parallel = extract_text(pdf, max_pages=20, pool=pool, min_parallel_pages=4, on_page=lambda d, t: progress.append(d))
+    finally:
+        pool.reset()
+    assert parallel == serial
+    assert parallel[1:] == (6, 6)
+    assert [f"Page {i} marker" in parallel[0] for i in range(6)] == [True] * 6
+    assert progress[-1] == 6
+
+
+def test_pool_reset_replaces_stuck_pool():
+    """Resetting a pool stuck on a slow task cancels queued work and new work runs on a fresh pool."""
+    from app.services.pdf_extract import ExtractionPool
+    pool = ExtractionPool(processes=1)
+    stuck = pool.executor()
+    busy = stuck.submit(time.sleep, 2)
+    started = time.monotonic()
+    while not busy.running() and time.monotonic() - started < 30:
+        time.sleep(0.05)
+    queued = [stuck.submit(time.sleep, 0) for _ in range(4)]
+
+    pool.reset()
+    # Cancellation happens on the old pool's management thread
+    started = time.monotonic()
+    while not queued[-1].cancelled() and time.monotonic() - started < 10:
+        time.sleep(0.05)
+    assert queued[-1].cancelled()
+    try:
+        fresh = pool.executor()
+        assert fresh is not stuck
+        assert fresh.submit(sum, [1, 2]).result(timeout=30) == 3
+    finally:
+        pool.reset()
@@ -0,0 +1,51 @@
+"""
+Rate limiter tests.
+"""
+import pytest
+from app.routes import ai as ai_routes
+from app.services.rate_limit import DatabaseBackend, MemoryBackend, parse_rate, rate_limiter
+
+
+def test_parse_rate():
+    assert parse_rate("30 per minute") == (30, 60.0)
+    assert parse_rate("5/second") == (5, 1.0)
+    with pytest.raises(ValueError):
+        parse_rate("lots")
+
+
+@pytest.mark.parametrize("backend_cls", [MemoryBackend, DatabaseBackend])
+def test_bucket_allows_burst_then_blocks(app, db_session, backend_cls):
+    """A bucket admits `limit` calls, then reports a retry delay."""
+    backend = backend_cls()
+    results = [backend.hit("ai:user:1", 3, 60.0) for _ in range(4)]
+    assert [allowed for allowed, _ in results] == [True, True, True, False]
+    assert 0 < results[-1][1] <= 20
+    assert backend.hit("ai:user:2", 3, 60.0)[0]
+
+
+def test_database_backend_fails_open_when_locked(app, db_session, monkeypatch):
+    """A locked or unavailable database lets the request through instead of raising."""
+    from sqlalchemy.exc import OperationalError
+    from app import db
+    attempts = []
+
+    def _locked():
+        attempts.append(1)
+        raise OperationalError("SELECT", {}, Exception("database is locked"))
+
+    monkeypatch.setattr(db.engine, "begin", _locked)
+    assert DatabaseBackend().hit("ai:user:1", 3, 60.0) == (True, 0.0)
+    assert len(attempts) == 2
+
+
+def test_ai_routes_return_429_with_retry_after(app, auth_client, monkeypatch):
+    """Exceeding the per-user limit yields 429 and Retry-After; GET polling is not limited."""
+    monkeypatch.setattr(ai_routes, "enhance_section", lambda section_type, content, user_id=None: ("ok", None))
+    app.config["AI_RATE_LIMIT"] = "2 per minute"
+    rate_limiter.init_app(app)
+
+    codes = [auth_client.post("/api/enhance", json={"content": "x"}).status_code for _ in range(3)]
+    assert codes == [200, 200, 429]
+    r = auth_client.post("/api/enhance", json={"content": "x"})
+    assert int(r.headers["Retry-After"]) >= 1
+    assert auth_client.get("/api/stats").status_code == 200
@@ -23,3 +23,558 @@ def test_landing_loads(client):
     """Landing page loads for anonymous users."""
     r = client.get("/")
     assert r.status_code == 200
+
+
+BUILDER_FORM = {
+    "name": "Ama Mensah",
+    "role": "Data Analyst",
+    "skills": "SQL, Python",
+    "experience": "Built weekly sales dashboards. " * 200,
+    "education": "BSc Statistics",
+    "template_name": "modern_minimal",
+}
+
+
+def test_builder_stores_draft_server_side(app, auth_client):
+    """Resume data goes to the draft store; the session cookie only carries the draft id."""
+    from app import db
+    from app.models import ResumeDraft
+    r = auth_client.post("/build", data=BUILDER_FORM)
+    assert r.status_code == 302
+    assert "/templates" in r.location
+    with auth_client.session_transaction() as sess:
+        assert "resume_data" not in sess
+        draft_id = sess["draft_id"]
+    with app.app_context():
+        draft = db.session.get(ResumeDraft, draft_id)
+        assert draft.data["name"] == "Ama Mensah"
+
+    r = auth_client.get("/templates")
+    assert r.status_code == 200
+    assert b"Ama Mensah" in r.data
+
+
+def test_expired_draft_is_not_loaded(app, auth_client):
+    """An expired draft sends the user back to the builder."""
+    from datetime import datetime, timedelta
+    from app import db
+    from app.models import ResumeDraft
+    auth_client.post("/build", data=BUILDER_FORM)
+    with app.app_context():
+        draft = ResumeDraft.query.first()
+        draft.expires_at = datetime.utcnow() - timedelta(minutes=1)
+        db.session.commit()
+    r = auth_client.get("/templates", follow_redirects=False)
+    assert r.status_code == 302
+    assert "/build" in r.location
+
+
+def test_reading_a_draft_extends_its_expiry(app, auth_client):
+    """A draft that is still being viewed doesn't lapse: loading it pushes the expiry out."""
+    from datetime import datetime, timedelta
+    from app import db
+    from app.models import ResumeDraft
+    auth_client.post("/build", data=BUILDER_FORM)
+    with app.app_context():
+        draft = ResumeDraft.query.one()
+        draft.expires_at = datetime.utcnow() + timedelta(minutes=5)
+        db.session.commit()
+    assert auth_client.get("/templates").status_code == 200
+    with app.app_context():
+        assert ResumeDraft.query.one().expires_at > datetime.utcnow() + timedelta(hours=1)
+
+
+def _saved_resume(app, user_id):
+    from app import db
+    from app.models import Resume, ResumeSection
+    with app.app_context():
+        resume = Resume(user_id=user_id, title="Resume - Data Analyst", template_name="modern_minimal")
+        db.session.add(resume)
+        db.session.flush()
+        db.session.add(ResumeSection(resume_id=resume.id, section_type="personal", content={"name": "Ama Mensah", "role": "Data Analyst"}))
+        db.session.add(ResumeSection(resume_id=resume.id, section_type="skills", content={"raw": "SQL, Python"}))
+        db.session.commit()
+        return resume.id
+
+
+@pytest.fixture
+def fake_pdf(monkeypatch):
+    """Stand-in for WeasyPrint that records each render."""
+    from app.services import resume_pdf
+    renders = []
+
+    class _FakeHTML:
+        def __init__(self, string, base_url=None):
+            self.string = string
+
+        def write_pdf(self):
+            renders.append(self.string)
+            return b"%PDF-1.7 fake"
+
+    monkeypatch.setattr(resume_pdf, "HTML", _FakeHTML)
+    return renders
+
+
+@pytest.fixture
+def fake_enhancement(monkeypatch):
+    """Model stand-in for the resume enhancement; set `.fail = True` to simulate an outage."""
+    from collections import OrderedDict
+    from app.services import resume_builder
+
+    class _Enhancer:
+        fail = False
+        calls = 0
+
+        def __call__(self, resume_data):
+            self.calls += 1
+            if self.fail:
+                return {}
+            return {"professional_summary": "Analyst who ships.", "experience_bullets": [], "career_value": ""}
+
+    enhancer = _Enhancer()
+    monkeypatch.setattr(resume_builder, "_ai_enhance", enhancer)
+    monkeypatch.setattr(resume_builder, "_context_cache", OrderedDict())
+    return enhancer
+
+
+def test_download_renders_pdf_once_and_revalidates(app, auth_client, user, fake_pdf, fake_enhancement, tmp_path):
+    """First download renders in the background; repeats are file reads with validators."""
+    app.config["RESUME_PDF_DIR"] = str(tmp_path)
+    resume_id = _saved_resume(app, user.id)
+
+    r = auth_client.get(f"/resume/{resume_id}/download")
+    assert r.status_code == 200
+    assert r.mimetype == "application/pdf"
+    assert r.data == b"%PDF-1.7 fake"
+    assert "Ama Mensah" in fake_pdf[0]
+    etag = r.headers["ETag"]
+    assert r.headers["Last-Modified"]
+
+    r = auth_client.get(f"/resume/{resume_id}/download", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    r = auth_client.get(f"/resume/{resume_id}/download")
+    assert r.status_code == 200
+    assert len(fake_pdf) == 1
+
+
+def test_pdf_rendered_without_enhancement_is_not_cached(app, auth_client, user, fake_pdf, fake_enhancement, tmp_path):
+    """A model outage yields a one-off PDF; the next download renders again and caches the enhanced one."""
+    import os
+    app.config["RESUME_PDF_DIR"] = str(tmp_path / "pdfs")
+    resume_id = _saved_resume(app, user.id)
+
+    fake_enhancement.fail = True
+    r = auth_client.get(f"/resume/{resume_id}/download")
+    assert r.status_code == 200
+    assert r.data == b"%PDF-1.7 fake"
+    assert "ETag" not in r.headers
+    assert "no-store" in r.headers["Cache-Control"]
+    assert os.listdir(tmp_path / "pdfs") == []
+
+    fake_enhancement.fail = False
+    r = auth_client.get(f"/resume/{resume_id}/download")
+    assert r.headers["ETag"]
+    assert "Analyst who ships." in fake_pdf[-1]
+    assert len(fake_pdf) == 2
+
+
+def test_download_falls_back_to_html_without_renderer(app, auth_client, user, monkeypatch):
+    """Servers without WeasyPrint keep the printable HTML page."""
+    from app.services import resume_pdf
+    monkeypatch.setattr(resume_pdf, "HTML", None)
+    resume_id = _saved_resume(app, user.id)
+    r = auth_client.get(f"/resume/{resume_id}/download")
+    assert r.status_code == 200
+    assert b"Ama Mensah" in r.data
+
+
+def test_view_answers_conditional_get_without_rendering(app, auth_client, user, monkeypatch):
+    """A matching If-None-Match gets a 304 before any rendering; an update changes the ETag."""
+    from app import db
+    from app.models import Resume
+    from app.routes import resume as resume_routes
+    resume_id = _saved_resume(app, user.id)
+
+    r = auth_client.get(f"/resume/{resume_id}")
+    assert r.status_code == 200
+    etag = r.headers["ETag"]
+    assert "private" in r.headers["Cache-Control"]
+    assert "no-cache" in r.headers["Cache-Control"]
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("should not render")
+
+    monkeypatch.setattr(resume_routes, "build_resume_html", _fail)
+    r = auth_client.get(f"/resume/{resume_id}", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.headers["ETag"] == etag
+
+    with app.app_context():
+        db.session.get(Resume, resume_id).template_name = "simple_ats"
+        db.session.commit()
+    monkeypatch.undo()
+    r = auth_client.get(f"/resume/{resume_id}", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["ETag"] != etag
+
+
+def test_view_revalidation_covers_csrf_token_and_flashes(app, auth_client, user):
+    """A 304 never keeps a page whose CSRF token changed, and queued flashes always get a full page."""
+    resume_id = _saved_resume(app, user.id)
+    etag = auth_client.get(f"/resume/{resume_id}").headers["ETag"]
+    assert auth_client.get(f"/resume/{resume_id}", headers={"If-None-Match": etag}).status_code == 304
+
+    with auth_client.session_transaction() as sess:
+        sess["_flashes"] = [("success", "Resume saved to dashboard.")]
+    r = auth_client.get(f"/resume/{resume_id}", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert b"Resume saved to dashboard." in r.data
+    assert "no-store" in r.headers["Cache-Control"]
+
+    with auth_client.session_transaction() as sess:
+        sess["csrf_token"] = "rotated"
+    r = auth_client.get(f"/resume/{resume_id}", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["ETag"] != etag
+
+
+def test_public_link_serves_snapshot_without_rendering(app, auth_client, user, fake_enhancement, monkeypatch, tmp_path):
+    """Published resumes are rendered once; public hits are file reads with batched view counts."""
+    from app import db
+    from app.models import Resume
+    from app.services import public_resume
+    app.config["PUBLIC_RESUME_DIR"] = str(tmp_path)
+    resume_id = _saved_resume(app, user.id)
+    with app.app_context():
+        saved_at = db.session.get(Resume, resume_id).updated_at
+
+    r = auth_client.post(f"/resume/{resume_id}/publish")
+    assert r.status_code == 302
+    with app.app_context():
+        resume = db.session.get(Resume, resume_id)
+        slug, snapshot, updated_at = resume.public_slug, resume.public_snapshot, resume.updated_at
+    assert resume.is_public and snapshot
+    # Sharing is not an edit: the content timestamp is untouched
+    assert updated_at == saved_at
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("public hits must not render")
+
+    monkeypatch.setattr(public_resume, "build_resume_html", _fail)
+    anon = app.test_client()
+    for _ in range(3):
+        r = anon.get(f"/r/{slug}")
+        assert r.status_code == 302
+        assert r.location.endswith(f"/r/{slug}/{snapshot}")
+        assert "public" in r.headers["Cache-Control"]
+
+    r = anon.get(f"/r/{slug}/{snapshot}")
+    assert r.status_code == 200
+    assert b"Ama Mensah" in r.data
+    assert "immutable" in r.headers["Cache-Control"]
+    assert "max-age=31536000" in r.headers["Cache-Control"]
+    assert "script-src 'none'" in r.headers["Content-Security-Policy"]
+    assert "Set-Cookie" not in r.headers
+    # The snapshot is only served under the slug that shares it
+    assert anon.get(f"/r/someone-else/{snapshot}").status_code == 404
+
+    assert public_resume.view_counter.pending() == 3
+    assert public_resume.view_counter.flush() == 3
+    with app.app_context():
+        resume = db.session.get(Resume, resume_id)
+        assert resume.views == 3
+        assert resume.updated_at == updated_at
+
+    auth_client.post(f"/resume/{resume_id}/unpublish")
+    assert anon.get(f"/r/{slug}").status_code == 404
+    assert anon.get(f"/r/{slug}/{snapshot}").status_code == 404
+    with app.app_context():
+        resume = db.session.get(Resume, resume_id)
+        assert not resume.is_public and resume.public_slug == slug
+        assert resume.updated_at == saved_at
+
+
+def test_fallback_snapshot_is_rerendered_in_background(app, auth_client, user, fake_enhancement, monkeypatch, tmp_path):
+    """A snapshot published during a model outage is replaced once the model is back, keeping updated_at."""
+    from app import db
+    from app.models import Resume
+    from app.services import jobs, public_resume
+    app.config["PUBLIC_RESUME_DIR"] = str(tmp_path)
+    monkeypatch.setattr(public_resume, "_retried", {})
+    resume_id = _saved_resume(app, user.id)
+
+    fake_enhancement.fail = True
+    auth_client.post(f"/resume/{resume_id}/publish")
+    with app.app_context():
+        resume = db.session.get(Resume, resume_id)
+        slug, fallback, updated_at = resume.public_slug, resume.public_snapshot, resume.updated_at
+        assert public_resume.is_fallback_snapshot(fallback)
+
+    fake_enhancement.fail = False
+    anon = app.test_client()
+    assert anon.get(f"/r/{slug}").location.endswith(fallback)
+    anon.get(f"/r/{slug}")
+    with app.app_context():
+        job_ids = [j.id for j in jobs.Job.query.filter_by(kind="public_snapshot")]
+    assert len(job_ids) == 1
+    jobs.job_queue.wait(job_ids[0], timeout=10)
+
+    with app.app_context():
+        resume = db.session.get(Resume, resume_id)
+        assert resume.public_snapshot != fallback
+        assert not public_resume.is_fallback_snapshot(resume.public_snapshot)
+        assert resume.updated_at == updated_at
+    assert b"Analyst who ships." in anon.get(f"/r/{slug}", follow_redirects=True).data
+    assert public_resume.view_counter.flush() == 3
+
+
+def test_saving_queues_thumbnail_for_dashboard(app, auth_client, user, monkeypatch):
+    """Saving renders a thumbnail in the background; the dashboard only links the stored file."""
+    import os
+    from app import db
+    from app.models import Resume
+    from app.services import jobs, thumbnails
+
+    auth_client.post("/build", data=BUILDER_FORM)
+    assert auth_client.post("/save", data={"title": "Analyst CV"}).status_code == 302
+    with app.app_context():
+        resume = Resume.query.filter_by(title="Analyst CV").one()
+        job = jobs.Job.query.filter_by(kind="resume_thumbnail").one()
+    jobs.job_queue.wait(job.id, timeout=10)
+    with app.app_context():
+        resume = db.session.get(Resume, resume.id)
+        thumbnail = resume.thumbnail
+    assert thumbnail
+    assert os.path.exists(os.path.join(app.config["THUMBNAIL_DIR"], f"{thumbnail}.html"))
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("dashboard must not queue renders for resumes with thumbnails")
+
+    monkeypatch.setattr(thumbnails, "request_thumbnail", _fail)
+    r = auth_client.get("/dashboard/")
+    # THUMBNAIL_DIR is a tmp dir here, so cards link the blueprint route rather than static/
+    url = f"/dashboard/thumbnails/{thumbnail}.html"
+    assert url.encode() in r.data
+    r = auth_client.get(url)
+    assert r.status_code == 200
+    assert "script-src 'none'" in r.headers["Content-Security-Policy"]
+    assert auth_client.get("/dashboard/thumbnails/../x.html").status_code == 404
+
+
+def test_thumbnail_backfill_is_capped_per_user(app, auth_client, user, monkeypatch):
+    """Older resumes are backfilled a few at a time, not one job per card per page load."""
+    from app.services import jobs, thumbnails
+    monkeypatch.setattr(thumbnails, "_backfill_budget", {})
+    app.config["THUMBNAIL_BACKFILL_LIMIT"] = 2
+    for _ in range(4):
+        _saved_resume(app, user.id)
+    auth_client.get("/dashboard/")
+    auth_client.get("/dashboard/resumes")
+    with app.app_context():
+        job_ids = [j.id for j in jobs.Job.query.filter_by(kind="resume_thumbnail")]
+    assert len(job_ids) == 2
+    for job_id in job_ids:
+        jobs.job_queue.wait(job_id, timeout=10)
+
+
+def test_thumbnail_backfill_never_calls_the_model(app, auth_client, user, monkeypatch):
+    """Backfilled thumbnails render stored data only, and a failed render is not re-queued on every load."""
+    import os
+    from app import db
+    from app.models import Resume
+    from app.services import jobs, resume_builder, thumbnails
+
+    def _no_ai(*args, **kwargs):
+        raise AssertionError("thumbnails must not call the model")
+
+    monkeypatch.setattr(resume_builder, "_ai_enhance", _no_ai)
+    monkeypatch.setattr(thumbnails, "_failed", {})
+    monkeypatch.setattr(thumbnails, "_backfill_budget", {})
+    resume_id = _saved_resume(app, user.id)
+    auth_client.get("/dashboard/")
+    with app.app_context():
+        job = jobs.Job.query.filter_by(kind="resume_thumbnail").one()
+    jobs.job_queue.wait(job.id, timeout=10)
+    with app.app_context():
+        thumbnail = db.session.get(Resume, resume_id).thumbnail
+    with open(os.path.join(app.config["THUMBNAIL_DIR"], f"{thumbnail}.html"), encoding="utf-8") as f:
+        html = f.read()
+    assert "Ama Mensah" in html
+    assert "script-src 'none'" in html
+
+    def _broken(resume):
+        raise RuntimeError("render failed")
+
+    monkeypatch.setattr(thumbnails, "render_thumbnail", _broken)
+    other_id = _saved_resume(app, user.id)
+    auth_client.get("/dashboard/")
+    with app.app_context():
+        job_ids = [j.id for j in jobs.Job.query.filter_by(kind="resume_thumbnail")]
+    for job_id in job_ids:
+        jobs.job_queue.wait(job_id, timeout=10)
+    assert other_id in thumbnails._failed
+    auth_client.get("/dashboard/")
+    with app.app_context():
+        assert jobs.Job.query.filter_by(kind="resume_thumbnail").count() == 2
+        assert db.session.get(Resume, other_id).thumbnail is None
+
+
+def test_select_then_save_keeps_one_resume(app, auth_client, user):
+    """Selecting a template and then pressing Save (twice) doesn't duplicate the resume."""
+    from app.models import Resume, ResumeSection
+    auth_client.post("/build", data=BUILDER_FORM)
+    auth_client.post("/templates/select", data={"template_name": "simple_ats"})
+    auth_client.post("/save")
+    auth_client.post("/save")
+    with app.app_context():
+        assert Resume.query.count() == 1
+        assert ResumeSection.query.count() == 5
+
+
+def test_edit_and_revision_api(app, auth_client, user):
+    """Resumes are edited in place; history can be listed, diffed and restored."""
+    from app.models import Resume
+    auth_client.post("/build", data=BUILDER_FORM)
+    auth_client.post("/save")
+    with app.app_context():
+        resume_id = Resume.query.one().id
+
+    r = auth_client.post(f"/resume/{resume_id}/edit", json={"fields": {"skills": "SQL, Python, dbt"}})
+    assert r.get_json()["changed"] is True
+    assert r.get_json()["revision"] == 2
+    assert auth_client.post(f"/resume/{resume_id}/edit", json={"template_name": "nope"}).status_code == 400
+    assert auth_client.post(f"/resume/{resume_id}/edit", json=[{"fields": {}}]).status_code == 400
+    assert auth_client.post(f"/resume/{resume_id}/edit", json={"title": 5}).status_code == 400
+    assert auth_client.post(f"/resume/{resume_id}/edit", json={"title": "x" * 256}).status_code == 400
+
+    history = auth_client.get(f"/resume/{resume_id}/revisions").get_json()["revisions"]
+    assert [h["number"] for h in history] == [2, 1]
+    diff = auth_client.get(f"/resume/{resume_id}/revisions/1/diff/2").get_json()
+    assert diff["changes"] == [{"field": "document.skills.raw", "before": "SQL, Python", "after": "SQL, Python, dbt"}]
+
+    r = auth_client.post(f"/resume/{resume_id}/revisions/1/restore")
+    assert r.get_json() == {"changed": True, "revision": 3}
+    state = auth_client.get(f"/resume/{resume_id}/revisions/3").get_json()["state"]
+    assert state["document"]["skills"]["raw"] == "SQL, Python"
+    assert auth_client.get(f"/resume/{resume_id}/revisions/9").status_code == 404
+    with app.app_context():
+        assert Resume.query.count() == 1
+
+
+def test_concurrent_edit_returns_conflict(app, auth_client, monkeypatch):
+    """An edit that loses the race for the next revision number is rolled back and answered with 409."""
+    from app import db
+    from app.models import Resume
+    from app.services import revisions
+    from app.services.resume_store import resume_to_data
+    auth_client.post("/build", data=BUILDER_FORM)
+    auth_client.post("/save")
+    with app.app_context():
+        resume_id = Resume.query.one().id
+    assert auth_client.post(f"/resume/{resume_id}/edit", json={"fields": {"skills": "SQL, Python, dbt"}}).status_code == 200
+
+    # As if another request appended revision 2 after this one read the latest number
+    monkeypatch.setattr(revisions, "latest_number", lambda resume_id: 1)
+    r = auth_client.post(f"/resume/{resume_id}/edit", json={"fields": {"skills": "Excel"}})
+    assert r.status_code == 409
+    assert r.get_json()["revision"] == 2
+    assert auth_client.post(f"/resume/{resume_id}/revisions/1/restore").status_code == 409
+    monkeypatch.undo()
+
+    state = auth_client.get(f"/resume/{resume_id}/revisions/2").get_json()["state"]
+    assert state["document"]["skills"]["raw"] == "SQL, Python, dbt"
+    assert [h["number"] for h in auth_client.get(f"/resume/{resume_id}/revisions").get_json()["revisions"]] == [2, 1]
+    with app.app_context():
+        assert resume_to_data(db.session.get(Resume, resume_id))["skills"] == "SQL, Python, dbt"
+
+
+def test_builder_autosave_applies_patches_with_version_check(app, auth_client):
+    """Autosave stores only the sent fields, bumps the version and rejects stale versions."""
+    r = auth_client.get("/build/draft")
+    assert r.get_json() == {"version": 0, "fields": {}}
+
+    r = auth_client.patch("/build/draft", json={"version": 0, "fields": {"name": "Ama Mensah", "role": "Analyst"}})
+    assert r.status_code == 200
+    assert r.get_json() == {"version": 1}
+    r = auth_client.patch("/build/draft", json={"version": 1, "fields": {"role": "Data Analyst", "name": None}})
+    assert r.get_json() == {"version": 2}
+    assert auth_client.get("/build/draft").get_json() == {"version": 2, "fields": {"role": "Data Analyst"}}
+
+    # A client still at version 1 gets the current copy back and nothing is written
+    r = auth_client.patch("/build/draft", json={"version": 1, "fields": {"role": "Teacher"}})
+    assert r.status_code == 409
+    assert r.get_json()["version"] == 2
+    assert r.get_json()["fields"] == {"role": "Data Analyst"}
+
+    assert auth_client.patch("/build/draft", json={"version": 2, "fields": {"Bad-Name": "x"}}).status_code == 400
+    assert auth_client.patch("/build/draft", json={"version": 2, "fields": {"skills": 3}}).status_code == 400
+    assert auth_client.patch("/build/draft", json={"fields": {"skills": "SQL"}}).status_code == 400
+
+    # Autosaved progress alone is not a finished draft; submitting the builder starts a fresh one
+    assert auth_client.get("/templates").status_code == 302
+    auth_client.post("/build", data=BUILDER_FORM)
+    assert auth_client.get("/build/draft").get_json() == {"version": 1, "fields": {}}
+
+
+def test_expired_draft_restarts_autosave(app, auth_client):
+    """An abandoned draft expires; autosave starts a fresh one and purges the old row."""
+    from datetime import datetime, timedelta
+    from app import db
+    from app.models import ResumeDraft
+    auth_client.patch("/build/draft", json={"version": 0, "fields": {"name": "Ama"}})
+    with app.app_context():
+        draft = ResumeDraft.query.one()
+        old_id = draft.id
+        draft.expires_at = datetime.utcnow() - timedelta(minutes=1)
+        db.session.commit()
+
+    assert auth_client.get("/build/draft").get_json() == {"version": 0, "fields": {}}
+    r = auth_client.patch("/build/draft", json={"version": 3, "fields": {"name": "Kofi"}})
+    assert r.status_code == 409
+    r = auth_client.patch("/build/draft", json={"version": 0, "fields": {"name": "Kofi"}})
+    assert r.get_json() == {"version": 1}
+    with app.app_context():
+        assert [d.id for d in ResumeDraft.query.all()] != [old_id]
+        assert ResumeDraft.query.count() == 1
+
+
+def test_saving_a_build_clears_autosaved_form(app, auth_client):
+    """Once the build is saved, the builder no longer restores its autosaved fields."""
+    auth_client.post("/build", data=BUILDER_FORM)
+    version = auth_client.get("/build/draft").get_json()["version"]
+    auth_client.patch("/build/draft", json={"version": version, "fields": {"name": "Ama Mensah"}})
+    auth_client.post("/templates/select", data={"template_name": "simple_ats"})
+    auth_client.post("/save", data={"title": "Mine"})
+    assert auth_client.get("/build/draft").get_json()["fields"] == {}
+
+
+def test_autosave_rejects_non_object_payload(auth_client):
+    """A JSON array (or any non-object) body is a 400, not a server error."""
+    assert auth_client.patch("/build/draft", json=[1, 2]).status_code == 400
+    assert auth_client.patch("/build/draft", json="x").status_code == 400
+
+
+def test_draft_sweeper_deletes_expired_drafts(app, auth_client):
+    """Expired drafts are removed by the sweeper without any new draft being created."""
+    from datetime import datetime, timedelta
+    from app import db
+    from app.models import ResumeDraft
+    from app.services.sweeper import sweeper
+    auth_client.patch("/build/draft", json={"version": 0, "fields": {"name": "Ama"}})
+    with app.app_context():
+        assert sweeper.sweep()["drafts"] == 0
+        ResumeDraft.query.one().expires_at = datetime.utcnow() - timedelta(minutes=1)
+        db.session.commit()
+        assert sweeper.sweep()["drafts"] == 1
+        assert ResumeDraft.query.count() == 0
+
+
+def test_two_builds_in_one_session_make_two_resumes(app, auth_client, user):
+    """Builds with the same name and role are separate resumes; saving one never overwrites the other."""
+    from app.models import Resume
+    for title in ("For Bank", "For Telco"):
+        auth_client.post("/build", data=BUILDER_FORM)
+        auth_client.post("/templates/select", data={"template_name": "simple_ats"})
+        auth_client.post("/save", data={"title": title})
+    with app.app_context():
+        assert sorted(r.title for r in Resume.query.all()) == ["For Bank", "For Telco"]
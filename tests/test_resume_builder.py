@@ -0,0 +1,101 @@
+"""
+Resume builder tests.
+"""
+from collections import OrderedDict
+
+import pytest
+from app.models import ResumeEnhancement
+from app.services import ai_service, resume_builder
+from app.services.resume_builder import build_resume_html, enhancement_key
+
+
+RESUME_DATA = {
+    "name": "Ama Mensah",
+    "role": "Data Analyst",
+    "skills": "SQL, Python, Excel",
+    "experience": "Built weekly sales dashboards",
+    "education": "BSc Statistics, University of Ghana",
+}
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """Replace the model call with a counting stub."""
+    calls = []
+
+    def _fake_hf_json(system_prompt, user_content, temperature=0.6):
+        calls.append(user_content)
+        return {
+            "professional_summary": "Analyst with a focus on sales reporting.",
+            "experience_bullets": ["Built weekly sales dashboards for regional managers"],
+            "career_value": "Brings clear, data-driven reporting.",
+        }, 42
+
+    monkeypatch.setattr(ai_service, "_hf_json", _fake_hf_json)
+    monkeypatch.setattr(resume_builder, "_context_cache", OrderedDict())
+    return calls
+
+
+def test_enhancement_persisted_and_reused(app, db_session, fake_llm):
+    """Second render of unchanged data reads the stored enhancement."""
+    with app.test_request_context():
+        first = build_resume_html(dict(RESUME_DATA), "modern_minimal")
+        second = build_resume_html(dict(RESUME_DATA), "simple_ats")
+    assert len(fake_llm) == 1
+    assert "Analyst with a focus on sales reporting." in first
+    assert "Analyst with a focus on sales reporting." in second
+    assert ResumeEnhancement.query.filter_by(content_hash=enhancement_key(RESUME_DATA)).count() == 1
+
+
+def test_enhancement_recomputed_when_sections_change(app, db_session, fake_llm):
+    """Changing a source section triggers a fresh model call."""
+    changed = dict(RESUME_DATA, experience="Automated monthly KPI reports")
+    with app.test_request_context():
+        build_resume_html(dict(RESUME_DATA))
+        build_resume_html(changed)
+    assert len(fake_llm) == 2
+    assert enhancement_key(RESUME_DATA) != enhancement_key(changed)
+
+
+def test_enhance_once_render_every_template(app, db_session, fake_llm):
+    """One enhanced context renders all templates without further model calls."""
+    from app.services.resume_builder import TEMPLATES, enhance_resume, render_all_templates, render_resume
+    data = dict(RESUME_DATA, name="Kofi Boateng")
+    with app.test_request_context():
+        context = enhance_resume(data)
+        renderings = render_all_templates(context)
+        again = render_resume(enhance_resume(data), "creative_designer")
+    assert set(renderings) == set(TEMPLATES)
+    assert all("Kofi Boateng" in html for html in renderings.values())
+    assert again == renderings["creative_designer"]
+    assert len(fake_llm) == 1
+
+
+def test_template_registry_precompiles_and_reports_missing(app, monkeypatch):
+    """All templates compile at startup; a missing file falls back without per-call lookups."""
+    from app.services.resume_builder import TemplateRegistry
+    monkeypatch.setattr(resume_builder, "TEMPLATES", resume_builder.TEMPLATES + ["does_not_exist"])
+    registry = TemplateRegistry().init_app(app)
+    assert registry.missing == {"does_not_exist"}
+    assert registry.get("modern_minimal").name == "modern_minimal.html"
+    assert registry.get("does_not_exist").name == "_fallback.html"
+    assert "Ama" in registry.get("does_not_exist").render(full_name="Ama")
+
+
+def test_resume_fields_are_escaped_in_every_template(app, db_session, monkeypatch):
+    """User text (and model output) is rendered as text, never as markup."""
+    monkeypatch.setattr(ai_service, "_hf_json", lambda *a, **k: ({"experience_bullets": ["<img src=x onerror=alert(2)>"]}, 1))
+    monkeypatch.setattr(resume_builder, "_context_cache", OrderedDict())
+    data = dict(
+        RESUME_DATA,
+        name="<script>alert(1)</script>",
+        skills="SQL, <b onmouseover=alert(3)>",
+        education="<iframe src=//evil>",
+        career_objective="<svg onload=alert(4)>",
+    )
+    with app.app_context():
+        context = resume_builder.enhance_resume(data)
+        for name, html in resume_builder.render_all_templates(context).items():
+            for tag in ("<script", "<img", "<b ", "<iframe", "<svg"):
+                assert tag not in html, name
+            assert "&lt;script&gt;" in html
@@ -0,0 +1,86 @@
+"""
+Resume parser tests.
+"""
+from app.services import ai_service
+from app.services.resume_parser import parse_heuristic, parse_resume
+
+CV_TEXT = """Kwame Asante
+Senior Accountant
+kwame.asante@example.com | +233 20 555 0101 | linkedin.com/in/kwameasante
+
+Professional Summary
+Chartered accountant with eight years in audit and financial reporting.
+
+WORK EXPERIENCE
+Ghana Cocoa Board, Accra (Jan 2019 - Present)
+• Led month-end close for 12 regional offices
+• Introduced reconciliation checklist that cut errors
+
+Education:
+BSc Accounting, KNUST (2011 - 2015)
+
+Skills
+• IFRS
+• Excel
+• Sage
+
+Languages
+English, Twi
+"""
+
+
+def test_heuristic_parser_splits_sections():
+    """Headings, contact details, bullets and date ranges are recognised."""
+    data, confidence = parse_heuristic(CV_TEXT)
+    assert data["name"] == "Kwame Asante"
+    assert data["role"] == "Senior Accountant"
+    assert data["email"] == "kwame.asante@example.com"
+    assert data["phone"] == "+233 20 555 0101"
+    assert "linkedin.com/in/kwameasante" in data["links"]
+    assert data["career_objective"].startswith("Chartered accountant")
+    assert "- Led month-end close for 12 regional offices" in data["experience"]
+    assert data["education"] == "BSc Accounting, KNUST (2011 - 2015)"
+    assert data["skills"] == "IFRS, Excel, Sage"
+    assert "Twi" not in data["education"] + data["skills"]
+    assert confidence == 1.0
+
+
+def test_date_ranges_are_not_taken_for_a_phone():
+    """Employment dates before (or without) a phone number never fill the phone field."""
+    text = """Abena Owusu
+Nurse
+
+Experience
+Korle Bu Teaching Hospital 2019 - 2021
+Ridge Hospital 2021-2023
+
+Contact
+Phone: 024 412 3456
+"""
+    data, _ = parse_heuristic(text)
+    assert data["phone"] == "024 412 3456"
+    assert "phone" not in parse_heuristic(text.split("Contact")[0])[0]
+
+
+def test_confident_parse_skips_model(monkeypatch):
+    """High-confidence heuristics make no AI call."""
+    def _fail(*args, **kwargs):
+        raise AssertionError("model should not be called")
+
+    monkeypatch.setattr(ai_service, "_hf_json", _fail)
+    assert parse_resume(CV_TEXT)["skills"] == "IFRS, Excel, Sage"
+
+
+def test_low_confidence_parse_uses_one_model_call(monkeypatch):
+    """Unstructured text triggers a single AI call that fills the gaps."""
+    calls = []
+
+    def _fake(system_prompt, user_content, temperature=0.6):
+        calls.append(user_content)
+        return {"name": "Efua Owusu", "skills": ["Nursing", "Triage"], "experience": "Korle Bu (2020-2023)", "education": "BSc Nursing"}, 50
+
+    monkeypatch.setattr(ai_service, "_hf_json", _fake)
+    data = parse_resume("Efua Owusu nurse Korle Bu 2020 2023 nursing triage BSc")
+    assert len(calls) == 1
+    assert data["skills"] == "Nursing, Triage"
+    assert data["name"] == "Efua Owusu"
@@ -0,0 +1,238 @@
+"""
+Resume hydration tests.
+"""
+import pytest
+from sqlalchemy import event
+
+from app import db
+from app.models import Resume, ResumeSection
+from app.services.resume_store import hydrate, hydrate_resume
+
+
+@pytest.fixture
+def resumes(user):
+    ids = []
+    for i in range(3):
+        resume = Resume(user_id=user.id, title=f"Resume {i}", template_name="simple_ats")
+        db.session.add(resume)
+        db.session.flush()
+        db.session.add(ResumeSection(resume_id=resume.id, section_type="personal", content={"name": f"Person {i}", "role": "Nurse"}))
+        db.session.add(ResumeSection(resume_id=resume.id, section_type="summary", content={"raw": "Caring"}))
+        db.session.add(ResumeSection(resume_id=resume.id, section_type="skills", content={"raw": "Triage"}))
+        ids.append(resume.id)
+    db.session.commit()
+    user_id = user.id
+    db.session.expunge_all()
+    return user_id, ids
+
+
+def test_hydrate_many_uses_constant_queries(resumes):
+    """Any number of resumes hydrate in two queries, in the requested order."""
+    user_id, resumes = resumes
+    statements = []
+
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", _record)
+    try:
+        data = hydrate(list(reversed(resumes)), user_id=user_id)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", _record)
+    assert len(statements) == 2
+    assert list(data) == list(reversed(resumes))
+    assert data[resumes[0]]["name"] == "Person 0"
+    assert data[resumes[0]]["career_objective"] == "Caring"
+    assert data[resumes[2]]["skills"] == "Triage"
+
+
+def test_hydrate_resume_scoped_to_owner(resumes):
+    """Single-resume hydration returns the model and data, and respects ownership."""
+    user_id, resumes = resumes
+    resume, data = hydrate_resume(resumes[1], user_id=user_id)
+    assert resume.title == "Resume 1"
+    assert data["role"] == "Nurse"
+    assert hydrate_resume(resumes[1], user_id=user_id + 1) == (None, None)
+
+
+def test_keyset_pages_cover_every_resume_once(user):
+    """Pages follow (updated_at, id) descending with no gaps or repeats, including ties."""
+    from datetime import datetime, timedelta
+    from app.services.resume_store import resume_cards
+    base = datetime(2026, 1, 1)
+    for i in range(7):
+        # Pairs share a timestamp so the id tie-breaker matters
+        db.session.add(Resume(user_id=user.id, title=f"R{i}", updated_at=base + timedelta(hours=i // 2)))
+    db.session.commit()
+
+    seen, cursor = [], None
+    while True:
+        rows, cursor = resume_cards(user.id, cursor=cursor, limit=3)
+        seen.extend(rows)
+        if cursor is None:
+            break
+    keys = [(r.updated_at, r.id) for r in seen]
+    assert len(seen) == 7
+    assert keys == sorted(keys, reverse=True)
+    assert set(seen[0]._fields) == {"id", "title", "template_name", "updated_at", "is_public", "public_slug", "views", "thumbnail"}
+
+
+def test_dashboard_infinite_scroll_endpoint(app, auth_client, user):
+    """The JSON endpoint returns the next page and rejects bad cursors."""
+    for i in range(23):
+        db.session.add(Resume(user_id=user.id, title=f"Resume {i}"))
+    db.session.commit()
+
+    r = auth_client.get("/dashboard/")
+    assert r.status_code == 200
+    assert r.data.count(b"font-bold text-lg mb-2") == 20
+    assert b'id="load-more"' in r.data
+
+    first = auth_client.get("/dashboard/resumes?limit=20").get_json()
+    assert len(first["resumes"]) == 20
+    rest = auth_client.get(f"/dashboard/resumes?cursor={first['next_cursor']}").get_json()
+    assert len(rest["resumes"]) == 3
+    assert rest["next_cursor"] is None
+    assert "Resume" in rest["html"]
+    ids = [r["id"] for r in first["resumes"] + rest["resumes"]]
+    assert len(set(ids)) == 23
+
+    assert auth_client.get("/dashboard/resumes?cursor=!!bad").status_code == 400
+
+
+DRAFT = {"name": "Kofi Boateng", "role": "Nurse", "skills": "Triage", "experience": "Korle Bu (2020-2023)", "education": "BSc Nursing"}
+
+
+def test_save_resume_is_idempotent_per_draft(user):
+    """Repeated saves of the same draft reuse one resume and write nothing when unchanged."""
+    from app.services.resume_store import save_resume
+    resume, changed = save_resume(user.id, DRAFT, "modern_minimal", "Resume - Nurse", draft_id="d1")
+    assert changed
+    resume_id = resume.id
+    assert ResumeSection.query.filter_by(resume_id=resume_id).count() == 5
+
+    statements = []
+
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", _record)
+    try:
+        again, changed = save_resume(user.id, dict(DRAFT), "modern_minimal", "Resume - Nurse", draft_id="d1")
+    finally:
+        event.remove(db.engine, "before_cursor_execute", _record)
+    assert (again.id, changed) == (resume_id, False)
+    assert not [s for s in statements if not s.lstrip().upper().startswith("SELECT")]
+    assert Resume.query.count() == 1
+
+
+def test_save_resume_updates_changed_sections_in_place(user):
+    """Edited content updates only the changed section rows and bumps updated_at."""
+    from app.services.resume_store import save_resume
+    resume, _ = save_resume(user.id, DRAFT, "modern_minimal", "Resume - Nurse", draft_id="d1")
+    before = {s.section_type: (s.id, s.content) for s in resume.section_list}
+    stamp = resume.updated_at
+
+    edited = dict(DRAFT, skills="Triage, Phlebotomy")
+    resume, changed = save_resume(user.id, edited, "simple_ats", "Resume - Nurse", draft_id="d1")
+    assert changed
+    after = {s.section_type: (s.id, s.content) for s in resume.section_list}
+    assert {t: i for t, (i, _) in after.items()} == {t: i for t, (i, _) in before.items()}
+    assert after["skills"][1] == {"raw": "Triage, Phlebotomy"}
+    assert after["experience"] == before["experience"]
+    assert resume.template_name == "simple_ats"
+    assert resume.updated_at > stamp
+
+    other, _ = save_resume(user.id, dict(DRAFT, role="Midwife"), "modern_minimal", "Resume - Midwife", draft_id="d1")
+    assert other.id != resume.id
+
+
+def test_document_storage_round_trips_in_one_row(app, user):
+    """In document mode a resume is one row and hydrates in one query, with the extras sections drop."""
+    from app.services.resume_store import save_resume
+    app.config["RESUME_STORAGE"] = "document"
+    draft = dict(DRAFT, certifications="BLS", job_level="Mid", links="linkedin.com/in/kofi")
+    resume, _ = save_resume(user.id, draft, "modern_minimal", "Resume - Nurse", draft_id="d1")
+    resume_id = resume.id
+    assert ResumeSection.query.filter_by(resume_id=resume_id).count() == 0
+    assert resume.document["identity"]["target_title"] == "Nurse"
+    db.session.expunge_all()
+
+    statements = []
+
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", _record)
+    try:
+        data = hydrate([resume_id])[resume_id]
+    finally:
+        event.remove(db.engine, "before_cursor_execute", _record)
+    assert len(statements) == 1
+    assert {k: data[k] for k in DRAFT} == DRAFT
+    assert (data["certifications"], data["job_level"], data["links"]) == ("BLS", "Mid", "linkedin.com/in/kofi")
+
+
+def test_rollback_to_sections_mode_keeps_later_edits(app, user):
+    """Edits made after switching back to sections mode are not hidden behind the old document."""
+    from app.services.resume_store import resume_to_data, save_resume, update_resume
+    app.config["RESUME_STORAGE"] = "dual"
+    resume, _ = save_resume(user.id, DRAFT, "modern_minimal", "Resume - Nurse", draft_id="d1")
+    assert resume.document is not None
+
+    app.config["RESUME_STORAGE"] = "sections"
+    assert update_resume(resume, {"skills": "Triage, Phlebotomy"}) is True
+    db.session.expire_all()
+    resume = db.session.get(Resume, resume.id)
+    assert resume.document is None
+    assert resume_to_data(resume)["skills"] == "Triage, Phlebotomy"
+    assert update_resume(resume, {"skills": "Triage, Phlebotomy, IV"}) is True
+    assert resume_to_data(resume)["skills"] == "Triage, Phlebotomy, IV"
+
+
+def test_dual_read_matches_section_layout(resumes):
+    """Legacy section-only resumes and document resumes hydrate to the same render data."""
+    from app.services.resume_document import document_from_data
+    user_id, resumes = resumes
+    legacy = hydrate([resumes[0]])[resumes[0]]
+    resume = db.session.get(Resume, resumes[0])
+    resume.document = document_from_data(legacy)
+    db.session.commit()
+    db.session.expunge_all()
+    migrated = hydrate([resumes[0]])[resumes[0]]
+    assert {k: migrated[k] for k in legacy} == legacy
+
+
+def test_revision_deltas_checkpoints_and_restore(app, user):
+    """Edits store deltas proportional to the change, checkpoints bound replay, restore brings back old state."""
+    from app.models import ResumeRevision
+    from app.services.resume_store import restore_revision, resume_to_data, save_resume, update_resume
+    from app.services.revisions import diff_states, state_at
+    app.config["RESUME_REVISION_CHECKPOINT_EVERY"] = 5
+    long_experience = "\n".join(f"- Led ward round {i} and documented patient outcomes" for i in range(60))
+    resume, _ = save_resume(user.id, dict(DRAFT, experience=long_experience), "modern_minimal", "Resume - Nurse", draft_id="d1")
+    first = db.session.get(ResumeRevision, 1)
+    assert (first.number, first.kind) == (1, "checkpoint")
+
+    for i in range(11):
+        lines = long_experience.split("\n")
+        lines[i] = f"- Edited line {i}"
+        assert update_resume(resume, {"experience": "\n".join(lines)})
+
+    rows = ResumeRevision.query.filter_by(resume_id=resume.id).order_by(ResumeRevision.number).all()
+    assert [r.number for r in rows if r.kind == "checkpoint"] == [1, 6, 11]
+    delta = rows[1]
+    assert delta.kind == "delta"
+    assert delta.size < first.size / 10
+
+    state = state_at(resume.id, 9)
+    assert state["document"]["experience"]["raw"].split("\n")[7] == "- Edited line 7"
+    assert state["document"]["experience"]["raw"].split("\n")[0] == "- Led ward round 0 and documented patient outcomes"
+
+    changes = diff_states(state_at(resume.id, 1), state_at(resume.id, 2))
+    assert [c["field"] for c in changes] == ["document.experience.raw"]
+    assert "+- Edited line 0" in changes[0]["diff"]
+
+    assert restore_revision(resume, 1) is True
+    assert resume_to_data(resume)["experience"] == long_experience
+    assert restore_revision(resume, 99) is None
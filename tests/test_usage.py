@@ -0,0 +1,63 @@
+"""
+AI usage recorder tests.
+"""
+from app.models import AIUsage
+from app.services.usage import UsageRecorder
+
+
+def test_usage_buffered_then_bulk_flushed(app, db_session, user):
+    """Events stay in memory until flush writes them in one batch."""
+    recorder = UsageRecorder()
+    recorder.init_app(app)
+    recorder.flush_size = 100
+    recorder.record(user.id, 10)
+    recorder.record(user.id, 15)
+    assert AIUsage.query.count() == 0
+    assert recorder.pending() == 2
+    assert recorder.flush() == 2
+    assert recorder.pending() == 0
+    assert sorted(u.tokens_used for u in AIUsage.query.all()) == [10, 15]
+
+
+def test_failed_flush_rebuffers(app, db_session, user, monkeypatch):
+    """A failing write keeps the events for the next flush."""
+    recorder = UsageRecorder()
+    recorder.init_app(app)
+
+    def _boom(rows):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(recorder, "_write", _boom)
+    recorder.record(user.id, 5)
+    assert recorder.flush() == 0
+    assert recorder.pending() == 1
+    monkeypatch.undo()
+    assert recorder.flush() == 1
+    assert AIUsage.query.count() == 1
+
+
+def test_flush_maintains_rollups(app, db_session, user):
+    """Totals and day/month buckets are updated incrementally on each flush."""
+    from app.services.usage import get_period_tokens, get_total_tokens
+    recorder = UsageRecorder()
+    recorder.init_app(app)
+    recorder.record(user.id, 10)
+    recorder.record(user.id, 15)
+    recorder.flush()
+    recorder.record(user.id, 5)
+    recorder.flush()
+    assert get_total_tokens(user.id) == 30
+    assert get_period_tokens(user.id, "day") == 30
+    assert get_period_tokens(user.id, "month") == 30
+    assert get_total_tokens(user.id + 1) == 0
+
+
+def test_dashboard_shows_rollup_total(app, auth_client, user):
+    """Dashboard reads the running total instead of summing ai_usages."""
+    recorder = UsageRecorder()
+    recorder.init_app(app)
+    recorder.record(user.id, 1234)
+    recorder.flush()
+    r = auth_client.get("/dashboard/")
+    assert r.status_code == 200
+    assert b"1234" in r.data